@@ -1,7 +1,26 @@
 from django.contrib import admin
-from .models import Airport
+from .models import Airport, FareSnapshot, PriceAlert, PriceWatch
 
 @admin.register(Airport)
 class AirportAdmin(admin.ModelAdmin):
     list_display = ('name', 'iata_code', 'state_code', 'country_code', 'country_name')
-    search_fields = ('name', 'iata_code', 'state_code', 'country_code', 'country_name')
\ No newline at end of file
+    search_fields = ('name', 'iata_code', 'state_code', 'country_code', 'country_name')
+
+@admin.register(FareSnapshot)
+class FareSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('origin', 'destination', 'flight_date', 'airline', 'stops', 'miles', 'observed_at')
+    list_filter = ('airline', 'stops')
+    search_fields = ('origin', 'destination', 'airline')
+    date_hierarchy = 'flight_date'
+
+@admin.register(PriceWatch)
+class PriceWatchAdmin(admin.ModelAdmin):
+    list_display = ('email', 'origin', 'destination', 'start_date', 'end_date', 'max_miles', 'active')
+    list_filter = ('active',)
+    search_fields = ('email', 'origin', 'destination')
+
+@admin.register(PriceAlert)
+class PriceAlertAdmin(admin.ModelAdmin):
+    list_display = ('watch', 'flight_date', 'miles', 'airline', 'triggered_at')
+    search_fields = ('watch__email', 'watch__origin', 'watch__destination')
+    date_hierarchy = 'triggered_at'
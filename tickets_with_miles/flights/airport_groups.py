@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, List, Tuple, Union
+from django.conf import settings
+
+# Airport or metro area codes, as a list or a comma-separated string
+AirportCodes = Union[str, Iterable[str]]
+
+# Metropolitan area codes and the airports searched for each of them.
+# settings.AIRPORT_GROUPS can add groups or replace these.
+DEFAULT_AIRPORT_GROUPS: Dict[str, Tuple[str, ...]] = {
+    'SAO': ('GRU', 'CGH', 'VCP'),
+    'RIO': ('GIG', 'SDU'),
+    'BHZ': ('CNF', 'PLU'),
+    'BUE': ('EZE', 'AEP'),
+    'NYC': ('JFK', 'EWR', 'LGA'),
+    'WAS': ('IAD', 'DCA', 'BWI'),
+    'CHI': ('ORD', 'MDW'),
+    'LON': ('LHR', 'LGW', 'STN', 'LTN', 'LCY'),
+    'PAR': ('CDG', 'ORY'),
+    'MIL': ('MXP', 'LIN', 'BGY'),
+    'ROM': ('FCO', 'CIA'),
+    'TYO': ('HND', 'NRT'),
+}
+
+
+def get_airport_groups() -> Dict[str, Tuple[str, ...]]:
+    return {**DEFAULT_AIRPORT_GROUPS, **getattr(settings, 'AIRPORT_GROUPS', {})}
+
+
+def split_airport_codes(codes: AirportCodes) -> List[str]:
+    """
+    Normalizes airport input, either a comma-separated string ('gru, CGH') or a
+    list of codes, into a list of upper-case codes without duplicates.
+    """
+    if isinstance(codes, str):
+        codes = codes.split(',')
+    return list(dict.fromkeys(code.strip().upper() for code in codes if code.strip()))
+
+
+def expand_airport_codes(codes: AirportCodes) -> List[str]:
+    """
+    Expands metro area codes into their airports.
+
+    Args:
+        codes: Airport and metro area codes, as a comma-separated string or a list.
+
+    Returns:
+        The airport codes, in input order and without duplicates, e.g. 'SAO, CNF'
+        gives ['GRU', 'CGH', 'VCP', 'CNF'].
+    """
+    groups = get_airport_groups()
+    expanded = []
+    for code in split_airport_codes(codes):
+        expanded.extend(groups.get(code, (code,)))
+    return list(dict.fromkeys(expanded))
+
+
+def expand_routes(origin: AirportCodes, destination: AirportCodes) -> List[Tuple[str, str]]:
+    """
+    Pairs every expanded origin with every expanded destination, skipping routes
+    from an airport to itself.
+
+    Returns:
+        The (origin, destination) IATA code pairs, in input order.
+    """
+    return [
+        (route_origin, route_destination)
+        for route_origin in expand_airport_codes(origin)
+        for route_destination in expand_airport_codes(destination)
+        if route_origin != route_destination
+    ]
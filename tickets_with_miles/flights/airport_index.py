@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from functools import cached_property
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Airport
+
+if TYPE_CHECKING:
+    from .autocomplete import AirportAutocomplete
+
+logger = logging.getLogger(__name__)
+
+AirportInfo = namedtuple('AirportInfo', ['iata_code', 'name', 'state_code', 'country_code', 'country_name'])
+
+
+class AirportIndex:
+    """
+    Immutable in-memory snapshot of the Airport table, keyed by IATA code.
+    """
+
+    def __init__(self, airports: Iterable[AirportInfo]):
+        """
+        Initialize the AirportIndex.
+
+        Args:
+            airports: The airports to index.
+        """
+        self._by_code = MappingProxyType({airport.iata_code: airport for airport in airports})
+        self.built_at = time.monotonic()
+
+    def __contains__(self, iata_code: str) -> bool:
+        return iata_code in self._by_code
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def __iter__(self) -> Iterator[AirportInfo]:
+        return iter(self._by_code.values())
+
+    def get(self, iata_code: str) -> Optional[AirportInfo]:
+        """
+        Returns the airport with the given IATA code, or None.
+        """
+        return self._by_code.get(iata_code)
+
+    @cached_property
+    def autocomplete(self) -> 'AirportAutocomplete':
+        """
+        Prefix and typo-tolerant search over these airports, built on first use.
+        """
+        from .autocomplete import AirportAutocomplete
+        return AirportAutocomplete(self)
+
+    @staticmethod
+    def queryset():
+        return Airport.objects.values_list(*AirportInfo._fields)
+
+    @classmethod
+    def build(cls) -> 'AirportIndex':
+        """
+        Builds an index from the database.
+        """
+        return cls(AirportInfo._make(row) for row in cls.queryset())
+
+    @classmethod
+    async def abuild(cls) -> 'AirportIndex':
+        """
+        Async counterpart of build().
+        """
+        return cls([AirportInfo._make(row) async for row in cls.queryset()])
+
+
+DEFAULT_MAX_AGE = 3600  # seconds
+
+_airport_index: Optional[AirportIndex] = None
+_airport_index_lock = threading.Lock()
+
+
+def _max_age() -> int:
+    return getattr(settings, 'AIRPORT_INDEX_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def _current_index() -> Optional[AirportIndex]:
+    index = _airport_index
+    if index is not None and time.monotonic() - index.built_at > _max_age():
+        return None
+    return index
+
+
+def get_airport_index() -> AirportIndex:
+    """
+    Returns the process-wide airport index, building it on first use.
+
+    The index is dropped whenever an Airport is saved or deleted in this process,
+    and rebuilt at least every AIRPORT_INDEX_MAX_AGE seconds so changes made by
+    other processes are picked up as well.
+    """
+    global _airport_index
+    index = _current_index()
+    if index is None:
+        with _airport_index_lock:
+            index = _current_index()
+            if index is None:
+                index = _airport_index = AirportIndex.build()
+    return index
+
+
+async def aget_airport_index() -> AirportIndex:
+    """
+    Async counterpart of get_airport_index(), querying the database with the async ORM.
+    """
+    global _airport_index
+    index = _current_index()
+    if index is None:
+        index = _airport_index = await AirportIndex.abuild()
+    return index
+
+
+def warm_airport_index() -> None:
+    """
+    Builds the airport index ahead of the first search. Called by wsgi.py and
+    asgi.py when a server starts, so management commands and tests never load it;
+    an Airport table that can't be read yet (before migrate) only logs a warning
+    and leaves the index to be built on first use.
+    """
+    try:
+        index = get_airport_index()
+    except DatabaseError as e:
+        logger.warning(f"Airport index not built at startup: {e}")
+        return
+    logger.info(f"Airport index built with {len(index)} airports")
+
+
+def invalidate_airport_index() -> None:
+    """
+    Drops this process's airport index so it is rebuilt on next use. Call it after
+    bulk operations on Airport, which don't send model signals. Other processes
+    rebuild theirs within AIRPORT_INDEX_MAX_AGE seconds.
+    """
+    global _airport_index
+    _airport_index = None
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def invalidate_on_airport_change(sender, **kwargs) -> None:
+    invalidate_airport_index()
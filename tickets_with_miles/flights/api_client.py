@@ -1,9 +1,21 @@
 import aiohttp
 import asyncio
+import logging
+import threading
+import weakref
 from datetime import date
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+from urllib.parse import urlsplit
 from django.conf import settings
 
+from .coalescing import SingleFlight
+from .decoding import TYPED_DECODING_AVAILABLE, decode_search_response
+from .resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+from .scheduler import FetchScheduler, FetchTicket
+from .session_pool import SessionPool, session_pool as default_session_pool
+
+logger = logging.getLogger(__name__)
+
 
 class FlightAPIClient:
     """
@@ -12,17 +24,48 @@ class FlightAPIClient:
 
     BASE_URL = 'https://api-air-flightsearch-blue.smiles.com.br/v1/airlines/search'
     TIMEOUT = 30  # seconds
+    DEFAULT_MAX_IN_FLIGHT = 8
+
+    # One scheduler and one coalescer per event loop, shared by every client using that loop
+    _schedulers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FetchScheduler]' = (
+        weakref.WeakKeyDictionary()
+    )
+    _coalescers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SingleFlight]' = (
+        weakref.WeakKeyDictionary()
+    )
+    # One circuit breaker per upstream host, shared by every client of the process
+    _circuit_breakers: Dict[str, CircuitBreaker] = {}
+    _circuit_breakers_lock = threading.Lock()
 
-    def __init__(self, api_key: Optional[str] = None, telemetry: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        telemetry: Optional[str] = None,
+        session_pool: Optional[SessionPool] = None,
+        scheduler: Optional[FetchScheduler] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
         """
         Initialize the FlightAPIClient with necessary headers.
 
         Args:
             api_key: The API key for authentication.
             telemetry: Akamai telemetry token.
+            session_pool: Pool providing the keep-alive sessions. Defaults to the
+                          process-wide pool.
+            scheduler: Scheduler bounding concurrent upstream calls. Defaults to the
+                       scheduler shared by all clients on the running loop.
+            retry_policy: Retries of transient failures. Defaults to settings.FLIGHT_API_RETRY.
+            circuit_breaker: Breaker guarding the API host. Defaults to the breaker shared
+                             by all clients for that host, see settings.FLIGHT_API_CIRCUIT_BREAKER.
         """
         self.api_key = api_key or settings.FLIGHT_API_KEY
         self.telemetry = telemetry or settings.AKAMAI_TELEMETRY
+        self.session_pool = session_pool or default_session_pool
+        self.scheduler = scheduler
+        self.retry_policy = retry_policy or RetryPolicy.from_settings(getattr(settings, 'FLIGHT_API_RETRY', {}))
+        self.circuit_breaker = circuit_breaker
 
         self.headers = {
             'Accept': 'application/json, text/plain, */*',
@@ -43,17 +86,163 @@ class FlightAPIClient:
             'x-api-key': self.api_key,
         }
 
-    async def fetch(self, session: aiohttp.ClientSession, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def warm_up(self) -> None:
+        """
+        Pre-establishes a pooled connection to the API host.
+        """
+        await self.session_pool.warm_up(self.BASE_URL, headers=self.headers)
+
+    async def close(self) -> None:
+        """
+        Closes the pooled session bound to the running event loop.
+        """
+        await self.session_pool.close()
+
+    def get_scheduler(self) -> FetchScheduler:
+        """
+        Returns the scheduler used for upstream calls on the running loop.
+        """
+        if self.scheduler is not None:
+            return self.scheduler
+
+        loop = asyncio.get_running_loop()
+        scheduler = self._schedulers.get(loop)
+        if scheduler is None:
+            max_in_flight = getattr(settings, 'FLIGHT_API_MAX_IN_FLIGHT', self.DEFAULT_MAX_IN_FLIGHT)
+            scheduler = FetchScheduler(max_in_flight)
+            self._schedulers[loop] = scheduler
+        return scheduler
+
+    def get_coalescer(self) -> SingleFlight:
+        """
+        Returns the coalescer shared by all clients on the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        coalescer = self._coalescers.get(loop)
+        if coalescer is None:
+            coalescer = SingleFlight()
+            self._coalescers[loop] = coalescer
+        return coalescer
+
+    def get_circuit_breaker(self) -> CircuitBreaker:
+        """
+        Returns the circuit breaker of the API host.
+        """
+        if self.circuit_breaker is not None:
+            return self.circuit_breaker
+
+        host = urlsplit(self.BASE_URL).netloc
+        breaker = self._circuit_breakers.get(host)
+        if breaker is None:
+            with self._circuit_breakers_lock:
+                breaker = self._circuit_breakers.get(host)
+                if breaker is None:
+                    config = getattr(settings, 'FLIGHT_API_CIRCUIT_BREAKER', {})
+                    breaker = CircuitBreaker.from_settings(config)
+                    self._circuit_breakers[host] = breaker
+        return breaker
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        params: Dict[str, Any],
+        priority: int = FetchScheduler.DEFAULT_PRIORITY,
+    ) -> Dict[str, Any]:
         """
-        Helper method to fetch data from the API.
+        Helper method to fetch data from the API, waiting for a free slot in the scheduler.
+        Concurrent calls with identical params share a single upstream request, retries
+        included, which runs at the best priority of its callers.
 
         Args:
             session: The aiohttp ClientSession.
             params: The query parameters for the API request.
+            priority: Scheduling priority, lower values run first.
 
         Returns:
             A dictionary containing the API response data.
         """
+        key = (self.api_key, *sorted(params.items()))
+        scheduler = self.get_scheduler()
+
+        def raise_priority(session, params, ticket: FetchTicket) -> None:
+            # An interactive search joining a queued background call shouldn't wait behind it
+            scheduler.reprioritise(ticket, priority)
+
+        return await self.get_coalescer().do(
+            key, self.fetch_with_retries, session, params, FetchTicket(priority), on_join=raise_priority
+        )
+
+    async def fetch_with_retries(
+        self,
+        session: aiohttp.ClientSession,
+        params: Dict[str, Any],
+        ticket: Optional[FetchTicket] = None,
+    ) -> Dict[str, Any]:
+        """
+        Sends a request, retrying transient failures as the retry policy allows.
+
+        Every attempt first asks the host's circuit breaker, so calls fail at once
+        while the host is down instead of each waiting for the timeout. Backoff
+        waits happen outside of the scheduler, leaving the slot to other calls.
+
+        Args:
+            session: The aiohttp ClientSession.
+            params: The query parameters for the API request.
+            ticket: Scheduling priority of every attempt, which callers joining it may raise.
+
+        Returns:
+            A dictionary containing the API response data, or the last error.
+        """
+        ticket = ticket or FetchTicket(FetchScheduler.DEFAULT_PRIORITY)
+        breaker = self.get_circuit_breaker()
+        retry = 0
+        while True:
+            if not breaker.allow():
+                return {'error': f"Circuit open for {urlsplit(self.BASE_URL).netloc}, request not sent"}
+            try:
+                result = await self.get_scheduler().run(self.request, session, params, ticket=ticket)
+            except BaseException:
+                breaker.release()
+                raise
+
+            if 'error' not in result:
+                breaker.record_success()
+                return result
+            if not self.retry_policy.is_retryable(result):
+                # The host answered; the request itself was refused
+                breaker.record_success()
+                return result
+            breaker.record_failure()
+
+            if retry + 1 >= self.retry_policy.attempts:
+                return result
+            delay = self.retry_policy.delay(retry, result.get('retry_after'))
+            if delay is None:
+                return result
+            retry += 1
+            logger.info(f"Retrying flight search in {delay:.2f}s after: {result['error']}")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def use_typed_decoding() -> bool:
+        """
+        Whether responses are decoded with the schema-restricted decoder. Requires
+        msgspec and can be turned off with settings.FLIGHT_API_TYPED_DECODING.
+        """
+        return TYPED_DECODING_AVAILABLE and getattr(settings, 'FLIGHT_API_TYPED_DECODING', True)
+
+    async def request(self, session: aiohttp.ClientSession, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sends a single request to the API.
+
+        Args:
+            session: The aiohttp ClientSession.
+            params: The query parameters for the API request.
+
+        Returns:
+            A dictionary containing the API response data, or an 'error' with the
+            HTTP 'status' and the seconds of its 'retry_after' header, when known.
+        """
         try:
             async with session.get(
                 self.BASE_URL,
@@ -62,9 +251,16 @@ class FlightAPIClient:
                 timeout=self.TIMEOUT
             ) as response:
                 response.raise_for_status()
+                if self.use_typed_decoding() and response.content_type == 'application/json':
+                    return decode_search_response(await response.read())
                 return await response.json()
+        except aiohttp.ClientResponseError as e:
+            retry_after = parse_retry_after((e.headers or {}).get('Retry-After'))
+            return {'error': str(e), 'status': e.status, 'retry_after': retry_after}
         except aiohttp.ClientError as e:
             return {'error': str(e)}
+        except asyncio.TimeoutError:
+            return {'error': f"Request timed out after {self.TIMEOUT}s"}
 
     async def search_flights(
         self,
@@ -110,20 +306,24 @@ class FlightAPIClient:
         if return_date:
             params['returnDate'] = return_date.strftime('%Y-%m-%d')
 
-        async with aiohttp.ClientSession() as session:
-            return await self.fetch(session, params)
+        session = await self.session_pool.get_session()
+        return await self.fetch(session, params)
 
     async def search_flights_bulk(
         self,
         searches: List[Dict[str, Any]],
+        priority: int = FetchScheduler.DEFAULT_PRIORITY,
     ) -> List[Dict[str, Any]]:
         """
-        Searches for flights using the Smiles API in parallel.
+        Searches for flights using the Smiles API in parallel, with at most
+        `FLIGHT_API_MAX_IN_FLIGHT` requests running at once. Cancelling the call
+        cancels every pending and running request.
 
         Args:
             searches: A list of dictionaries containing search parameters. Each dictionary should
                       have keys: 'origin', 'destination', 'departure_date', and optionally
                       'return_date', 'adults', 'children', 'infants'.
+            priority: Scheduling priority for these requests, lower values run first.
 
         Returns:
             A list of dictionaries containing the API response data for each search.
@@ -131,25 +331,64 @@ class FlightAPIClient:
         Raises:
             aiohttp.ClientError: An error occurred while making the API requests.
         """
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for search in searches:
-                params = {
-                    'cabin': 'ALL',
-                    'originAirportCode': search['origin'],
-                    'destinationAirportCode': search['destination'],
-                    'departureDate': search['departure_date'].strftime('%Y-%m-%d'),
-                    'adults': search.get('adults', 1),
-                    'children': search.get('children', 0),
-                    'infants': search.get('infants', 0),
-                    'forceCongener': 'false',
-                    'cookies': '_gid%3Dundefined%3B',
-                    'memberNumber': '',
-                }
-                if search.get('return_date'):
-                    params['returnDate'] = search['return_date'].strftime('%Y-%m-%d')
-
-                tasks.append(self.fetch(session, params))
-
-            results = await asyncio.gather(*tasks)
-            return results
+        session = await self.session_pool.get_session()
+        tasks = [self.fetch(session, self.build_params(search), priority) for search in searches]
+        results = await asyncio.gather(*tasks)
+        return results
+
+    async def search_flights_as_completed(
+        self,
+        searches: List[Dict[str, Any]],
+        priority: int = FetchScheduler.DEFAULT_PRIORITY,
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Like search_flights_bulk, but yields each response as soon as it arrives.
+        Closing the iterator early cancels the requests still pending.
+
+        Args:
+            searches: A list of dictionaries containing search parameters, as in search_flights_bulk.
+            priority: Scheduling priority for these requests, lower values run first.
+
+        Yields:
+            Tuples of (index of the search in `searches`, API response data), in completion order.
+        """
+        session = await self.session_pool.get_session()
+
+        async def indexed_fetch(index: int, search: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+            return index, await self.fetch(session, self.build_params(search), priority)
+
+        tasks = [asyncio.ensure_future(indexed_fetch(index, search)) for index, search in enumerate(searches)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def build_params(search: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Builds the API query parameters for a search dictionary.
+
+        Args:
+            search: A dictionary with keys 'origin', 'destination', 'departure_date', and
+                    optionally 'return_date', 'adults', 'children', 'infants'.
+
+        Returns:
+            The query parameters for the API request.
+        """
+        params = {
+            'cabin': 'ALL',
+            'originAirportCode': search['origin'],
+            'destinationAirportCode': search['destination'],
+            'departureDate': search['departure_date'].strftime('%Y-%m-%d'),
+            'adults': search.get('adults', 1),
+            'children': search.get('children', 0),
+            'infants': search.get('infants', 0),
+            'forceCongener': 'false',
+            'cookies': '_gid%3Dundefined%3B',
+            'memberNumber': '',
+        }
+        if search.get('return_date'):
+            params['returnDate'] = search['return_date'].strftime('%Y-%m-%d')
+        return params
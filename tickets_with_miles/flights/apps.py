@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FlightsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flights'
+
+    def ready(self):
+        # Connects the signals that keep the airport index in sync with the table
+        from . import airport_index  # noqa: F401
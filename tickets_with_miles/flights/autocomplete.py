@@ -0,0 +1,145 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .airport_index import AirportInfo
+
+# Match ranks, lower is better
+RANK_IATA_EXACT = 0
+RANK_IATA_PREFIX = 1
+RANK_NAME_PREFIX = 2
+RANK_PLACE_PREFIX = 3
+RANK_FUZZY = 4
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def fold(text: str) -> str:
+    """
+    Normalizes text for matching: strips accents, lowercases and turns anything
+    that isn't a letter or a digit into a single space ('São Paulo' -> 'sao paulo').
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', stripped.casefold()).strip()
+
+
+def deletes(word: str) -> Set[str]:
+    """
+    Returns every string obtained by deleting one character from `word`.
+    """
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class AirportAutocomplete:
+    """
+    Precomputed prefix and typo-tolerant index over airports for autocomplete.
+
+    Every prefix of every folded token (IATA code, name, state and country) maps
+    to the airports it matches, already ranked, so a one-word query is a single
+    dictionary lookup. Words that match no prefix fall back to whole-token matches
+    within edit distance 1, found with the symmetric delete method.
+    """
+
+    DEFAULT_LIMIT = 10
+    MIN_FUZZY_LENGTH = 4
+
+    def __init__(self, airports: Iterable[AirportInfo]):
+        """
+        Initialize the AirportAutocomplete.
+
+        Args:
+            airports: The airports to index.
+        """
+        self.airports: List[AirportInfo] = sorted(airports, key=lambda airport: (fold(airport.name), airport.iata_code))
+
+        prefixes: Dict[str, Dict[int, int]] = defaultdict(dict)
+        tokens: Dict[str, Dict[int, int]] = defaultdict(dict)
+        for position, airport in enumerate(self.airports):
+            for token, rank in self.tokenize(airport):
+                if rank < tokens[token].get(position, RANK_FUZZY):
+                    tokens[token][position] = rank
+                for end in range(1, len(token) + 1):
+                    prefix_rank = rank
+                    if rank == RANK_IATA_EXACT and end < len(token):
+                        prefix_rank = RANK_IATA_PREFIX
+                    if prefix_rank < prefixes[token[:end]].get(position, RANK_FUZZY):
+                        prefixes[token[:end]][position] = prefix_rank
+
+        # Each prefix keeps its matches ordered by rank, then name, to answer
+        # single-word queries without sorting
+        self._prefixes: Dict[str, Tuple[Dict[int, int], List[int]]] = {
+            prefix: (matches, sorted(matches, key=lambda position: (matches[position], position)))
+            for prefix, matches in prefixes.items()
+        }
+        self._tokens = dict(tokens)
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+        for token in self._tokens:
+            if len(token) >= self.MIN_FUZZY_LENGTH:
+                for variant in deletes(token) | {token}:
+                    self._deletes[variant].add(token)
+
+    @staticmethod
+    def tokenize(airport: AirportInfo) -> Iterable[Tuple[str, int]]:
+        """
+        Yields the folded tokens of an airport with their match rank.
+        """
+        yield fold(airport.iata_code), RANK_IATA_EXACT
+        for word in fold(airport.name).split():
+            yield word, RANK_NAME_PREFIX
+        for field in (airport.state_code, airport.country_code, airport.country_name):
+            for word in fold(field).split():
+                yield word, RANK_PLACE_PREFIX
+
+    def match_word(self, word: str) -> Dict[int, int]:
+        """
+        Returns the airports matching one query word, mapped to their match rank.
+        """
+        entry = self._prefixes.get(word)
+        if entry is not None:
+            return entry[0]
+        if len(word) < self.MIN_FUZZY_LENGTH:
+            return {}
+
+        matches: Dict[int, int] = {}
+        candidates = set(self._deletes.get(word, ()))
+        for variant in deletes(word):
+            candidates.update(self._deletes.get(variant, ()))
+        for token in candidates:
+            for position in self._tokens[token]:
+                matches[position] = RANK_FUZZY
+        return matches
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[AirportInfo]:
+        """
+        Finds the airports matching every word of the query.
+
+        Args:
+            query: Free text typed by the user, e.g. 'gru', 'sao paulo' or 'lisbao'.
+            limit: Maximum number of airports returned.
+
+        Returns:
+            The best matches, ranked by how they matched and then by name.
+        """
+        words = fold(query).split()
+        if not words or limit < 1:
+            return []
+
+        if len(words) == 1 and words[0] in self._prefixes:
+            ranked = self._prefixes[words[0]][1][:limit]
+            return [self.airports[position] for position in ranked]
+
+        word_matches = sorted((self.match_word(word) for word in words), key=len)
+        scores = {}
+        for position, rank in word_matches[0].items():
+            total = rank
+            for matches in word_matches[1:]:
+                if position not in matches:
+                    break
+                total += matches[position]
+            else:
+                scores[position] = total
+
+        ranked = sorted(scores, key=lambda position: (scores[position], position))[:limit]
+        return [self.airports[position] for position in ranked]
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ('task', 'args', 'waiters')
+
+    def __init__(self, task: asyncio.Task, args: Tuple[Any, ...]):
+        self.task = task
+        self.args = args
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single in-flight call.
+
+    The first caller for a key starts the call; callers arriving while it runs
+    await the same result (or exception). A caller that is cancelled only stops
+    waiting, and the shared call is cancelled once no caller is left waiting.
+    Finished calls are forgotten, so later callers always start a fresh one.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        on_join: Optional[Callable[..., None]] = None,
+    ) -> Any:
+        """
+        Runs `func(*args)`, or joins the call already running for `key`.
+
+        Args:
+            key: Hashable identity of the call.
+            func: The coroutine function to call.
+            args: Positional arguments for `func`.
+            on_join: Called with the running call's arguments when joining it, e.g.
+                     to raise its priority to the joining caller's.
+
+        Returns:
+            Whatever `func` returns.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func(*args)), args)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        elif on_join is not None:
+            on_join(*call.args)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
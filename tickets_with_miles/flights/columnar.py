@@ -0,0 +1,229 @@
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .flight import Flight
+
+FlightLike = Union[Flight, Dict[str, Any]]
+
+NUMPY_AVAILABLE = np is not None
+
+SORT_KEYS = ('miles', 'duration', 'departure', 'stops')
+
+
+class FlightTable:
+    """
+    Columnar view of a result set, backed by NumPy arrays.
+
+    Miles, duration (minutes), stops and departure time are kept as arrays, and
+    airline and airport names as integer codes into shared category arrays, so
+    filtering, sorting and grouping run as vectorized operations instead of
+    Python loops over the flights. Every operation returns a new table; the
+    flights themselves are never copied, only the row indexes into them.
+    """
+
+    def __init__(
+        self,
+        flights: Sequence[FlightLike],
+        columns: Dict[str, 'np.ndarray'],
+        categories: Dict[str, 'np.ndarray'],
+        rows: Optional['np.ndarray'] = None,
+    ):
+        """
+        Initialize the FlightTable. Use from_flights() to build one.
+
+        Args:
+            flights: The flights the rows refer to.
+            columns: Column arrays, one value per row.
+            categories: Category arrays for the coded columns.
+            rows: Index of each row in `flights`. Defaults to all of them, in order.
+        """
+        if np is None:
+            raise ImportError("FlightTable requires numpy")
+        self.flights = flights
+        self.columns = columns
+        self.categories = categories
+        self.rows = np.arange(len(flights)) if rows is None else rows
+
+    @classmethod
+    def from_flights(cls, flights: Iterable[FlightLike]) -> 'FlightTable':
+        """
+        Builds a table from Flight records or flight dicts.
+        """
+        if np is None:
+            raise ImportError("FlightTable requires numpy")
+        flights = list(flights)
+
+        def durations() -> Iterator[float]:
+            for flight in flights:
+                hours, minutes = flight.get('duration_hours'), flight.get('duration_minutes')
+                yield np.nan if hours is None and minutes is None else (hours or 0) * 60 + (minutes or 0)
+
+        columns = {
+            'miles': np.fromiter((flight['miles_cost'] for flight in flights), dtype=np.int64, count=len(flights)),
+            'duration': np.fromiter(durations(), dtype=np.float64, count=len(flights)),
+            'stops': np.fromiter((flight.get('number_of_stops') or 0 for flight in flights), dtype=np.int16, count=len(flights)),
+            # Strings are parsed by NumPy in one pass; missing times become NaT
+            'departure': np.array(
+                [flight.get('departure_time') or 'NaT' for flight in flights], dtype='datetime64[s]'
+            ),
+        }
+        categories = {}
+        for name, field in (('airline', 'airline'), ('origin', 'departure_airport'), ('destination', 'arrival_airport')):
+            values = np.array([flight.get(field) or '' for flight in flights], dtype=str)
+            categories[name], columns[name] = np.unique(values, return_inverse=True)
+        return cls(flights, columns, categories)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[FlightLike]:
+        return (self.flights[row] for row in self.rows)
+
+    def to_list(self) -> List[FlightLike]:
+        return list(self)
+
+    def take(self, indexes: 'np.ndarray') -> 'FlightTable':
+        """
+        Returns a table with the given rows (positions or boolean mask) of this one.
+        """
+        columns = {name: column[indexes] for name, column in self.columns.items()}
+        return FlightTable(self.flights, columns, self.categories, self.rows[indexes])
+
+    @property
+    def days(self) -> 'np.ndarray':
+        return self.columns['departure'].astype('datetime64[D]')
+
+    def filter(
+        self,
+        max_miles: Optional[int] = None,
+        max_stops: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        airlines: Optional[Iterable[str]] = None,
+        origins: Optional[Iterable[str]] = None,
+        destinations: Optional[Iterable[str]] = None,
+        departure_from: Optional[Any] = None,
+        departure_to: Optional[Any] = None,
+    ) -> 'FlightTable':
+        """
+        Returns the rows matching every given condition.
+
+        Args:
+            max_miles: Highest miles cost.
+            max_stops: Highest number of stops.
+            max_duration: Longest duration, in minutes.
+            airlines: Allowed airline names.
+            origins: Allowed departure airports.
+            destinations: Allowed arrival airports.
+            departure_from: Earliest departure, as a datetime or ISO string.
+            departure_to: Latest departure, as a datetime or ISO string.
+
+        Returns:
+            A new FlightTable.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if max_miles is not None:
+            mask &= self.columns['miles'] <= max_miles
+        if max_stops is not None:
+            mask &= self.columns['stops'] <= max_stops
+        if max_duration is not None:
+            mask &= self.columns['duration'] <= max_duration
+        for name, allowed in (('airline', airlines), ('origin', origins), ('destination', destinations)):
+            if allowed is not None:
+                allowed_codes = np.flatnonzero(np.isin(self.categories[name], list(allowed)))
+                mask &= np.isin(self.columns[name], allowed_codes)
+        if departure_from is not None:
+            mask &= self.columns['departure'] >= np.datetime64(departure_from, 's')
+        if departure_to is not None:
+            mask &= self.columns['departure'] <= np.datetime64(departure_to, 's')
+        return self.take(mask)
+
+    def sort(self, by: str = 'miles', descending: bool = False) -> 'FlightTable':
+        """
+        Returns the rows sorted by one of SORT_KEYS. The sort is stable, and
+        missing durations and departure times go last.
+        """
+        if by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {by}")
+        order = np.argsort(self.columns[by], kind='stable')
+        if descending:
+            order = order[::-1]
+        return self.take(order)
+
+    def group_by_date(self) -> Dict[Optional[date], 'FlightTable']:
+        """
+        Splits the rows by departure date, in date order. Rows keep their order
+        within each day; rows without a departure time are grouped under None.
+        """
+        days = self.days
+        order = np.argsort(days, kind='stable')
+        unique_days, starts = np.unique(days[order], return_index=True)
+        groups = {}
+        for day, rows in zip(unique_days, np.split(order, starts[1:])):
+            groups[None if np.isnat(day) else day.item()] = self.take(rows)
+        return groups
+
+    def cheapest_per_day(self) -> 'FlightTable':
+        """
+        Returns the cheapest flight of each departure date, in date order.
+        Ties go to the earliest row.
+        """
+        if not len(self):
+            return self
+        order = np.lexsort((self.columns['miles'], self.days))
+        _, firsts = np.unique(self.days[order], return_index=True)
+        return self.take(order[firsts])
+
+
+def rank_flights(
+    flights: Sequence[FlightLike],
+    sort_by: str = 'miles',
+    cheapest_per_day: bool = False,
+) -> List[FlightLike]:
+    """
+    Re-ranks a result set, with FlightTable when NumPy is installed and with
+    plain Python otherwise.
+
+    Args:
+        flights: Flight records or flight dicts.
+        sort_by: One of SORT_KEYS.
+        cheapest_per_day: Keep only the cheapest flight of each date.
+
+    Returns:
+        The ranked flights.
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort_by}")
+
+    if NUMPY_AVAILABLE:
+        table = FlightTable.from_flights(flights)
+        if cheapest_per_day:
+            table = table.cheapest_per_day()
+        return table.sort(sort_by).to_list()
+
+    if cheapest_per_day:
+        cheapest = {}
+        for flight in flights:
+            day = (flight.get('departure_time') or '')[:10]
+            if day not in cheapest or flight['miles_cost'] < cheapest[day]['miles_cost']:
+                cheapest[day] = flight
+        # Flights without a departure time go last, as NaT does with NumPy
+        flights = [cheapest[day] for day in sorted(cheapest, key=lambda day: (not day, day))]
+
+    def missing_last(value: Any) -> tuple:
+        return (value is None, value or 0)
+
+    keys = {
+        'miles': lambda flight: flight['miles_cost'],
+        'duration': lambda flight: missing_last(
+            None if flight.get('duration_hours') is None and flight.get('duration_minutes') is None
+            else (flight.get('duration_hours') or 0) * 60 + (flight.get('duration_minutes') or 0)
+        ),
+        'departure': lambda flight: (flight.get('departure_time') is None, flight.get('departure_time') or ''),
+        'stops': lambda flight: flight.get('number_of_stops') or 0,
+    }
+    return sorted(flights, key=keys[sort_by])
@@ -0,0 +1,83 @@
+import json
+from typing import Any, Dict, List, Optional, TypedDict, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+# Schema of the parts of a search response read by FlightService.extract_flights.
+# Every field is optional and nullable so that any response the plain JSON path
+# accepts decodes to the same values; anything not listed here is skipped.
+
+class AirportRecord(TypedDict, total=False):
+    code: Optional[str]
+
+
+class EndpointRecord(TypedDict, total=False):
+    date: Optional[str]
+    airport: Optional[AirportRecord]
+
+
+class AirlineRecord(TypedDict, total=False):
+    name: Optional[str]
+
+
+class FareRecord(TypedDict, total=False):
+    type: Optional[str]
+    miles: Optional[Union[int, float]]
+
+
+class DurationRecord(TypedDict, total=False):
+    hours: Optional[int]
+    minutes: Optional[int]
+
+
+class FlightRecord(TypedDict, total=False):
+    airline: Optional[AirlineRecord]
+    fareList: Optional[List[FareRecord]]
+    duration: Optional[DurationRecord]
+    departure: Optional[EndpointRecord]
+    arrival: Optional[EndpointRecord]
+    stops: Optional[int]
+
+
+class SegmentRecord(TypedDict, total=False):
+    flightList: Optional[List[FlightRecord]]
+
+
+class SearchResponse(TypedDict, total=False):
+    requestedFlightSegmentList: Optional[List[SegmentRecord]]
+
+
+TYPED_DECODING_AVAILABLE = msgspec is not None
+
+_decoder = msgspec.json.Decoder(SearchResponse) if TYPED_DECODING_AVAILABLE else None
+
+
+def decode_search_response(body: bytes) -> Dict[str, Any]:
+    """
+    Decodes a raw search response body.
+
+    With msgspec installed, the body is decoded straight into dictionaries holding
+    only the SearchResponse fields, without building the rest of the payload.
+    Bodies that don't fit the schema (unexpected types, invalid JSON) go through
+    the standard json module, so the result never differs from a plain decode as
+    far as extract_flights is concerned.
+
+    Args:
+        body: The response body.
+
+    Returns:
+        The decoded response.
+
+    Raises:
+        json.JSONDecodeError: The body is not valid JSON.
+    """
+    if _decoder is not None:
+        try:
+            return _decoder.decode(body)
+        except msgspec.MsgspecError:
+            pass
+    return json.loads(body)
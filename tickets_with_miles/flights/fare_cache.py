@@ -0,0 +1,224 @@
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# (origin, destination, departure_date, adults, children, infants)
+FareKey = Tuple[str, str, date, int, int, int]
+
+# (flights, fetched_at) where fetched_at is a UNIX timestamp in seconds
+FareEntry = Tuple[List[Dict[str, Any]], float]
+
+# Django cache backends whose entries never leave the process that wrote them
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+class FareCache(ABC):
+    """
+    Base class for per-day caches of parsed flight results.
+
+    A day is fresh for `ttl` seconds. With a non-zero `stale_ttl` it can still be
+    served for that many extra seconds while it is refreshed in the background.
+    """
+
+    DEFAULT_TTL = 600  # seconds
+    DEFAULT_STALE_TTL = 0  # seconds
+
+    def __init__(self, ttl: Optional[int] = None, stale_ttl: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a cached day is served before it is fetched again.
+            stale_ttl: Extra seconds a cached day may be served stale.
+        """
+        self.ttl = self.DEFAULT_TTL if ttl is None else ttl
+        self.stale_ttl = self.DEFAULT_STALE_TTL if stale_ttl is None else stale_ttl
+
+    @staticmethod
+    def make_key(
+        origin: str,
+        destination: str,
+        departure_date: date,
+        adults: int,
+        children: int,
+        infants: int,
+    ) -> FareKey:
+        return (origin, destination, departure_date, adults, children, infants)
+
+    def is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at <= self.ttl
+
+    @property
+    def is_shared(self) -> bool:
+        """
+        Whether days cached by this process are seen by other processes.
+        """
+        return False
+
+    def get(self, key: FareKey) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the cached flights for the given key if they are fresh, or None.
+        """
+        entry = self.get_entry(key)
+        if entry is None or not self.is_fresh(entry[1]):
+            return None
+        return entry[0]
+
+    @abstractmethod
+    def get_entry(self, key: FareKey) -> Optional[FareEntry]:
+        """
+        Returns the cached flights and their fetch time, fresh or stale, or None on a miss.
+        """
+
+    @abstractmethod
+    def set(self, key: FareKey, flights: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        """
+        Stores the flights for the given key.
+        """
+
+
+class MemoryFareCache(FareCache):
+    """
+    In-process fare cache with TTL expiry and LRU eviction.
+    """
+
+    DEFAULT_MAX_ENTRIES = 2048
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+    ):
+        """
+        Initialize the MemoryFareCache.
+
+        Args:
+            ttl: Seconds a cached day is served before it is fetched again.
+            max_entries: Maximum number of days kept before the least recently used is evicted.
+            stale_ttl: Extra seconds a cached day may be served stale.
+        """
+        super().__init__(ttl, stale_ttl)
+        self.max_entries = max_entries or self.DEFAULT_MAX_ENTRIES
+        self._entries: 'OrderedDict[FareKey, FareEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: FareKey) -> Optional[FareEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: FareKey, flights: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (flights, time.time() if fetched_at is None else fetched_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DjangoFareCache(FareCache):
+    """
+    Fare cache stored in one of the Django cache backends, so it can be shared
+    between processes. Size limits and eviction are those of the backend.
+    """
+
+    KEY_PREFIX = 'fares'
+
+    def __init__(self, ttl: Optional[int] = None, alias: str = 'default', stale_ttl: Optional[int] = None):
+        """
+        Initialize the DjangoFareCache.
+
+        Args:
+            ttl: Seconds a cached day is served before it is fetched again.
+            alias: Name of the entry in settings.CACHES to use.
+            stale_ttl: Extra seconds a cached day may be served stale.
+        """
+        super().__init__(ttl, stale_ttl)
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def is_shared(self) -> bool:
+        return not isinstance(self.backend, PROCESS_LOCAL_BACKENDS)
+
+    def to_cache_key(self, key: FareKey) -> str:
+        origin, destination, departure_date, adults, children, infants = key
+        return ':'.join([
+            self.KEY_PREFIX, origin, destination, departure_date.isoformat(),
+            str(adults), str(children), str(infants),
+        ])
+
+    def get_entry(self, key: FareKey) -> Optional[FareEntry]:
+        return self.backend.get(self.to_cache_key(key))
+
+    def set(self, key: FareKey, flights: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        entry = (flights, time.time() if fetched_at is None else fetched_at)
+        self.backend.set(self.to_cache_key(key), entry, timeout=self.ttl + self.stale_ttl)
+
+
+def build_fare_cache() -> Optional[FareCache]:
+    """
+    Builds the fare cache described by settings.FARE_CACHE.
+
+    Returns:
+        A FareCache, or None when caching is disabled.
+    """
+    config = getattr(settings, 'FARE_CACHE', {})
+    backend = config.get('BACKEND', 'memory')
+    ttl = config.get('TTL')
+    if not backend or ttl == 0:
+        return None
+    if backend == 'memory':
+        return MemoryFareCache(
+            ttl=ttl,
+            max_entries=config.get('MAX_ENTRIES'),
+            stale_ttl=config.get('STALE_TTL'),
+        )
+    if backend == 'django':
+        return DjangoFareCache(
+            ttl=ttl,
+            alias=config.get('CACHE_ALIAS', 'default'),
+            stale_ttl=config.get('STALE_TTL'),
+        )
+    raise ValueError(f"Unknown fare cache backend: {backend}")
+
+
+_fare_cache: Optional[FareCache] = None
+_fare_cache_built = False
+_fare_cache_lock = threading.Lock()
+
+
+def get_fare_cache() -> Optional[FareCache]:
+    """
+    Returns the process-wide fare cache, building it on first use.
+    """
+    global _fare_cache, _fare_cache_built
+    if not _fare_cache_built:
+        with _fare_cache_lock:
+            if not _fare_cache_built:
+                _fare_cache = build_fare_cache()
+                _fare_cache_built = True
+    return _fare_cache
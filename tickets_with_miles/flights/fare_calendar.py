@@ -0,0 +1,158 @@
+import heapq
+from datetime import date, timedelta
+from typing import AbstractSet, Any, Dict, List, NamedTuple, Optional, Union
+
+from .flight import Flight, to_dict
+
+FlightLike = Union[Flight, Dict[str, Any]]
+
+
+class CalendarDay(NamedTuple):
+    """
+    The cheapest fare of one day of a fare calendar. Exact days were searched (or
+    found in the fare cache); the others are estimated from the nearest exact days
+    and have no flight. A miles_cost of None means no flight was found or estimated.
+    """
+    date: date
+    miles_cost: Optional[int]
+    exact: bool
+    flight: Optional[FlightLike] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'date': self.date.isoformat(),
+            'miles_cost': self.miles_cost,
+            'exact': self.exact,
+            'flight': to_dict(self.flight) if self.flight is not None else None,
+        }
+
+
+class FareCalendarPlanner:
+    """
+    Chooses which days of a long window to search for a cheapest-fare calendar.
+
+    The window is first sampled every SAMPLE_STEP days. Each refinement round then
+    searches the middle of the gaps between known days that are most likely to hide
+    a cheaper fare: gaps next to a local minimum first, then gaps by the lowest fare
+    at their ends, longest first. Days found in the fare cache are known for free,
+    so refinement also gathers around them. The remaining days are estimated by
+    interpolating between their nearest known days.
+    """
+
+    SAMPLE_STEP = 10
+    REFINE_BATCH = 9
+    DEFAULT_MAX_FETCHED_DAYS = 60
+
+    def __init__(self, start_date: date, days: int):
+        """
+        Initialize the FareCalendarPlanner.
+
+        Args:
+            start_date: The first day of the calendar.
+            days: Number of days in the calendar.
+        """
+        self.start_date = start_date
+        self.days = days
+        self.end_date = start_date + timedelta(days=days - 1)
+
+    @property
+    def dates(self) -> List[date]:
+        return [self.start_date + timedelta(days=offset) for offset in range(self.days)]
+
+    def sample_dates(self, known: Dict[date, Optional[int]], limit: int) -> List[date]:
+        """
+        Returns up to `limit` unknown days of the initial sample: every SAMPLE_STEP
+        days and the last day, spread over the whole window when the limit is lower.
+        """
+        samples = list(dict.fromkeys([*self.dates[::self.SAMPLE_STEP], self.end_date]))
+        samples = [day for day in samples if day not in known]
+        if len(samples) > limit > 0:
+            step = len(samples) / limit
+            samples = [samples[int(index * step)] for index in range(limit)]
+        return samples[:max(limit, 0)]
+
+    def refine_dates(
+        self,
+        known: Dict[date, Optional[int]],
+        limit: int,
+        skip: AbstractSet[date] = frozenset(),
+    ) -> List[date]:
+        """
+        Returns up to `limit` days to search next, one in the middle of each of the
+        most promising gaps between known days.
+
+        Args:
+            known: Cheapest miles of the known days, None for days without flights.
+            limit: Most days to return.
+            skip: Unknown days not to search again, e.g. ones that keep failing. They
+                  bound gaps like known days without flights.
+
+        Returns:
+            The days to search, or an empty list once every gap is closed.
+        """
+        known_dates = sorted(day for day in {*known, *skip} if self.start_date <= day <= self.end_date)
+        if limit <= 0 or not any(day in known for day in known_dates):
+            return []
+
+        def miles(day: date) -> float:
+            value = known.get(day)
+            return float('inf') if value is None else value
+
+        local_minima = {
+            day for index, day in enumerate(known_dates)
+            if known.get(day) is not None
+            and (index == 0 or miles(day) <= miles(known_dates[index - 1]))
+            and (index == len(known_dates) - 1 or miles(day) <= miles(known_dates[index + 1]))
+        }
+
+        # Gaps at the edges of the window are bounded by the day just outside of it
+        bounds = [self.start_date - timedelta(days=1), *known_dates, self.end_date + timedelta(days=1)]
+        gaps = []
+        for before, after in zip(bounds, bounds[1:]):
+            length = (after - before).days - 1
+            if length < 1:
+                continue
+            near_minimum = before in local_minima or after in local_minima
+            gaps.append((not near_minimum, min(miles(before), miles(after)), -length, before, after))
+
+        return sorted(
+            before + timedelta(days=(after - before).days // 2)
+            for _, _, _, before, after in heapq.nsmallest(limit, gaps)
+        )
+
+    def build(self, known: Dict[date, Optional[FlightLike]]) -> List[CalendarDay]:
+        """
+        Builds the calendar from the cheapest flight of each known day.
+
+        Unknown days are estimated by linear interpolation between the nearest known
+        days with flights on each side, or take the nearest one's miles at the edges
+        of the window. Known days without flights don't take part in estimates.
+
+        Args:
+            known: Cheapest flight of each known day, None for days without flights.
+
+        Returns:
+            One CalendarDay per day of the window, in date order.
+        """
+        priced = sorted(
+            (day, flight['miles_cost']) for day, flight in known.items()
+            if flight is not None and self.start_date <= day <= self.end_date
+        )
+        calendar = []
+        index = 0
+        for day in self.dates:
+            if day in known:
+                flight = known[day]
+                calendar.append(CalendarDay(day, flight['miles_cost'] if flight is not None else None, True, flight))
+                continue
+            while index < len(priced) and priced[index][0] < day:
+                index += 1
+            before = priced[index - 1] if index > 0 else None
+            after = priced[index] if index < len(priced) else None
+            if before and after:
+                ratio = (day - before[0]).days / (after[0] - before[0]).days
+                estimate = round(before[1] + (after[1] - before[1]) * ratio)
+            else:
+                estimate = (before or after or (None, None))[1]
+            calendar.append(CalendarDay(day, estimate, False))
+        return calendar
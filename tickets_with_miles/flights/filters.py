@@ -0,0 +1,108 @@
+from datetime import time
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .flight import Flight
+
+FlightLike = Union[Flight, Dict[str, Any]]
+
+
+class FlightFilters:
+    """
+    Server-side conditions a flight must meet to be returned by a search.
+
+    FlightService checks them while parsing the API response, before a flight is
+    built, so rejected flights cost a few lookups on the raw data only. Flights
+    that were already parsed (e.g. from the fare cache) are checked with accepts().
+    """
+
+    def __init__(
+        self,
+        max_stops: Optional[int] = None,
+        airlines: Optional[Iterable[str]] = None,
+        departure_from: Optional[time] = None,
+        departure_to: Optional[time] = None,
+        max_duration: Optional[int] = None,
+        max_miles: Optional[int] = None,
+        fare_types: Optional[Iterable[str]] = None,
+    ):
+        """
+        Initialize the FlightFilters. Conditions left as None are not checked.
+
+        Args:
+            max_stops: Highest number of stops.
+            airlines: Allowed airline names, case-insensitive.
+            departure_from: Earliest departure time of day.
+            departure_to: Latest departure time of day. A window ending before it
+                          starts wraps around midnight (e.g. 22:00 to 06:00).
+            max_duration: Longest duration, in minutes.
+            max_miles: Highest miles cost.
+            fare_types: Fare types whose miles are considered, e.g. {'SMILES_CLUB'}.
+        """
+        self.max_stops = max_stops
+        self.airlines = frozenset(airline.upper() for airline in airlines) if airlines else None
+        self.departure_from = departure_from.isoformat() if departure_from else None
+        self.departure_to = departure_to.isoformat() if departure_to else None
+        self.max_duration = max_duration
+        self.max_miles = max_miles
+        self.fare_types = frozenset(fare_types) if fare_types else None
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in vars(self).values())
+
+    @property
+    def applies_to_parsed(self) -> bool:
+        """
+        Whether parsed flights can be checked with accepts(). A parsed flight only
+        keeps its cheapest fare, so fare type conditions need the raw response.
+        """
+        return self.fare_types is None
+
+    def stops_allowed(self, stops: Optional[int]) -> bool:
+        return self.max_stops is None or (stops or 0) <= self.max_stops
+
+    def airline_allowed(self, airline: Optional[str]) -> bool:
+        return self.airlines is None or (airline or '').upper() in self.airlines
+
+    def duration_allowed(self, hours: Optional[int], minutes: Optional[int]) -> bool:
+        if self.max_duration is None:
+            return True
+        if hours is None and minutes is None:
+            return False
+        return (hours or 0) * 60 + (minutes or 0) <= self.max_duration
+
+    def miles_allowed(self, miles: int) -> bool:
+        return self.max_miles is None or miles <= self.max_miles
+
+    def departure_allowed(self, departure: Optional[str]) -> bool:
+        """
+        Checks the time of day of an ISO departure string ('2025-03-10T08:30:00')
+        by comparing its 'HH:MM:SS' slice, without parsing it.
+        """
+        if self.departure_from is None and self.departure_to is None:
+            return True
+        if not departure or len(departure) < 19:
+            return False
+        time_of_day = departure[11:19]
+        after_start = self.departure_from is None or time_of_day >= self.departure_from
+        before_end = self.departure_to is None or time_of_day <= self.departure_to
+        if self.departure_from and self.departure_to and self.departure_from > self.departure_to:
+            return after_start or before_end
+        return after_start and before_end
+
+    def accepts(self, flight: FlightLike) -> bool:
+        """
+        Checks a parsed flight. Fare types are not checked, see applies_to_parsed.
+        """
+        return (
+            self.miles_allowed(flight['miles_cost'])
+            and self.stops_allowed(flight.get('number_of_stops'))
+            and self.airline_allowed(flight.get('airline'))
+            and self.duration_allowed(flight.get('duration_hours'), flight.get('duration_minutes'))
+            and self.departure_allowed(flight.get('departure_time'))
+        )
+
+    def apply(self, flights: Iterable[FlightLike]) -> List[FlightLike]:
+        """
+        Returns the parsed flights accepted by the filters, keeping their order.
+        """
+        return [flight for flight in flights if self.accepts(flight)]
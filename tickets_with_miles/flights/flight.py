@@ -0,0 +1,110 @@
+import sys
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+class Flight:
+    """
+    Compact record of a parsed flight.
+
+    Uses __slots__ instead of a per-instance dict, and interns the values shared
+    by many flights (airline, airports), so a result set takes a fraction of the
+    memory of the equivalent dicts. The booking URL is passed in once per day and
+    shared by every flight of that day. Item access (flight['miles_cost']) is
+    supported so code and templates written for the dict format keep working.
+    """
+
+    FIELDS = (
+        'airline',
+        'miles_cost',
+        'duration_hours',
+        'duration_minutes',
+        'departure_time',
+        'departure_airport',
+        'number_of_stops',
+        'arrival_time',
+        'arrival_airport',
+        'smiles_url',
+        'fetched_at',
+    )
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        airline: Optional[str] = None,
+        miles_cost: int = -1,
+        duration_hours: Optional[int] = None,
+        duration_minutes: Optional[int] = None,
+        departure_time: Optional[str] = None,
+        departure_airport: Optional[str] = None,
+        number_of_stops: int = 0,
+        arrival_time: Optional[str] = None,
+        arrival_airport: Optional[str] = None,
+        smiles_url: Optional[str] = None,
+        fetched_at: Optional[int] = None,
+    ):
+        self.airline = _intern(airline)
+        self.miles_cost = miles_cost
+        self.duration_hours = duration_hours
+        self.duration_minutes = duration_minutes
+        self.departure_time = departure_time
+        self.departure_airport = _intern(departure_airport)
+        self.number_of_stops = number_of_stops
+        self.arrival_time = arrival_time
+        self.arrival_airport = _intern(arrival_airport)
+        self.smiles_url = smiles_url
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Flight':
+        """
+        Builds a Flight from its dict format. Unknown keys are ignored.
+        """
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the flight in its dict format, e.g. for JSON or the session.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def to_row(self) -> Tuple[Any, ...]:
+        """
+        Returns the field values in FIELDS order.
+        """
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field, default) if field in self.FIELDS else default
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Flight):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __repr__(self) -> str:
+        return (
+            f"Flight({self.airline!r}, {self.departure_airport}->{self.arrival_airport}, "
+            f"{self.departure_time!r}, {self.miles_cost} miles)"
+        )
+
+    def __reduce__(self):
+        # Pickle as a plain tuple of values, e.g. in the Django fare cache
+        return self.__class__, self.to_row()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def to_dict(flight: Union[Flight, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Returns a flight in its dict format, whether it is a Flight or already a dict
+    (e.g. entries cached before Flight was introduced).
+    """
+    return flight.to_dict() if isinstance(flight, Flight) else flight
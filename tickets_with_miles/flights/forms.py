@@ -1,22 +1,33 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from datetime import datetime, date, timedelta
-from .models import Airport
+from datetime import datetime, date, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from .airport_groups import expand_airport_codes, get_airport_groups, split_airport_codes
+from .airport_index import AirportIndex, aget_airport_index, get_airport_index
+from .filters import FlightFilters
+from .search_window import MAX_DAYS_AHEAD
 
 class FlightSearchForm(forms.Form):
     """
     A form to validate and process flight search inputs.
     """
-    ORIGIN_PLACEHOLDER = 'Ex.: CNF'
-    DESTINATION_PLACEHOLDER = 'Ex.: GRU'
-    ALLOWED_FORWARD_SEARCH_DAYS = 329
+    ORIGIN_PLACEHOLDER = 'Ex.: CNF ou SAO'
+    DESTINATION_PLACEHOLDER = 'Ex.: GRU ou LIS, OPO'
+    MAX_AIRPORT_CODES_LENGTH = 40
+    MAX_ROUTES = 9
+    # Route-days searched by one submission: as many as the widest one-way search
+    MAX_SEARCHES = 270
+    ALLOWED_FORWARD_SEARCH_DAYS = MAX_DAYS_AHEAD
     DATE_INPUT_FORMATS = ['%Y-%m-%d', '%d/%m/%Y']
 
     ERROR_MESSAGES = {
         'origin': "O código da origem não é válido.",
         'destination': "O código do destino não é válido.",
         'date_past': "A data não pode ser no passado.",
-        'very_future_date': "A data está muito distante."
+        'very_future_date': "A data está muito distante.",
+        'too_many_routes': "Escolha no máximo {max_routes} combinações de origem e destino.",
+        'stay_range': "A estadia mínima não pode ser maior que a máxima.",
+        'too_many_searches': "A busca é ampla demais. Reduza os aeroportos, a flexibilidade ou a estadia.",
     }
 
     FLEXIBILITY_CHOICES = [
@@ -27,15 +38,16 @@ class FlightSearchForm(forms.Form):
         (30, '30 dias'),
     ]
 
+    # One or more comma-separated IATA or metro area codes
     origin = forms.CharField(
         label='Origem',
-        max_length=3,
+        max_length=MAX_AIRPORT_CODES_LENGTH,
         min_length=3,
         widget=forms.TextInput(attrs={'placeholder': ORIGIN_PLACEHOLDER}),
     )
     destination = forms.CharField(
         label='Destino',
-        max_length=3,
+        max_length=MAX_AIRPORT_CODES_LENGTH,
         min_length=3,
         widget=forms.TextInput(attrs={'placeholder': DESTINATION_PLACEHOLDER}),
     )
@@ -51,23 +63,181 @@ class FlightSearchForm(forms.Form):
         initial=0,
     )
 
+    # Round trips return between min_stay and max_stay days after departure
+    DEFAULT_MIN_STAY = 1
+    DEFAULT_MAX_STAY = 7
+    MAX_STAY_DAYS = 30
+
+    round_trip = forms.BooleanField(
+        label='Ida e volta',
+        required=False,
+    )
+    min_stay = forms.IntegerField(
+        label='Estadia mínima (dias)',
+        min_value=0,
+        max_value=MAX_STAY_DAYS,
+        required=False,
+        widget=forms.NumberInput(attrs={'placeholder': DEFAULT_MIN_STAY}),
+    )
+    max_stay = forms.IntegerField(
+        label='Estadia máxima (dias)',
+        min_value=0,
+        max_value=MAX_STAY_DAYS,
+        required=False,
+        widget=forms.NumberInput(attrs={'placeholder': DEFAULT_MAX_STAY}),
+    )
+
+    # Optional result filters, applied by FlightService while parsing the results
+    MAX_STOPS_CHOICES = [
+        ('', 'Qualquer'),
+        (0, 'Somente voos diretos'),
+        (1, 'Até 1 conexão'),
+        (2, 'Até 2 conexões'),
+    ]
+
+    FARE_TYPE_CHOICES = [
+        ('', 'Todas'),
+        ('SMILES', 'Smiles'),
+        ('SMILES_CLUB', 'Clube Smiles'),
+    ]
+
+    FILTER_FIELDS = [
+        'max_stops', 'airlines', 'departure_from', 'departure_to', 'max_duration', 'max_miles', 'fare_type',
+    ]
+
+    max_stops = forms.TypedChoiceField(
+        label='Conexões',
+        choices=MAX_STOPS_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+    airlines = forms.CharField(
+        label='Companhias aéreas',
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(attrs={'placeholder': 'Ex.: GOL, LATAM'}),
+    )
+    departure_from = forms.TimeField(
+        label='Partida a partir de',
+        widget=forms.TimeInput(attrs={'type': 'time'}, format='%H:%M'),
+        required=False,
+    )
+    departure_to = forms.TimeField(
+        label='Partida até',
+        widget=forms.TimeInput(attrs={'type': 'time'}, format='%H:%M'),
+        required=False,
+    )
+    max_duration = forms.IntegerField(
+        label='Duração máxima (horas)',
+        min_value=1,
+        required=False,
+    )
+    max_miles = forms.IntegerField(
+        label='Milhas máximas',
+        min_value=1,
+        required=False,
+    )
+    fare_type = forms.ChoiceField(
+        label='Tarifa',
+        choices=FARE_TYPE_CHOICES,
+        required=False,
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Set by ais_valid() so validation doesn't depend on the shared index staying loaded
+        self.airport_index = None
+
+    def get_airport_index(self) -> AirportIndex:
+        if self.airport_index is not None:
+            return self.airport_index
+        return get_airport_index()
+
+    def clean_airport_codes(self, field: str) -> str:
+        """
+        Validates that every code of a field is a metro area or exists in the airport index.
+
+        Returns:
+            The codes, upper-cased and comma-separated.
+        """
+        codes = split_airport_codes(self.cleaned_data[field])
+        airport_index = self.get_airport_index()
+        groups = get_airport_groups()
+        if not codes or any(code not in groups and code not in airport_index for code in codes):
+            raise ValidationError(self.ERROR_MESSAGES[field])
+        return ','.join(codes)
+
     def clean_origin(self) -> str:
         """
-        Validates that the origin IATA code exists in the database.
+        Validates that the origin codes exist in the airport index.
         """
-        origin = self.cleaned_data['origin'].upper()
-        if not Airport.objects.filter(iata_code=origin).exists():
-            raise ValidationError(self.ERROR_MESSAGES['origin'])
-        return origin
+        return self.clean_airport_codes('origin')
 
     def clean_destination(self) -> str:
         """
-        Validates that the destination IATA code exists in the database.
+        Validates that the destination codes exist in the airport index.
+        """
+        return self.clean_airport_codes('destination')
+
+    def clean(self) -> Dict[str, Any]:
+        """
+        Limits how many routes a multi-airport search fans out to, fills in and
+        checks the stay range of round trips, and limits the total route-days searched.
+        """
+        cleaned_data = super().clean()
+        origin, destination = cleaned_data.get('origin'), cleaned_data.get('destination')
+        routes = 0
+        if origin and destination:
+            routes = len(expand_airport_codes(origin)) * len(expand_airport_codes(destination))
+            if routes > self.MAX_ROUTES:
+                raise ValidationError(self.ERROR_MESSAGES['too_many_routes'].format(max_routes=self.MAX_ROUTES))
+
+        if cleaned_data.get('round_trip'):
+            min_stay = cleaned_data.get('min_stay')
+            max_stay = cleaned_data.get('max_stay')
+            if min_stay is None:
+                min_stay = self.DEFAULT_MIN_STAY if max_stay is None else min(self.DEFAULT_MIN_STAY, max_stay)
+            if max_stay is None:
+                max_stay = max(self.DEFAULT_MAX_STAY, min_stay)
+            if min_stay > max_stay:
+                raise ValidationError(self.ERROR_MESSAGES['stay_range'])
+            cleaned_data['min_stay'], cleaned_data['max_stay'] = min_stay, max_stay
+
+        if routes * self.count_search_days(cleaned_data) > self.MAX_SEARCHES:
+            raise ValidationError(self.ERROR_MESSAGES['too_many_searches'])
+        return cleaned_data
+
+    @staticmethod
+    def count_search_days(cleaned_data: Dict[str, Any]) -> int:
+        """
+        Returns the days searched per route, as FlightService builds them: the
+        flexibility window, plus for round trips the inbound window, which spans
+        the outbound one widened by the stay range.
+        """
+        if 'flexibility' not in cleaned_data:
+            return 1
+        days = max(int(cleaned_data['flexibility'] or 0), 1)
+        if cleaned_data.get('round_trip'):
+            days += days + cleaned_data['max_stay'] - cleaned_data['min_stay']
+        return days
+
+    def get_stay_range(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (min_stay, max_stay) days of a round trip search, or None for
+        a one-way search.
         """
-        destination = self.cleaned_data['destination'].upper()
-        if not Airport.objects.filter(iata_code=destination).exists():
-            raise ValidationError(self.ERROR_MESSAGES['destination'])
-        return destination
+        if not self.cleaned_data.get('round_trip'):
+            return None
+        return self.cleaned_data['min_stay'], self.cleaned_data['max_stay']
+
+    async def ais_valid(self) -> bool:
+        """
+        Async counterpart of is_valid() for async views. Loads the airport index with
+        async queries if needed, so validation itself never touches the database.
+        """
+        self.airport_index = await aget_airport_index()
+        return self.is_valid()
 
     def clean_date(self) -> datetime.date:
         """
@@ -78,4 +248,80 @@ class FlightSearchForm(forms.Form):
             raise ValidationError(self.ERROR_MESSAGES['date_past'])
         elif departure_date > date.today() + timedelta(days=self.ALLOWED_FORWARD_SEARCH_DAYS):
             raise ValidationError(self.ERROR_MESSAGES['very_future_date'])
-        return departure_date
\ No newline at end of file
+        return departure_date
+
+    def clean_airlines(self) -> List[str]:
+        """
+        Splits the comma-separated airline names.
+        """
+        airlines = self.cleaned_data['airlines']
+        return [airline.strip() for airline in airlines.split(',') if airline.strip()]
+
+    def get_filters(self) -> Optional[FlightFilters]:
+        """
+        Builds the result filters from the cleaned data.
+
+        Returns:
+            The FlightFilters, or None if no filter was set.
+        """
+        data = self.cleaned_data
+        filters = FlightFilters(
+            max_stops=data.get('max_stops'),
+            airlines=data.get('airlines'),
+            departure_from=data.get('departure_from'),
+            departure_to=data.get('departure_to'),
+            max_duration=data['max_duration'] * 60 if data.get('max_duration') else None,
+            max_miles=data.get('max_miles'),
+            fare_types=[data['fare_type']] if data.get('fare_type') else None,
+        )
+        return filters or None
+
+    def get_filter_data(self) -> Dict[str, Any]:
+        """
+        Returns the filters that were set as JSON-serializable initial data, so a
+        stored search can be shown with its filters.
+        """
+        data = {}
+        for name in self.FILTER_FIELDS:
+            value = self.cleaned_data.get(name)
+            if value in (None, '', []):
+                continue
+            if isinstance(value, time):
+                value = value.strftime('%H:%M')
+            elif isinstance(value, list):
+                value = ', '.join(value)
+            data[name] = value
+        return data
+
+
+class FareCalendarForm(FlightSearchForm):
+    """
+    A form to validate cheapest-fare calendar requests: the route and filters of
+    FlightSearchForm, and an optional first day that defaults to today. The calendar
+    runs from that day to the end of the searchable window.
+    """
+    flexibility = None
+    round_trip = None
+    min_stay = None
+    max_stay = None
+
+    date = forms.DateField(
+        label='Data inicial',
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        input_formats=FlightSearchForm.DATE_INPUT_FORMATS,
+        required=False,
+    )
+
+    def clean_date(self) -> datetime.date:
+        """
+        Defaults the first day to today, then validates it like a departure date.
+        """
+        if self.cleaned_data['date'] is None:
+            self.cleaned_data['date'] = date.today()
+        return super().clean_date()
+
+    def get_calendar_days(self) -> int:
+        """
+        Returns the number of days from the first day to the end of the searchable window.
+        """
+        return self.ALLOWED_FORWARD_SEARCH_DAYS - (self.cleaned_data['date'] - date.today()).days + 1
@@ -0,0 +1,171 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Coroutine, Optional
+from django.conf import settings
+
+from .session_pool import session_pool
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopBridge:
+    """
+    Process-wide event loop running in a daemon thread.
+
+    Sync code (WSGI views, management commands) submits coroutines to it instead
+    of calling asyncio.run, so the pooled sessions, the scheduler, the coalescer
+    and background refreshes outlive a single request. The loop is started on
+    first use, or at startup with start(), and restarted in child processes after
+    a fork. With `warm_up_api` set, every start also pre-connects to the API host.
+    """
+
+    DEFAULT_TIMEOUT = 120  # seconds
+
+    def __init__(self, name: str = 'flights-event-loop'):
+        """
+        Initialize the EventLoopBridge.
+
+        Args:
+            name: Name of the thread running the loop.
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.warm_up_api = False
+        # Set by wsgi.py: async views then run their searches here too
+        self.serves_wsgi = False
+
+    @property
+    def timeout(self) -> float:
+        return getattr(settings, 'FLIGHT_EVENT_LOOP_TIMEOUT', self.DEFAULT_TIMEOUT)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Returns the bridge loop, starting its thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._start()
+            return self._loop
+
+    def start(self) -> None:
+        """
+        Starts the loop thread now rather than on first use, e.g. from wsgi.py.
+        """
+        self.loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        thread = threading.Thread(target=self._run_loop, args=(loop, ready), name=self.name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop = loop
+        self._thread = thread
+        self._pid = os.getpid()
+
+        if self.warm_up_api:
+            from .api_client import FlightAPIClient
+            asyncio.run_coroutine_threadsafe(FlightAPIClient().warm_up(), loop)
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """
+        Schedules a coroutine on the bridge loop.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            A concurrent Future with the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Runs a coroutine on the bridge loop and blocks until it finishes.
+
+        Args:
+            coro: The coroutine to run.
+            timeout: Seconds to wait. Defaults to settings.FLIGHT_EVENT_LOOP_TIMEOUT.
+
+        Returns:
+            The coroutine's result.
+
+        Raises:
+            TimeoutError: The coroutine didn't finish in time; it is cancelled.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def arun(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """
+        Awaits a coroutine on the bridge loop from any other event loop.
+        Cancelling the caller cancels the coroutine.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            The coroutine's result.
+        """
+        if asyncio.get_running_loop() is self.loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self, timeout: float = 5) -> None:
+        """
+        Closes the pooled session, stops the loop and waits for its thread.
+
+        Args:
+            timeout: Seconds to wait for the shutdown.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or self._pid != os.getpid() or not thread.is_alive():
+                self._reset()
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(session_pool.close(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Failed to close the pooled session: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+            self._reset()
+
+    def _reset(self) -> None:
+        self._loop = None
+        self._thread = None
+        self._pid = None
+
+    def _after_fork_in_child(self) -> None:
+        # The loop thread doesn't survive a fork and the lock may have been held
+        # by another thread, so the child starts over with fresh state
+        self._lock = threading.Lock()
+        self._reset()
+
+
+# Shared bridge for sync callers in this process.
+loop_bridge = EventLoopBridge()
+
+atexit.register(loop_bridge.stop)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=loop_bridge._after_fork_in_child)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from flights.price_watch import PriceWatchEvaluator
+from flights.snapshots import flush_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks every active price watch against the current fares and records the '
+        'alerts of the watches whose threshold was met. Each route and day is searched once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=PriceWatchEvaluator.DEFAULT_BATCH_SIZE,
+            help='Days searched at once.',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        try:
+            stats = PriceWatchEvaluator(batch_size=kwargs['batch_size']).run()
+        except Exception as e:
+            raise CommandError(f'Price watch check failed: {e}')
+
+        # The snapshot writer thread is a daemon; write what it holds before exiting
+        try:
+            flush_snapshots()
+        except Exception as e:
+            self.stderr.write(self.style.WARNING(f'Failed to write fare snapshots: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Price watches checked! {stats.watches} watches, {stats.routes} routes, '
+            f'{stats.days} days searched, {stats.failed} failed, {stats.alerts} new alerts.'
+        ))
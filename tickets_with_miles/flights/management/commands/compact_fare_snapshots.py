@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from flights.snapshots import compact_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacts the fare snapshot history: rolls old observations up to the cheapest per '
+        'route, flight date and day, and deletes flight dates past the retention period.'
+    )
+
+    DEFAULT_RAW_DAYS = 7
+    DEFAULT_HISTORY_DAYS = 365
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'FARE_SNAPSHOTS', {})
+        parser.add_argument(
+            '--raw-days', type=int, default=config.get('RAW_DAYS', self.DEFAULT_RAW_DAYS),
+            help='Days every observation is kept before it is rolled up.',
+        )
+        parser.add_argument(
+            '--history-days', type=int, default=config.get('HISTORY_DAYS', self.DEFAULT_HISTORY_DAYS),
+            help='Days past its flight date a snapshot is kept.',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['raw_days'] < 0 or kwargs['history_days'] < 0:
+            raise CommandError('--raw-days and --history-days must not be negative.')
+
+        expired, rolled_up = compact_snapshots(kwargs['raw_days'], kwargs['history_days'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Fare snapshots compacted! {expired} expired and {rolled_up} rolled up rows deleted.'
+        ))
@@ -1,24 +1,92 @@
 import os
 import csv
-from django.core.management.base import BaseCommand
+from typing import Dict, Iterator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from flights.airport_index import DEFAULT_MAX_AGE, invalidate_airport_index
 from flights.models import Airport
 
+FIELDS = ['name', 'state_code', 'country_code', 'country_name']
+
+
 class Command(BaseCommand):
-    help = 'Loads airports from a CSV file'
+    help = 'Loads airports from a CSV file, inserting new airports and updating changed ones'
+
+    DEFAULT_BATCH_SIZE = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_path', nargs='?',
+            help='CSV file with name, iata_code, state_code, country_code and country_name '
+                 'columns. Defaults to the bundled flights/data/airports.csv.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE,
+            help='Number of rows per bulk INSERT or UPDATE.',
+        )
 
     def handle(self, *args, **kwargs):
+        csv_path = kwargs['csv_path'] or self.default_csv_path()
+        batch_size = kwargs['batch_size']
+        if not os.path.isfile(csv_path):
+            raise CommandError(f"File not found: {csv_path}")
+
+        with transaction.atomic():
+            existing = {airport.iata_code: airport for airport in Airport.objects.all()}
+            to_create: Dict[str, Airport] = {}
+            to_update: Dict[str, Airport] = {}
+            unchanged = 0
+
+            for row in self.read_rows(csv_path):
+                iata_code = row['iata_code']
+                airport = existing.get(iata_code)
+                if airport is None:
+                    # A code repeated in the file is loaded from its last row
+                    to_create[iata_code] = Airport(iata_code=iata_code, **{field: row[field] for field in FIELDS})
+                elif any(getattr(airport, field) != row[field] for field in FIELDS):
+                    for field in FIELDS:
+                        setattr(airport, field, row[field])
+                    to_update[iata_code] = airport
+                else:
+                    unchanged += 1
+
+            Airport.objects.bulk_create(to_create.values(), batch_size=batch_size)
+            Airport.objects.bulk_update(to_update.values(), FIELDS, batch_size=batch_size)
+
+        # Bulk operations don't send model signals. This only reaches the index of
+        # this process: running servers rebuild theirs within AIRPORT_INDEX_MAX_AGE.
+        if to_create or to_update:
+            invalidate_airport_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Airports loaded with success! {len(to_create)} inserted, '
+            f'{len(to_update)} updated, {unchanged} unchanged.'
+        ))
+        if to_create or to_update:
+            max_age = getattr(settings, 'AIRPORT_INDEX_MAX_AGE', DEFAULT_MAX_AGE)
+            self.stdout.write(
+                f'Running servers pick up the changes within {max_age} seconds '
+                f'(AIRPORT_INDEX_MAX_AGE), or when restarted.'
+            )
 
+    @staticmethod
+    def default_csv_path() -> str:
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        csv_path = os.path.join(base_dir, 'data', 'airports.csv')
+        return os.path.join(base_dir, 'data', 'airports.csv')
 
-        with open(csv_path, 'r') as file:
+    @staticmethod
+    def read_rows(csv_path: str) -> Iterator[Dict[str, str]]:
+        """
+        Yields the CSV rows one at a time with normalized values.
+        """
+        with open(csv_path, 'r', encoding='utf-8', newline='') as file:
             reader = csv.DictReader(file)
+            missing = {'iata_code', *FIELDS} - set(reader.fieldnames or [])
+            if missing:
+                raise CommandError(f"Missing columns in {csv_path}: {', '.join(sorted(missing))}")
             for row in reader:
-                Airport.objects.create(
-                    name = row['name'],
-                    iata_code = row['iata_code'],
-                    state_code =row['state_code'],
-                    country_code = row['country_code'],
-                    country_name = row['country_name'],
-                )
-        self.stdout.write(self.style.SUCCESS('Airports loaded with success!'))
\ No newline at end of file
+                iata_code = row['iata_code'].strip().upper()
+                if not iata_code:
+                    continue
+                yield {'iata_code': iata_code, **{field: (row[field] or '').strip() for field in FIELDS}}
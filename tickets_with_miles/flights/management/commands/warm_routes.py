@@ -0,0 +1,131 @@
+import time
+from typing import List
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from flights.fare_cache import get_fare_cache
+from flights.loop_bridge import loop_bridge
+from flights.snapshots import flush_snapshots
+from flights.warmup import Route, RouteTraffic, RouteWarmer, WarmUpStats, parse_route
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-fetches the upcoming days of popular routes into the fare cache. Routes are '
+        'given as ORIGIN-DESTINATION, taken from settings.ROUTE_WARMUP["ROUTES"] or derived '
+        'from recent search traffic. Runs one cycle, or one every --interval seconds.'
+    )
+
+    DEFAULT_TOP_ROUTES = 20
+    CYCLE_TIMEOUT = 3600  # seconds
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'ROUTE_WARMUP', {})
+        parser.add_argument(
+            'routes', nargs='*',
+            help='Routes such as GRU-LIS or SAO-RIO. Defaults to settings.ROUTE_WARMUP["ROUTES"].',
+        )
+        parser.add_argument(
+            '--from-traffic', action='store_true',
+            help='Also warm the most searched routes of the recent search traffic.',
+        )
+        parser.add_argument(
+            '--top', type=int, default=config.get('TOP_ROUTES', self.DEFAULT_TOP_ROUTES),
+            help='Number of routes taken from the search traffic.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=config.get('DAYS', RouteWarmer.DEFAULT_DAYS),
+            help='Number of upcoming days warmed per route.',
+        )
+        parser.add_argument(
+            '--budget', type=int, default=config.get('BUDGET', RouteWarmer.DEFAULT_BUDGET),
+            help='Most days fetched per cycle.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=config.get('CONCURRENCY', RouteWarmer.DEFAULT_CONCURRENCY),
+            help='Days fetched at once.',
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Seconds between cycles. 0 runs a single cycle, e.g. from cron.',
+        )
+
+    def handle(self, *args, **kwargs):
+        config = getattr(settings, 'ROUTE_WARMUP', {})
+        route_names = kwargs['routes'] or config.get('ROUTES', [])
+        try:
+            routes = [route for name in route_names for route in parse_route(name)]
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not routes and not kwargs['from_traffic']:
+            raise CommandError('No routes given. Pass routes, set ROUTE_WARMUP["ROUTES"] or use --from-traffic.')
+        if kwargs['budget'] < 0 or kwargs['concurrency'] < 1 or kwargs['days'] < 1:
+            raise CommandError('--days and --concurrency must be positive and --budget not negative.')
+
+        fare_cache = get_fare_cache()
+        if fare_cache is None or not fare_cache.is_shared:
+            # Every fetch would fill a cache no web process reads
+            raise CommandError(
+                'FARE_CACHE is disabled or local to each process, so the warmed days would only be '
+                'visible to this command. Use the "django" backend with a shared cache such as '
+                'Redis or Memcached.'
+            )
+
+        traffic = RouteTraffic()
+        if not traffic.is_shared:
+            if kwargs['from_traffic']:
+                raise CommandError(
+                    f'--from-traffic needs the search traffic of the web processes, but cache '
+                    f'"{traffic.alias}" is local to each process. Point ROUTE_WARMUP["CACHE_ALIAS"] '
+                    f'to a shared cache.'
+                )
+            self.stderr.write(self.style.WARNING(
+                f'Cache "{traffic.alias}" is local to each process, so the warm-up can\'t see '
+                f'user searches and won\'t pause for them. Point ROUTE_WARMUP["CACHE_ALIAS"] '
+                f'to a shared cache.'
+            ))
+
+        warmer = RouteWarmer(
+            days=kwargs['days'],
+            budget=kwargs['budget'],
+            concurrency=kwargs['concurrency'],
+        )
+
+        try:
+            while True:
+                cycle_routes = self.cycle_routes(routes, traffic, kwargs['from_traffic'], kwargs['top'])
+                try:
+                    # Run on the process-wide loop, like the sync FlightService entry points
+                    stats = loop_bridge.run(warmer.warm(cycle_routes), timeout=self.CYCLE_TIMEOUT)
+                except Exception as e:
+                    if kwargs['interval'] <= 0:
+                        raise CommandError(f'Route warm-up failed: {e}')
+                    # A long-running worker carries on with the next cycle
+                    self.stderr.write(self.style.ERROR(f'Route warm-up cycle failed: {e}'))
+                else:
+                    self.report(stats)
+                if kwargs['interval'] <= 0:
+                    break
+                time.sleep(kwargs['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Route warm-up stopped.')
+
+        # The snapshot writer thread is a daemon; write what it holds before exiting
+        try:
+            flush_snapshots()
+        except Exception as e:
+            self.stderr.write(self.style.WARNING(f'Failed to write fare snapshots: {e}'))
+
+    @staticmethod
+    def cycle_routes(routes: List[Route], traffic: RouteTraffic, from_traffic: bool, top: int) -> List[Route]:
+        """
+        Returns the routes of a cycle: the given ones first, then the most searched ones.
+        """
+        if not from_traffic:
+            return routes
+        return list(dict.fromkeys([*routes, *traffic.top_routes(top)]))
+
+    def report(self, stats: WarmUpStats) -> None:
+        self.stdout.write(self.style.SUCCESS(
+            f'Routes warmed! {stats.routes} routes, {stats.fetched} days fetched, '
+            f'{stats.fresh} already fresh, {stats.skipped} over budget, {stats.failed} failed.'
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0002_alter_airport_iata_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FareSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin', models.CharField(max_length=3)),
+                ('destination', models.CharField(max_length=3)),
+                ('flight_date', models.DateField()),
+                ('airline', models.CharField(blank=True, max_length=100)),
+                ('stops', models.PositiveSmallIntegerField(default=0)),
+                ('duration_minutes', models.PositiveIntegerField(blank=True, null=True)),
+                ('miles', models.PositiveIntegerField()),
+                ('observed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['origin', 'destination', 'flight_date', 'observed_at'], name='fare_snapshot_history_idx'), models.Index(fields=['origin', 'destination', 'flight_date', 'miles'], name='fare_snapshot_cheapest_idx'), models.Index(fields=['observed_at'], name='fare_snapshot_observed_idx')],
+            },
+        ),
+    ]
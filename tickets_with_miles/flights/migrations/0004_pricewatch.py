@@ -0,0 +1,45 @@
+# Generated by Django 5.1.3 on 2026-10-17 21:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0003_faresnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceWatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('origin', models.CharField(max_length=3)),
+                ('destination', models.CharField(max_length=3)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('max_miles', models.PositiveIntegerField()),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['active', 'end_date'], name='price_watch_active_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_date', models.DateField()),
+                ('miles', models.PositiveIntegerField()),
+                ('airline', models.CharField(blank=True, max_length=100)),
+                ('triggered_at', models.DateTimeField(auto_now_add=True)),
+                ('watch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='flights.pricewatch')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('watch', 'flight_date', 'miles'), name='price_alert_unique')],
+            },
+        ),
+    ]
@@ -1,4 +1,8 @@
+from datetime import date
+from typing import Optional
 from django.db import models
+from django.db.models import Count, Min
+from django.db.models.functions import TruncMonth
 
 class Airport(models.Model):
     name = models.CharField(max_length=255)
@@ -9,3 +13,103 @@ class Airport(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.iata_code})"
+
+
+class FareSnapshotQuerySet(models.QuerySet):
+    def route(self, origin: str, destination: str) -> 'FareSnapshotQuerySet':
+        return self.filter(origin=origin, destination=destination)
+
+    def price_history(self, origin: str, destination: str, flight_date: date) -> 'FareSnapshotQuerySet':
+        """
+        Observations of a route on one flight date, oldest first. Served by the
+        (origin, destination, flight_date, observed_at) index.
+        """
+        return self.route(origin, destination).filter(flight_date=flight_date).order_by('observed_at')
+
+    def cheapest_per_month(self, origin: Optional[str] = None, destination: Optional[str] = None):
+        """
+        Cheapest miles ever observed per route and flight month, as dictionaries with
+        'origin', 'destination', 'month', 'miles' and 'observations'. Served by the
+        (origin, destination, flight_date, miles) index.
+        """
+        snapshots = self
+        if origin:
+            snapshots = snapshots.filter(origin=origin)
+        if destination:
+            snapshots = snapshots.filter(destination=destination)
+        return (
+            snapshots
+            .values('origin', 'destination', month=TruncMonth('flight_date'))
+            .annotate(miles=Min('miles'), observations=Count('id'))
+            .order_by('origin', 'destination', 'month')
+        )
+
+
+class FareSnapshot(models.Model):
+    """
+    One flight as observed in a search result, kept to answer price history questions.
+    """
+    origin = models.CharField(max_length=3)
+    destination = models.CharField(max_length=3)
+    flight_date = models.DateField()
+    airline = models.CharField(max_length=100, blank=True)
+    stops = models.PositiveSmallIntegerField(default=0)
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True)
+    miles = models.PositiveIntegerField()
+    observed_at = models.DateTimeField()
+
+    objects = FareSnapshotQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['origin', 'destination', 'flight_date', 'observed_at'], name='fare_snapshot_history_idx'),
+            models.Index(fields=['origin', 'destination', 'flight_date', 'miles'], name='fare_snapshot_cheapest_idx'),
+            models.Index(fields=['observed_at'], name='fare_snapshot_observed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.origin}-{self.destination} {self.flight_date}: {self.miles} miles ({self.observed_at:%Y-%m-%d %H:%M})"
+
+
+class PriceWatch(models.Model):
+    """
+    A user's request to be alerted when a route's fare drops to `max_miles` or less on
+    any day between `start_date` and `end_date`. Origin and destination may be metro
+    area codes, covering every airport of the area.
+    """
+    email = models.EmailField()
+    origin = models.CharField(max_length=3)
+    destination = models.CharField(max_length=3)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    max_miles = models.PositiveIntegerField()
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['active', 'end_date'], name='price_watch_active_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.origin}-{self.destination} {self.start_date}..{self.end_date} <= {self.max_miles} miles"
+
+
+class PriceAlert(models.Model):
+    """
+    A fare that met a PriceWatch. The same watch, day and miles are recorded only once,
+    so re-evaluating the watches never repeats an alert.
+    """
+    watch = models.ForeignKey(PriceWatch, on_delete=models.CASCADE, related_name='alerts')
+    flight_date = models.DateField()
+    miles = models.PositiveIntegerField()
+    airline = models.CharField(max_length=100, blank=True)
+    triggered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['watch', 'flight_date', 'miles'], name='price_alert_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.watch}: {self.miles} miles on {self.flight_date}"
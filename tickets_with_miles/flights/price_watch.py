@@ -0,0 +1,253 @@
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .flight import Flight
+from .loop_bridge import loop_bridge
+from .models import PriceAlert, PriceWatch
+from .search_window import MAX_DAYS_AHEAD
+from .services import FlightService
+
+logger = logging.getLogger(__name__)
+
+FlightLike = Union[Flight, Dict[str, Any]]
+
+# (origin, destination) codes of a watch, possibly metro area codes
+Route = Tuple[str, str]
+
+
+class CheapestFareIndex:
+    """
+    Answers "cheapest fare between two dates" for one route in O(1) per query.
+
+    The days are kept sorted, and a sparse table holds the cheapest (miles, position)
+    of every run of 2**k days, so any window is covered by two overlapping runs.
+    Building it costs O(days log days), after which every watch of the route is
+    checked with a pair of bisections and two lookups.
+    """
+
+    def __init__(self, cheapest: Dict[date, Optional[FlightLike]]):
+        """
+        Initialize the CheapestFareIndex.
+
+        Args:
+            cheapest: Cheapest flight of each known day, None for days without flights.
+        """
+        priced = sorted((day, flight) for day, flight in cheapest.items() if flight is not None)
+        self.days = [day for day, _ in priced]
+        self.flights = [flight for _, flight in priced]
+        row = [(flight['miles_cost'], position) for position, flight in enumerate(self.flights)]
+        self.table = [row]
+        span = 1
+        while span * 2 <= len(row):
+            row = [min(row[i], row[i + span]) for i in range(len(row) - span)]
+            self.table.append(row)
+            span *= 2
+
+    def cheapest(self, start_date: date, end_date: date) -> Optional[Tuple[date, FlightLike]]:
+        """
+        Returns the (day, flight) of the cheapest fare between two dates, both
+        included, or None if no day of the window has flights.
+        """
+        first = bisect_left(self.days, start_date)
+        last = bisect_right(self.days, end_date) - 1
+        if first > last:
+            return None
+        level = (last - first + 1).bit_length() - 1
+        _, position = min(self.table[level][first], self.table[level][last - (1 << level) + 1])
+        return self.days[position], self.flights[position]
+
+
+class PriceWatchStats:
+    """
+    What one evaluation of the price watches did.
+    """
+
+    def __init__(self):
+        self.watches = 0
+        self.routes = 0
+        self.days = 0
+        self.failed = 0
+        self.alerts = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"PriceWatchStats(watches={self.watches}, routes={self.routes}, days={self.days}, "
+            f"failed={self.failed}, alerts={self.alerts})"
+        )
+
+
+class PriceWatchEvaluator:
+    """
+    Checks every active PriceWatch in one batch.
+
+    Watches are grouped by route and their date windows merged, so each distinct
+    route and day is searched once however many watches cover it. The days come
+    from the fare cache when possible and are otherwise fetched at WATCH_PRIORITY,
+    behind user searches. The cheapest fare of each day then feeds a
+    CheapestFareIndex per route, against which every watch's threshold is checked
+    in a single pass. Alerts are recorded idempotently, see PriceAlert.
+    """
+
+    WATCH_PRIORITY = 10
+    DEFAULT_BATCH_SIZE = 100
+    MAX_DAYS_AHEAD = MAX_DAYS_AHEAD  # days past the searchable window are never searched
+    FETCH_TIMEOUT = 3600  # seconds
+
+    def __init__(self, service: Optional[FlightService] = None, batch_size: Optional[int] = None):
+        """
+        Initialize the PriceWatchEvaluator.
+
+        Args:
+            service: The FlightService used to search the days.
+            batch_size: Searches requested from the FlightService at once.
+        """
+        self.service = service or FlightService()
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+
+    @staticmethod
+    def route_of(watch: PriceWatch) -> Route:
+        return watch.origin.upper(), watch.destination.upper()
+
+    def window(self, watch: PriceWatch, today: date) -> Optional[Tuple[date, date]]:
+        """
+        Returns the part of a watch's dates that can still be searched, or None.
+        """
+        start_date = max(watch.start_date, today)
+        end_date = min(watch.end_date, today + timedelta(days=self.MAX_DAYS_AHEAD))
+        return (start_date, end_date) if start_date <= end_date else None
+
+    def plan(self, watches: Iterable[PriceWatch], today: date) -> Dict[Route, List[date]]:
+        """
+        Lists the distinct days to search of each route, merging the windows of its watches.
+        """
+        days_by_route = defaultdict(set)
+        for watch in watches:
+            window = self.window(watch, today)
+            if window is None:
+                continue
+            start_date, end_date = window
+            days_by_route[self.route_of(watch)].update(
+                start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)
+            )
+        return {route: sorted(days) for route, days in days_by_route.items()}
+
+    async def fetch_cheapest(
+        self,
+        plan: Dict[Route, List[date]],
+        stats: PriceWatchStats,
+    ) -> Dict[Route, Dict[date, Optional[FlightLike]]]:
+        """
+        Searches every planned day in batches and keeps only its cheapest flight.
+        Days of a failed batch are left out, so no watch triggers on them.
+
+        Returns:
+            The cheapest flight of each searched day per route, None for days without flights.
+        """
+        searches = []
+        keys: List[Tuple[Route, date]] = []
+        for route, days in plan.items():
+            for day in days:
+                for search in self.service.build_searches(route[0], route[1], day, 1):
+                    searches.append(search)
+                    keys.append((route, day))
+
+        days_by_key: Dict[Tuple[Route, date], List[List[Flight]]] = defaultdict(list)
+        for start in range(0, len(searches), self.batch_size):
+            batch = searches[start:start + self.batch_size]
+            try:
+                days = await self.service.get_days(batch, priority=self.WATCH_PRIORITY)
+            except Exception as e:
+                logger.warning(f"Price watch batch failed: {e}")
+                stats.failed += len(batch)
+                continue
+            for key, day_flights in zip(keys[start:start + self.batch_size], days):
+                days_by_key[key].append(day_flights)
+
+        cheapest: Dict[Route, Dict[date, Optional[FlightLike]]] = defaultdict(dict)
+        for (route, day), route_days in days_by_key.items():
+            cheapest[route][day] = self.service.cheapest_of(route_days)
+        return cheapest
+
+    def evaluate(
+        self,
+        watches: Sequence[PriceWatch],
+        cheapest: Dict[Route, Dict[date, Optional[FlightLike]]],
+        today: date,
+    ) -> List[PriceAlert]:
+        """
+        Checks every watch against the cheapest fare of its window.
+
+        Returns:
+            One unsaved PriceAlert per watch whose window has a fare of at most its max_miles.
+        """
+        indexes = {route: CheapestFareIndex(days) for route, days in cheapest.items()}
+        alerts = []
+        for watch in watches:
+            window = self.window(watch, today)
+            index = indexes.get(self.route_of(watch))
+            if window is None or index is None:
+                continue
+            found = index.cheapest(*window)
+            if found is None:
+                continue
+            flight_date, flight = found
+            if flight['miles_cost'] <= watch.max_miles:
+                alerts.append(PriceAlert(
+                    watch=watch,
+                    flight_date=flight_date,
+                    miles=flight['miles_cost'],
+                    airline=(flight.get('airline') or '')[:100],
+                ))
+        return alerts
+
+    @staticmethod
+    def record(alerts: List[PriceAlert]) -> List[PriceAlert]:
+        """
+        Saves the alerts not recorded yet.
+
+        Returns:
+            The newly recorded alerts.
+        """
+        if not alerts:
+            return []
+        existing = set(
+            PriceAlert.objects
+            .filter(watch_id__in={alert.watch_id for alert in alerts})
+            .values_list('watch_id', 'flight_date', 'miles')
+        )
+        new_alerts = [
+            alert for alert in alerts
+            if (alert.watch_id, alert.flight_date, alert.miles) not in existing
+        ]
+        # The unique constraint also covers evaluations running at the same time
+        PriceAlert.objects.bulk_create(new_alerts, ignore_conflicts=True)
+        return new_alerts
+
+    def run(self, watches: Optional[Sequence[PriceWatch]] = None, today: Optional[date] = None) -> PriceWatchStats:
+        """
+        Evaluates the given watches, or every active one, and records their alerts.
+
+        Args:
+            watches: Watches to evaluate, the active unexpired ones by default.
+            today: First day that can be searched, today by default.
+
+        Returns:
+            The PriceWatchStats of the evaluation.
+        """
+        today = today or date.today()
+        if watches is None:
+            watches = list(PriceWatch.objects.filter(active=True, end_date__gte=today))
+        stats = PriceWatchStats()
+        stats.watches = len(watches)
+
+        plan = self.plan(watches, today)
+        stats.routes = len(plan)
+        stats.days = sum(len(days) for days in plan.values())
+
+        # The database is only used here, outside of the event loop
+        cheapest = loop_bridge.run(self.fetch_cheapest(plan, stats), timeout=self.FETCH_TIMEOUT)
+        stats.alerts = len(self.record(self.evaluate(watches, cheapest, today)))
+        return stats
@@ -0,0 +1,197 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date.
+
+    Returns:
+        The seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed upstream call.
+
+    Transient failures (connection errors, timeouts and the RETRY_STATUSES) are
+    retried up to `attempts` calls in total, waiting a random time between 0 and
+    base_delay * 2**retry, capped at `max_delay` ("full jitter"), so clients that
+    failed together don't retry together. A Retry-After sent by the server is the
+    least time waited; when it asks for more than `max_delay`, the call gives up.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    DEFAULT_ATTEMPTS = 3
+    DEFAULT_BASE_DELAY = 0.5  # seconds
+    DEFAULT_MAX_DELAY = 8.0  # seconds
+
+    def __init__(
+        self,
+        attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initialize the RetryPolicy.
+
+        Args:
+            attempts: Most calls made, the first one included. 1 disables retries.
+            base_delay: Upper bound of the first wait, in seconds.
+            max_delay: Upper bound of every wait, in seconds.
+            rng: Random number generator for the jitter, for tests.
+        """
+        self.attempts = max(attempts or self.DEFAULT_ATTEMPTS, 1)
+        self.base_delay = self.DEFAULT_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = self.DEFAULT_MAX_DELAY if max_delay is None else max_delay
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_settings(cls, config: Dict[str, Any]) -> 'RetryPolicy':
+        return cls(
+            attempts=config.get('ATTEMPTS'),
+            base_delay=config.get('BASE_DELAY'),
+            max_delay=config.get('MAX_DELAY'),
+        )
+
+    def is_retryable(self, result: Dict[str, Any]) -> bool:
+        """
+        Whether an error response is worth retrying: errors without an HTTP status
+        (connection errors, timeouts) and the RETRY_STATUSES.
+        """
+        status = result.get('status')
+        return status is None or status in self.RETRY_STATUSES
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the seconds to wait before a retry, or None to give up.
+
+        Args:
+            retry: Number of the retry, starting at 0.
+            retry_after: Seconds asked by the server's Retry-After header.
+        """
+        if retry_after is not None and retry_after > self.max_delay:
+            return None
+        backoff = self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+        return backoff if retry_after is None else max(backoff, retry_after)
+
+
+class CircuitBreaker:
+    """
+    Fails calls to an upstream host fast while it is down.
+
+    The circuit is closed while calls succeed. After `failure_threshold` failures
+    in a row it opens, and calls are refused without reaching the host. Once
+    `reset_timeout` seconds have passed it goes half-open and lets up to
+    `half_open_max_calls` probe calls through: a successful probe closes the
+    circuit again, a failed one reopens it for another `reset_timeout`.
+
+    It is shared by the event loops of the process, so its state is guarded by a lock.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    DEFAULT_FAILURE_THRESHOLD = 5
+    DEFAULT_RESET_TIMEOUT = 30.0  # seconds
+    DEFAULT_HALF_OPEN_MAX_CALLS = 1
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        half_open_max_calls: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            failure_threshold: Failures in a row that open the circuit.
+            reset_timeout: Seconds the circuit stays open before probing the host.
+            half_open_max_calls: Probe calls allowed at once while half-open.
+            clock: Monotonic clock, for tests.
+        """
+        self.failure_threshold = failure_threshold or self.DEFAULT_FAILURE_THRESHOLD
+        self.reset_timeout = self.DEFAULT_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self.half_open_max_calls = half_open_max_calls or self.DEFAULT_HALF_OPEN_MAX_CALLS
+        self.clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, config: Dict[str, Any]) -> 'CircuitBreaker':
+        return cls(
+            failure_threshold=config.get('FAILURE_THRESHOLD'),
+            reset_timeout=config.get('RESET_TIMEOUT'),
+            half_open_max_calls=config.get('HALF_OPEN_MAX_CALLS'),
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through now. An allowed call must be followed by
+        record_success(), record_failure() or release().
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probes = 0
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    return False
+                self._probes += 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self._probes = 0
+
+    def release(self) -> None:
+        """
+        Ends an allowed call that neither succeeded nor failed, e.g. a cancelled one.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
@@ -0,0 +1,157 @@
+import json
+import secrets
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Union
+from django.conf import settings
+from django.core.cache import caches
+
+from .flight import Flight, to_dict
+from .round_trip import RoundTrip
+
+StoredResult = Union[Flight, RoundTrip, Dict[str, Any]]
+
+
+class SearchResultStore:
+    """
+    Server-side store of search results, addressed by a random search ID.
+
+    Results live in one of the Django cache backends (use a shared backend such as
+    Redis or Memcached when running several processes) and expire after `timeout`.
+    Flights are stored as rows under a single list of field names, then compressed,
+    so a 30-day search takes a fraction of its JSON size. Round trips are stored as
+    consecutive outbound and inbound rows. Each result records when it was stored,
+    so pages showing it can be cached for exactly the time it has left.
+    """
+
+    KEY_PREFIX = 'search-results'
+    DEFAULT_TIMEOUT = 3600  # seconds
+    ID_BYTES = 12
+
+    def __init__(self, alias: Optional[str] = None, timeout: Optional[int] = None):
+        """
+        Initialize the SearchResultStore.
+
+        Args:
+            alias: Name of the entry in settings.CACHES to use.
+            timeout: Seconds a stored result is kept.
+        """
+        config = getattr(settings, 'SEARCH_RESULT_STORE', {})
+        self.alias = alias or config.get('CACHE_ALIAS', 'default')
+        self.timeout = timeout or config.get('TIMEOUT', self.DEFAULT_TIMEOUT)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def to_cache_key(self, search_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{search_id}"
+
+    @staticmethod
+    def new_search_id() -> str:
+        return secrets.token_urlsafe(SearchResultStore.ID_BYTES)
+
+    def remaining_lifetime(self, result: Dict[str, Any], now: Optional[float] = None) -> int:
+        """
+        Returns the whole seconds a loaded result has left before it expires,
+        0 for results stored without their time.
+        """
+        stored_at = result.get('stored_at')
+        if stored_at is None:
+            return 0
+        now = time.time() if now is None else now
+        return max(int(stored_at + self.timeout - now), 0)
+
+    @staticmethod
+    def serialize(search: Dict[str, Any], flights: List[StoredResult]) -> bytes:
+        """
+        Packs a search and its flights, as Flight records or dicts, or its RoundTrip
+        list, into compressed JSON.
+        """
+        round_trips = bool(flights) and all(isinstance(flight, RoundTrip) for flight in flights)
+        if round_trips:
+            flights = [leg for round_trip in flights for leg in (round_trip.outbound, round_trip.inbound)]
+        if all(isinstance(flight, Flight) for flight in flights):
+            fields = Flight.FIELDS
+            rows = [flight.to_row() for flight in flights]
+        else:
+            flights = [to_dict(flight) for flight in flights]
+            fields = list(dict.fromkeys(field for flight in flights for field in flight))
+            rows = [[flight.get(field) for field in fields] for flight in flights]
+        payload = {
+            'search': search,
+            'fields': fields,
+            'rows': rows,
+            'stored_at': time.time(),
+        }
+        if round_trips:
+            payload['round_trips'] = True
+        return zlib.compress(json.dumps(payload, separators=(',', ':')).encode())
+
+    @staticmethod
+    def deserialize(data: bytes) -> Dict[str, Any]:
+        """
+        Unpacks data built by serialize().
+
+        Returns:
+            A dictionary with the 'search' parameters, the list of 'flights' as dicts
+            and the 'stored_at' UNIX timestamp. Round trips are dicts with the 'outbound' and 'inbound' flights and the
+            total 'miles_cost'.
+        """
+        payload = json.loads(zlib.decompress(data))
+        fields = payload['fields']
+        flights = [dict(zip(fields, row)) for row in payload['rows']]
+        if payload.get('round_trips'):
+            flights = [
+                {'outbound': outbound, 'inbound': inbound, 'miles_cost': outbound['miles_cost'] + inbound['miles_cost']}
+                for outbound, inbound in zip(flights[::2], flights[1::2])
+            ]
+        return {
+            'search': payload['search'],
+            'flights': flights,
+            'stored_at': payload.get('stored_at'),
+        }
+
+    def save(self, search: Dict[str, Any], flights: List[StoredResult]) -> str:
+        """
+        Stores a search result.
+
+        Args:
+            search: JSON-serializable search parameters, kept to describe the result.
+            flights: The flights or round trips found.
+
+        Returns:
+            The ID addressing the stored result.
+        """
+        search_id = self.new_search_id()
+        self.backend.set(self.to_cache_key(search_id), self.serialize(search, flights), self.timeout)
+        return search_id
+
+    def load(self, search_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Loads a search result.
+
+        Args:
+            search_id: The ID returned by save().
+
+        Returns:
+            A dictionary with the 'search' parameters and the list of 'flights',
+            or None if the result doesn't exist or has expired.
+        """
+        data = self.backend.get(self.to_cache_key(search_id))
+        return self.deserialize(data) if data is not None else None
+
+    async def asave(self, search: Dict[str, Any], flights: List[StoredResult]) -> str:
+        """
+        Async counterpart of save().
+        """
+        search_id = self.new_search_id()
+        await self.backend.aset(self.to_cache_key(search_id), self.serialize(search, flights), self.timeout)
+        return search_id
+
+    async def aload(self, search_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Async counterpart of load().
+        """
+        data = await self.backend.aget(self.to_cache_key(search_id))
+        return self.deserialize(data) if data is not None else None
@@ -0,0 +1,159 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from .flight import Flight, to_dict
+
+FlightLike = Union[Flight, Dict[str, Any]]
+
+MILES_COST = itemgetter('miles_cost')
+
+
+class RoundTrip:
+    """
+    An outbound flight paired with an inbound flight, priced at the sum of their miles.
+    """
+
+    __slots__ = ('outbound', 'inbound', 'miles_cost')
+
+    def __init__(self, outbound: FlightLike, inbound: FlightLike):
+        self.outbound = outbound
+        self.inbound = inbound
+        self.miles_cost = outbound['miles_cost'] + inbound['miles_cost']
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the round trip with both flights in their dict format.
+        """
+        return {
+            'outbound': to_dict(self.outbound),
+            'inbound': to_dict(self.inbound),
+            'miles_cost': self.miles_cost,
+        }
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, RoundTrip):
+            return NotImplemented
+        return self.outbound == other.outbound and self.inbound == other.inbound
+
+    def __repr__(self) -> str:
+        return f"RoundTrip({self.outbound!r}, {self.inbound!r}, {self.miles_cost} miles)"
+
+
+class _LazyList:
+    """
+    List filled from an iterator only as far as it has been read.
+    """
+
+    def __init__(self, iterator: Iterator[FlightLike]):
+        self._iterator = iterator
+        self._items: List[FlightLike] = []
+
+    def has(self, index: int) -> bool:
+        while len(self._items) <= index:
+            item = next(self._iterator, None)
+            if item is None:
+                return False
+            self._items.append(item)
+        return True
+
+    def __getitem__(self, index: int) -> FlightLike:
+        return self._items[index]
+
+
+def connects(outbound: FlightLike, inbound: FlightLike) -> bool:
+    """
+    Whether the inbound flight leaves after the outbound flight arrives. ISO times
+    compare as strings; flights with unknown times are assumed to connect.
+    """
+    arrival, departure = outbound.get('arrival_time'), inbound.get('departure_time')
+    return not arrival or not departure or departure >= arrival
+
+
+def iter_cheapest_pairs(outbound: Sequence[FlightLike], inbound: _LazyList) -> Iterator[RoundTrip]:
+    """
+    Yields the pairs of two lists sorted by miles in increasing order of total miles.
+
+    Pair (i, j) is pushed on the heap only after (i, j - 1), or (i - 1, 0) when j
+    is 0, was taken, so every pair is visited once, and the heap never holds more
+    than one pair per outbound flight. Taking the k cheapest pairs costs
+    O(k log k) instead of building all len(outbound) * len(inbound) of them.
+    """
+    if not outbound or not inbound.has(0):
+        return
+    heap = [(outbound[0]['miles_cost'] + inbound[0]['miles_cost'], 0, 0)]
+    while heap:
+        _, i, j = heapq.heappop(heap)
+        if connects(outbound[i], inbound[j]):
+            yield RoundTrip(outbound[i], inbound[j])
+        if inbound.has(j + 1):
+            heapq.heappush(heap, (outbound[i]['miles_cost'] + inbound[j + 1]['miles_cost'], i, j + 1))
+        if j == 0 and i + 1 < len(outbound):
+            heapq.heappush(heap, (outbound[i + 1]['miles_cost'] + inbound[0]['miles_cost'], i + 1, 0))
+
+
+def iter_round_trips(
+    outbound_days: Mapping[date, Sequence[FlightLike]],
+    inbound_days: Mapping[date, Sequence[FlightLike]],
+    min_stay: int,
+    max_stay: int,
+) -> Iterator[RoundTrip]:
+    """
+    Lazily pairs outbound and inbound flights into round trips sorted by miles.
+
+    The outbound days are swept in date order, finding the inbound days within
+    [day + min_stay, day + max_stay] by bisection over the sorted inbound dates.
+    The flights of those days, each already sorted by miles, are merged lazily,
+    and the cheapest pairs of each outbound day are then merged across days, so
+    only as many pairs are built as the consumer takes.
+
+    Args:
+        outbound_days: Outbound flights by departure date, each list sorted by miles.
+        inbound_days: Inbound flights by departure date, each list sorted by miles.
+        min_stay: Fewest days between the outbound and inbound dates.
+        max_stay: Most days between the outbound and inbound dates.
+
+    Returns:
+        An iterator of RoundTrip sorted by total miles.
+    """
+    inbound_dates = sorted(inbound_days)
+    day_pairs = []
+    for outbound_date in sorted(outbound_days):
+        start = bisect_left(inbound_dates, outbound_date + timedelta(days=min_stay))
+        end = bisect_right(inbound_dates, outbound_date + timedelta(days=max_stay))
+        if start == end:
+            continue
+        window = heapq.merge(*(inbound_days[day] for day in inbound_dates[start:end]), key=MILES_COST)
+        day_pairs.append(iter_cheapest_pairs(outbound_days[outbound_date], _LazyList(window)))
+    return heapq.merge(*day_pairs, key=attrgetter('miles_cost'))
+
+
+def pair_round_trips(
+    outbound_days: Mapping[date, Sequence[FlightLike]],
+    inbound_days: Mapping[date, Sequence[FlightLike]],
+    min_stay: int,
+    max_stay: int,
+    top_n: Optional[int] = None,
+) -> List[RoundTrip]:
+    """
+    Returns the cheapest round trips, see iter_round_trips.
+
+    Args:
+        outbound_days: Outbound flights by departure date, each list sorted by miles.
+        inbound_days: Inbound flights by departure date, each list sorted by miles.
+        min_stay: Fewest days between the outbound and inbound dates.
+        max_stay: Most days between the outbound and inbound dates.
+        top_n: Take only this many of the cheapest round trips.
+
+    Returns:
+        A list of RoundTrip sorted by total miles.
+    """
+    return list(islice(iter_round_trips(outbound_days, inbound_days, min_stay, max_stay), top_n))
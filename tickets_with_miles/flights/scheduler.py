@@ -0,0 +1,121 @@
+import asyncio
+import heapq
+import itertools
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+class FetchTicket:
+    """
+    The priority of a call, kept across its attempts. A call shared by several
+    callers can have its priority raised while it waits, see FetchScheduler.reprioritise.
+    """
+
+    __slots__ = ('priority', 'waiter')
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.waiter: Optional[asyncio.Future] = None
+
+
+class FetchScheduler:
+    """
+    Bounded-concurrency scheduler for upstream API calls.
+
+    At most `max_in_flight` calls run at once; the rest wait in a queue ordered
+    by priority (lower runs first) and then by arrival (FIFO). A caller that is
+    cancelled while waiting simply leaves the queue, and one cancelled while
+    running releases its slot to the next waiter. A waiting call whose priority
+    is raised is queued again at the new priority; its old place is skipped.
+    """
+
+    DEFAULT_PRIORITY = 0
+
+    def __init__(self, max_in_flight: int):
+        """
+        Initialize the FetchScheduler.
+
+        Args:
+            max_in_flight: Maximum number of calls allowed to run concurrently.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return len({id(waiter) for _, _, waiter in self._queue if not waiter.done()})
+
+    async def run(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        priority: int = DEFAULT_PRIORITY,
+        ticket: Optional[FetchTicket] = None,
+    ) -> Any:
+        """
+        Runs `func(*args)` once a slot is available.
+
+        Args:
+            func: The coroutine function to call.
+            args: Positional arguments for `func`.
+            priority: Scheduling priority, lower values run first.
+            ticket: Ticket carrying the priority instead, so it can be raised while waiting.
+
+        Returns:
+            Whatever `func` returns.
+        """
+        await self._acquire(ticket or FetchTicket(priority))
+        try:
+            return await func(*args)
+        finally:
+            self._release()
+
+    def reprioritise(self, ticket: FetchTicket, priority: int) -> None:
+        """
+        Raises a ticket's priority to `priority` if that runs sooner. A ticket still
+        waiting is queued again at its new priority.
+        """
+        if priority >= ticket.priority:
+            return
+        ticket.priority = priority
+        if ticket.waiter is not None and not ticket.waiter.done():
+            heapq.heappush(self._queue, (priority, next(self._counter), ticket.waiter))
+
+    async def _acquire(self, ticket: FetchTicket) -> None:
+        # Live waiters are only ever queued while every slot is taken
+        if self._in_flight < self.max_in_flight:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (ticket.priority, next(self._counter), waiter))
+        ticket.waiter = waiter
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation arrived
+                self._release()
+            raise
+        finally:
+            ticket.waiter = None
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        while self._queue and self._in_flight < self.max_in_flight:
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():
+                # Cancelled while waiting, or already woken from a better place
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
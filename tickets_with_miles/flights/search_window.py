@@ -0,0 +1,16 @@
+from datetime import date, timedelta
+from typing import Optional
+
+# Days ahead of today the flights API serves departures for. Searches, round trip
+# returns, fare calendars and price watches all stop at this day.
+MAX_DAYS_AHEAD = 329
+
+
+def last_search_date(today: Optional[date] = None) -> date:
+    """
+    Returns the last departure date that can be searched.
+
+    Args:
+        today: The current day, today by default.
+    """
+    return (today or date.today()) + timedelta(days=MAX_DAYS_AHEAD)
@@ -1,9 +1,31 @@
+from collections import defaultdict
 from datetime import datetime, date, time, timedelta
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Set, AsyncIterator, Coroutine, Iterable, Iterator, Tuple, Union
 from urllib.parse import urlencode
 import asyncio
+import concurrent.futures
+import heapq
+import logging
+import threading
+from django.conf import settings
 
+from .airport_groups import AirportCodes, expand_routes
 from .api_client import FlightAPIClient
+from .fare_cache import FareCache, FareKey, get_fare_cache
+from .fare_calendar import CalendarDay, FareCalendarPlanner
+from .filters import FlightFilters
+from .flight import Flight, to_dict
+from .loop_bridge import loop_bridge
+from .round_trip import RoundTrip, pair_round_trips
+from .search_window import last_search_date
+from .snapshots import FareSnapshotWriter, get_snapshot_writer
+
+logger = logging.getLogger(__name__)
+
+# Sort key for flights, whether Flight records or dicts
+MILES_COST = itemgetter('miles_cost')
 
 
 class FlightService:
@@ -17,83 +39,687 @@ class FlightService:
     DEFAULT_SEGMENTS = 1
     DEFAULT_TRIP_TYPE = 2
     DEFAULT_DEPARTURE_TIME_HOUR = 15  # 3:00 PM
+    REFRESH_PRIORITY = 5  # background refreshes yield to user searches
+    CALENDAR_DAY_ATTEMPTS = 2  # fetches of a fare calendar day before it is left estimated
 
-    def __init__(self, client: Optional[FlightAPIClient] = None):
+    # Days being refreshed in the background, shared by all services in the process
+    _refreshing: Set[FareKey] = set()
+    _refreshing_lock = threading.Lock()
+    # Refreshes running on a server loop, which only keeps weak references to its tasks
+    _refresh_tasks: Set['asyncio.Task[None]'] = set()
+
+    def __init__(
+        self,
+        client: Optional[FlightAPIClient] = None,
+        cache: Optional[FareCache] = None,
+        snapshots: Optional[FareSnapshotWriter] = None,
+    ):
         """
-        Initialize the FlightService with a FlightAPIClient instance.
+        Initialize the FlightService with a FlightAPIClient instance, a fare cache and
+        a fare snapshot writer. The process-wide cache from settings.FARE_CACHE and
+        writer from settings.FARE_SNAPSHOTS are used when none is given.
         """
         self.client = client or FlightAPIClient()
+        self.cache = cache if cache is not None else get_fare_cache()
+        self.snapshots = snapshots if snapshots is not None else get_snapshot_writer()
 
     def get_flights(
         self,
-        origin: str,
-        destination: str,
+        origin: AirportCodes,
+        destination: AirportCodes,
         departure_date: date,
         flexibility: int,
-    ) -> List[Dict[str, Any]]:
+        top_n: Optional[int] = None,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[Flight]:
         """
         Fetches and processes flight data for the given parameters using synchronous calls.
 
         Args:
-            origin: The IATA code of the origin airport.
-            destination: The IATA code of the destination airport.
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
+            departure_date: The date of departure.
+            flexibility: Number of days with forward flexibility.
+            top_n: Return only this many of the cheapest flights.
+            filters: Conditions the returned flights must meet.
+
+        Returns:
+            A list of Flight records sorted by miles.
+        """
+        # Run on the process-wide loop so pooled connections and caches outlive the request
+        return loop_bridge.run(
+            self.get_flights_internal(
+                origin, destination, departure_date, flexibility, top_n=top_n, filters=filters
+            )
+        )
+
+    async def aget_flights(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+        top_n: Optional[int] = None,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[Flight]:
+        """
+        Async entry point for views. Awaits get_flights_internal on the process-wide
+        loop bridge or on the running loop, see run_for_view.
+
+        Args:
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
             departure_date: The date of departure.
             flexibility: Number of days with forward flexibility.
+            top_n: Return only this many of the cheapest flights.
+            filters: Conditions the returned flights must meet.
 
         Returns:
-            A list of dictionaries containing flight information.
+            A list of Flight records sorted by miles.
         """
-        # Run the asynchronous get_flights_internal in an event loop
-        return asyncio.run(
-            self.get_flights_internal(origin, destination, departure_date, flexibility)
+        coro = self.get_flights_internal(
+            origin, destination, departure_date, flexibility, top_n=top_n, filters=filters
         )
+        return await self.run_for_view(coro)
+
+    @staticmethod
+    def uses_loop_bridge() -> bool:
+        """
+        Whether async views run their searches on the process-wide loop bridge.
+
+        Under WSGI every async view runs on a throwaway async_to_sync loop, so pooled
+        sessions, the scheduler and the coalescer would start over on each request.
+        settings.FLIGHT_SEARCH_USE_LOOP_BRIDGE forces either way; when it is None,
+        the bridge is used once wsgi.py started it for the server.
+        """
+        use_bridge = getattr(settings, 'FLIGHT_SEARCH_USE_LOOP_BRIDGE', None)
+        return loop_bridge.serves_wsgi if use_bridge is None else use_bridge
+
+    async def run_for_view(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """
+        Awaits a coroutine from an async view, on the loop bridge when uses_loop_bridge().
+        """
+        if self.uses_loop_bridge():
+            return await loop_bridge.arun(coro)
+        return await coro
 
     async def get_flights_internal(
         self,
-        origin: str,
-        destination: str,
+        origin: AirportCodes,
+        destination: AirportCodes,
         departure_date: date,
         flexibility: int,
-    ) -> List[Dict[str, Any]]:
+        top_n: Optional[int] = None,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[Flight]:
         """
         Asynchronous internal method to fetch and process flight data.
+        Days found in the fare cache are reused and only the missing ones are fetched.
+        Stale cached days are served as they are and refreshed in the background.
+
+        Each day's flights are already sorted by miles, so the days are combined with
+        a k-way merge, which stops as soon as `top_n` flights have been taken.
+        Filters are checked while fetched days are parsed, see parse_single_flight.
 
         Args:
-            origin: The IATA code of the origin airport.
-            destination: The IATA code of the destination airport.
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
             departure_date: The date of departure.
             flexibility: Number of days with forward flexibility.
+            top_n: Return only this many of the cheapest flights.
+            filters: Conditions the returned flights must meet.
 
         Returns:
-            A list of dictionaries containing flight information.
-        """
-        flexibility = max(flexibility, 1)
-        searches = []
-        for delta_days in range(flexibility):
-            search_date = departure_date + timedelta(days=delta_days)
-            searches.append({
-                'origin': origin,
-                'destination': destination,
-                'departure_date': search_date,
+            A list of Flight records sorted by miles.
+        """
+        flights = await self.iter_flights(origin, destination, departure_date, flexibility, filters)
+        return list(islice(flights, top_n))
+
+    async def iter_flights(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+        filters: Optional[FlightFilters] = None,
+    ) -> Iterator[Flight]:
+        """
+        Gets every day of the search, from the fare cache or the API, and returns a
+        lazy iterator over their flights sorted by miles. Consumers that stop early
+        don't pay for merging the rest.
+
+        Args:
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
+            departure_date: The date of departure.
+            flexibility: Number of days with forward flexibility.
+            filters: Conditions the returned flights must meet.
+
+        Returns:
+            An iterator of Flight records sorted by miles.
+        """
+        filters = filters or None
+        cached_days, searches = self.lookup_cache(
+            self.build_searches(origin, destination, departure_date, flexibility), filters
+        )
+
+        days = [day_flights for _, day_flights in cached_days]
+        days.extend(await self.fetch_days(searches, filters=filters))
+        return self.iter_merge_days(days)
+
+    @staticmethod
+    def iter_merge_days(days: Iterable[List[Flight]]) -> Iterator[Flight]:
+        """
+        Lazily merges per-day flight lists, each sorted by miles, into one sequence
+        sorted by miles. Ties keep the order of the days.
+        """
+        return heapq.merge(*days, key=MILES_COST)
+
+    @staticmethod
+    def merge_days(days: Iterable[List[Flight]], top_n: Optional[int] = None) -> List[Flight]:
+        """
+        Merges per-day flight lists, each sorted by miles, into one list sorted by miles.
+
+        Args:
+            days: The flight lists to merge.
+            top_n: Take only this many of the cheapest flights.
+
+        Returns:
+            The merged flights. Ties keep the order of the days.
+        """
+        return list(islice(FlightService.iter_merge_days(days), top_n))
+
+    def get_round_trips(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+        min_stay: int,
+        max_stay: int,
+        top_n: Optional[int] = None,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[RoundTrip]:
+        """
+        Fetches round trips for the given parameters using synchronous calls.
+        See get_round_trips_internal.
+        """
+        return loop_bridge.run(
+            self.get_round_trips_internal(
+                origin, destination, departure_date, flexibility, min_stay, max_stay,
+                top_n=top_n, filters=filters,
+            )
+        )
+
+    async def aget_round_trips(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+        min_stay: int,
+        max_stay: int,
+        top_n: Optional[int] = None,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[RoundTrip]:
+        """
+        Async entry point for views, see aget_flights and get_round_trips_internal.
+        """
+        coro = self.get_round_trips_internal(
+            origin, destination, departure_date, flexibility, min_stay, max_stay,
+            top_n=top_n, filters=filters,
+        )
+        return await self.run_for_view(coro)
+
+    async def get_round_trips_internal(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+        min_stay: int,
+        max_stay: int,
+        top_n: Optional[int] = None,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[RoundTrip]:
+        """
+        Finds the cheapest round trips leaving within the flexibility window and
+        returning between `min_stay` and `max_stay` days later.
+
+        Each leg is searched as one-way days, so both legs share the fare cache,
+        the coalescer and the scheduler with one-way searches, and every day is
+        fetched once however many pairs it is part of. The days are then paired
+        by pair_round_trips without building every combination. Return days past
+        the searchable window are left out.
+
+        Args:
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
+            departure_date: The first date of departure.
+            flexibility: Number of days with forward flexibility for the departure.
+            min_stay: Fewest days between departure and return.
+            max_stay: Most days between departure and return.
+            top_n: Return only this many of the cheapest round trips.
+            filters: Conditions the flights of both legs must meet.
+
+        Returns:
+            A list of RoundTrip sorted by total miles.
+        """
+        filters = filters or None
+        outbound_searches = self.build_searches(origin, destination, departure_date, flexibility)
+        first_return = departure_date + timedelta(days=min_stay)
+        return_days = min(max(flexibility, 1) + max_stay - min_stay, (last_search_date() - first_return).days + 1)
+        if return_days < 1:
+            return []
+        inbound_searches = self.build_searches(destination, origin, first_return, return_days)
+        days = await self.get_days(outbound_searches + inbound_searches, filters)
+
+        outbound_days = self.group_days_by_date(outbound_searches, days[:len(outbound_searches)])
+        inbound_days = self.group_days_by_date(inbound_searches, days[len(outbound_searches):])
+        return pair_round_trips(outbound_days, inbound_days, min_stay, max_stay, top_n)
+
+    async def aget_fare_calendar(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        start_date: date,
+        days: int,
+        max_fetched_days: int = FareCalendarPlanner.DEFAULT_MAX_FETCHED_DAYS,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[CalendarDay]:
+        """
+        Async entry point for views, see aget_flights and get_fare_calendar_internal.
+        """
+        coro = self.get_fare_calendar_internal(
+            origin, destination, start_date, days, max_fetched_days, filters=filters
+        )
+        return await self.run_for_view(coro)
+
+    async def get_fare_calendar_internal(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        start_date: date,
+        days: int,
+        max_fetched_days: int = FareCalendarPlanner.DEFAULT_MAX_FETCHED_DAYS,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[CalendarDay]:
+        """
+        Builds a cheapest-fare calendar over a long window while searching only a
+        fraction of its days.
+
+        Days in the fare cache are used as they are. The planner then picks a sparse
+        sample of the window and refines it in rounds around the cheapest known days,
+        each round fetched as one batch, until `max_fetched_days` route-days were
+        searched or every day is known. The remaining days are estimated. A day
+        whose fetch failed stays unknown rather than shown as a day without flights:
+        a later round may search it again, up to CALENDAR_DAY_ATTEMPTS times, and
+        it is estimated otherwise.
+
+        Args:
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
+            start_date: The first day of the calendar.
+            days: Number of days in the calendar.
+            max_fetched_days: Most searches sent upstream; a day counts once per route,
+                so multi-airport calendars search fewer days.
+            filters: Conditions the flights must meet.
+
+        Returns:
+            One CalendarDay per day, in date order, telling whether it is exact or estimated.
+        """
+        filters = filters or None
+        planner = FareCalendarPlanner(start_date, days)
+        searches_by_date = {day: self.build_searches(origin, destination, day, 1) for day in planner.dates}
+
+        cached_days, _ = self.lookup_cache(
+            [search for searches in searches_by_date.values() for search in searches], filters
+        )
+        cached_by_search = {id(search): day_flights for search, day_flights in cached_days}
+        known: Dict[date, Optional[Flight]] = {}
+        for day, searches in searches_by_date.items():
+            if searches and all(id(search) in cached_by_search for search in searches):
+                known[day] = self.cheapest_of([cached_by_search[id(search)] for search in searches])
+
+        # The budget counts searches, so a batch holds as many days as it can afford
+        routes = max(len(searches) for searches in searches_by_date.values()) if searches_by_date else 1
+        budget = max_fetched_days
+        attempts: Dict[date, int] = defaultdict(int)  # failed fetches per day
+        to_fetch = planner.sample_dates(known, budget // routes) or planner.refine_dates(
+            self.known_miles(known), min(budget // routes, planner.REFINE_BATCH)
+        )
+        while to_fetch:
+            searches = [search for day in to_fetch for search in searches_by_date[day]]
+            failed: Set[int] = set()
+            fetched_days = iter(await self.get_days(searches, filters, failed=failed))
+            for day in to_fetch:
+                day_flights = [next(fetched_days) for _ in searches_by_date[day]]
+                if any(id(search) in failed for search in searches_by_date[day]):
+                    attempts[day] += 1
+                else:
+                    known[day] = self.cheapest_of(day_flights)
+            budget -= len(searches)
+            # A day that keeps failing stays the middle of its gap; skip it so it can't take the whole budget
+            exhausted = {day for day, count in attempts.items() if count >= self.CALENDAR_DAY_ATTEMPTS}
+            to_fetch = planner.refine_dates(
+                self.known_miles(known), min(budget // routes, planner.REFINE_BATCH), skip=exhausted
+            )
+
+        return planner.build(known)
+
+    @staticmethod
+    def cheapest_of(days: List[List[Flight]]) -> Optional[Flight]:
+        """
+        Returns the cheapest flight of several day lists sorted by miles, or None if they are empty.
+        """
+        return min((day_flights[0] for day_flights in days if day_flights), key=MILES_COST, default=None)
+
+    @staticmethod
+    def known_miles(known: Dict[date, Optional[Flight]]) -> Dict[date, Optional[int]]:
+        return {day: flight['miles_cost'] if flight is not None else None for day, flight in known.items()}
+
+    async def get_days(
+        self,
+        searches: List[Dict[str, Any]],
+        filters: Optional[FlightFilters] = None,
+        priority: int = 0,
+        failed: Optional[Set[int]] = None,
+    ) -> List[List[Flight]]:
+        """
+        Gets one day of flights per search, from the fare cache or the API.
+
+        Args:
+            searches: Search dictionaries as built by build_searches.
+            filters: Conditions the returned flights must meet.
+            priority: Scheduling priority of the upstream requests.
+            failed: If given, gets the id() of every search whose fetch failed, whose
+                    empty day means "unknown" rather than "no flights".
+
+        Returns:
+            One list of flights sorted by miles per search, in the same order.
+        """
+        cached_days, missing_searches = self.lookup_cache(searches, filters)
+        fetched_days = await self.fetch_days(missing_searches, priority=priority, filters=filters, failed=failed)
+        days_by_search = {
+            id(search): day_flights
+            for search, day_flights in [*cached_days, *zip(missing_searches, fetched_days)]
+        }
+        return [days_by_search[id(search)] for search in searches]
+
+    @staticmethod
+    def group_days_by_date(
+        searches: List[Dict[str, Any]],
+        days: List[List[Flight]],
+    ) -> Dict[date, List[Flight]]:
+        """
+        Combines the days of every route searched for the same date into one list
+        sorted by miles.
+        """
+        routes_by_date = defaultdict(list)
+        for search, day_flights in zip(searches, days):
+            routes_by_date[search['departure_date']].append(day_flights)
+        return {
+            day: routes[0] if len(routes) == 1 else list(heapq.merge(*routes, key=MILES_COST))
+            for day, routes in routes_by_date.items()
+        }
+
+    async def stream_flights(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+        filters: Optional[FlightFilters] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming counterpart of get_flights_internal that yields each day's flights
+        as soon as they are available: cached days first, then fetched days in the
+        order their responses arrive.
+
+        Args:
+            origin: IATA or metro area codes of the origin airports, as a list or comma-separated.
+            destination: IATA or metro area codes of the destination airports, as a list or comma-separated.
+            departure_date: The date of departure.
+            flexibility: Number of days with forward flexibility.
+            filters: Conditions the streamed flights must meet.
+
+        Yields:
+            Tuples of (event, data), where event is:
+            - 'date': data has the 'date', the route's 'origin' and 'destination' and
+              its 'flights' sorted by miles;
+            - 'cheapest': data is the cheapest flight found so far, sent when it changes;
+            - 'done': data has the total number of 'flights' found.
+        """
+        cheapest = None
+        count = 0
+
+        def day_events(search: Dict[str, Any], day_flights: List[Flight]):
+            nonlocal cheapest, count
+            count += len(day_flights)
+            yield 'date', {
+                'date': search['departure_date'].isoformat(),
+                'origin': search['origin'],
+                'destination': search['destination'],
+                'flights': [to_dict(flight) for flight in day_flights],
+            }
+            if day_flights and (cheapest is None or day_flights[0]['miles_cost'] < cheapest['miles_cost']):
+                cheapest = day_flights[0]
+                yield 'cheapest', to_dict(cheapest)
+
+        filters = filters or None
+        cached_days, searches = self.lookup_cache(
+            self.build_searches(origin, destination, departure_date, flexibility), filters
+        )
+        for search, day_flights in cached_days:
+            for event in day_events(search, day_flights):
+                yield event
+
+        if searches:
+            async for index, raw_data in self.client.search_flights_as_completed(searches):
+                fetched_at = int(datetime.now().timestamp())
+                day_flights = self.process_day(searches[index], raw_data, fetched_at, filters)
+                for event in day_events(searches[index], day_flights):
+                    yield event
+
+        yield 'done', {'flights': count}
+
+    def build_searches(
+        self,
+        origin: AirportCodes,
+        destination: AirportCodes,
+        departure_date: date,
+        flexibility: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Builds one search dictionary per route and day of the flexibility window.
+        Metro area codes are expanded into their airports and every origin is paired
+        with every destination, each distinct route and day appearing once. All the
+        searches then share the fare cache, the coalescer and the fetch scheduler.
+        """
+        routes = expand_routes(origin, destination)
+        return [
+            {
+                'origin': route_origin,
+                'destination': route_destination,
+                'departure_date': departure_date + timedelta(days=delta_days),
                 'adults': self.DEFAULT_ADULTS,
                 'children': self.DEFAULT_CHILDREN,
                 'infants': self.DEFAULT_INFANTS,
-            })
+            }
+            for route_origin, route_destination in routes
+            for delta_days in range(max(flexibility, 1))
+        ]
 
-        raw_data_list = await self.client.search_flights_bulk(searches)
+    def lookup_cache(
+        self,
+        searches: List[Dict[str, Any]],
+        filters: Optional[FlightFilters] = None,
+    ) -> Tuple[List[Tuple[Dict[str, Any], List[Flight]]], List[Dict[str, Any]]]:
+        """
+        Splits searches into days served from the fare cache and days to fetch.
+        Stale cached days are served and scheduled for a background refresh.
+        Cached days hold every flight, so filters are applied to them here; filters
+        that parsed flights can't answer bypass the cache.
 
-        flights = []
-        for search_params, raw_data in zip(searches, raw_data_list):
-            smiles_url = self.generate_smiles_url(
-                search_params['origin'],
-                search_params['destination'],
-                search_params['departure_date']
-            )
-            extracted_flights = self.extract_flights(raw_data, smiles_url)
-            flights.extend(extracted_flights)
+        Args:
+            searches: Search dictionaries as built by build_searches.
+            filters: Conditions the returned cached flights must meet.
+
+        Returns:
+            A tuple of (list of (search, cached flights), list of searches missing from the cache).
+        """
+        if self.cache is None or (filters is not None and not filters.applies_to_parsed):
+            return [], searches
+
+        cached_days = []
+        missing_searches = []
+        stale_searches = []
+        for search in searches:
+            entry = self.cache.get_entry(self.cache_key(search))
+            if entry is None:
+                missing_searches.append(search)
+                continue
+            cached_flights, fetched_at = entry
+            if filters is not None:
+                cached_flights = filters.apply(cached_flights)
+            cached_days.append((search, cached_flights))
+            if not self.cache.is_fresh(fetched_at):
+                stale_searches.append(search)
+
+        if stale_searches:
+            self.schedule_refresh(stale_searches)
+        return cached_days, missing_searches
+
+    async def fetch_days(
+        self,
+        searches: List[Dict[str, Any]],
+        priority: int = 0,
+        filters: Optional[FlightFilters] = None,
+        failed: Optional[Set[int]] = None,
+    ) -> List[List[Flight]]:
+        """
+        Fetches one day per search from the API, parses it and stores it in the fare cache.
+
+        Args:
+            searches: Search dictionaries as built by build_searches.
+            priority: Scheduling priority of the upstream requests.
+            filters: Conditions the parsed flights must meet.
+            failed: If given, gets the id() of every search answered with an error.
 
-        sorted_flights_list = sorted(flights, key=lambda x: x['miles_cost'])
-        return sorted_flights_list
+        Returns:
+            One list of parsed flights per search, in the same order.
+        """
+        if not searches:
+            return []
+
+        raw_data_list = await self.client.search_flights_bulk(searches, priority=priority)
+        if failed is not None:
+            failed.update(id(search) for search, raw_data in zip(searches, raw_data_list) if 'error' in raw_data)
+
+        fetched_at = int(datetime.now().timestamp())
+        return [
+            self.process_day(search_params, raw_data, fetched_at, filters)
+            for search_params, raw_data in zip(searches, raw_data_list)
+        ]
+
+    def process_day(
+        self,
+        search_params: Dict[str, Any],
+        raw_data: Dict[str, Any],
+        fetched_at: int,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[Flight]:
+        """
+        Parses one day's API response and stores it in the fare cache unless it is an error.
+        Its flights are also queued for the fare snapshot history.
+        Filtered days are incomplete, so they are neither cached nor recorded.
+
+        Args:
+            search_params: The search dictionary the response belongs to.
+            raw_data: The raw data returned from the API client.
+            fetched_at: UNIX timestamp of the response.
+            filters: Conditions the parsed flights must meet.
+
+        Returns:
+            The parsed flights sorted by miles, each carrying the 'fetched_at' timestamp.
+            They are cached in that order, so every cached day is sorted as well.
+        """
+        smiles_url = self.generate_smiles_url(
+            search_params['origin'],
+            search_params['destination'],
+            search_params['departure_date']
+        )
+        # The day's only list, built straight from the parsing generator
+        extracted_flights = sorted(self.iter_extract_flights(raw_data, smiles_url, filters), key=MILES_COST)
+        for flight in extracted_flights:
+            flight.fetched_at = fetched_at
+        if filters is None and 'error' not in raw_data:
+            if self.cache is not None:
+                self.cache.set(self.cache_key(search_params), extracted_flights, fetched_at)
+            if self.snapshots is not None:
+                self.snapshots.record(search_params, extracted_flights, fetched_at)
+        return extracted_flights
+
+    def schedule_refresh(
+        self,
+        searches: List[Dict[str, Any]],
+    ) -> Optional[Union['asyncio.Task[None]', concurrent.futures.Future]]:
+        """
+        Refreshes the given stale days in the background. Days already being
+        refreshed are skipped.
+
+        Under ASGI the refresh runs on the server loop, like the searches of async
+        views (see uses_loop_bridge), so it shares their scheduler and coalescer:
+        user searches go ahead of it and a search of the same day joins it. Otherwise
+        the request's loop may be a throwaway one, and the refresh runs on the
+        process-wide loop bridge so it outlives the request.
+
+        Returns:
+            The Task or Future of the refresh, or None if every day is already being refreshed.
+        """
+        with self._refreshing_lock:
+            keys = {self.cache_key(search) for search in searches} - self._refreshing
+            if not keys:
+                return None
+            self._refreshing.update(keys)
+        searches = [search for search in searches if self.cache_key(search) in keys]
+
+        async def refresh() -> None:
+            try:
+                await self.fetch_days(searches, priority=self.REFRESH_PRIORITY)
+            except Exception as e:
+                logger.warning(f"Background refresh failed: {e}")
+
+        def release(future) -> None:
+            # Also runs for a refresh cancelled before it started
+            with self._refreshing_lock:
+                self._refreshing.difference_update(keys)
+            self._refresh_tasks.discard(future)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or self.uses_loop_bridge():
+            future = loop_bridge.submit(refresh())
+        else:
+            future = loop.create_task(refresh())
+            self._refresh_tasks.add(future)
+        future.add_done_callback(release)
+        return future
+
+    def cache_key(self, search: Dict[str, Any]) -> FareKey:
+        """
+        Builds the fare cache key for a search dictionary.
+        """
+        return FareCache.make_key(
+            search['origin'],
+            search['destination'],
+            search['departure_date'],
+            search['adults'],
+            search['children'],
+            search['infants'],
+        )
 
     def generate_smiles_url(
         self,
@@ -145,82 +771,128 @@ class FlightService:
     def extract_flights(
         self,
         raw_data: Dict[str, Any],
-        smiles_url: str
-    ) -> List[Dict[str, Any]]:
+        smiles_url: str,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[Flight]:
         """
         Extracts flight information from raw API data.
 
         Args:
             raw_data: The raw data returned from the API client.
             smiles_url: The Smiles booking URL.
+            filters: Conditions the returned flights must meet.
 
         Returns:
-            A list of dictionaries containing parsed flight information.
+            A list of parsed Flight records.
+        """
+        return list(self.iter_extract_flights(raw_data, smiles_url, filters))
+
+    def iter_extract_flights(
+        self,
+        raw_data: Dict[str, Any],
+        smiles_url: str,
+        filters: Optional[FlightFilters] = None,
+    ) -> Iterator[Flight]:
+        """
+        Generator counterpart of extract_flights, parsing each flight only when the
+        consumer asks for it.
         """
         segments = raw_data.get('requestedFlightSegmentList', [])
-        flights = []
         for segment in segments:
             flight_list = segment.get('flightList', [])
-            flights.extend(self.parse_flights(flight_list, smiles_url))
-        return flights
+            yield from self.iter_parse_flights(flight_list, smiles_url, filters)
 
     def parse_flights(
         self,
         flight_list: List[Dict[str, Any]],
-        smiles_url: str
-    ) -> List[Dict[str, Any]]:
+        smiles_url: str,
+        filters: Optional[FlightFilters] = None,
+    ) -> List[Flight]:
         """
         Parses a list of flights and extracts relevant information.
 
         Args:
             flight_list: A list of flight dictionaries from the API.
             smiles_url: The Smiles booking URL.
+            filters: Conditions the returned flights must meet.
 
         Returns:
-            A list of dictionaries with cleaned and structured flight data.
+            A list of Flight records with cleaned and structured flight data.
+        """
+        return list(self.iter_parse_flights(flight_list, smiles_url, filters))
+
+    def iter_parse_flights(
+        self,
+        flight_list: Iterable[Dict[str, Any]],
+        smiles_url: str,
+        filters: Optional[FlightFilters] = None,
+    ) -> Iterator[Flight]:
+        """
+        Generator counterpart of parse_flights.
         """
-        parsed_flights = []
         for flight in flight_list:
-            parsed_flight = self.parse_single_flight(flight, smiles_url)
-            if parsed_flight and parsed_flight['miles_cost'] != -1:
-                parsed_flights.append(parsed_flight)
-        return parsed_flights
+            parsed_flight = self.parse_single_flight(flight, smiles_url, filters)
+            if parsed_flight and parsed_flight.miles_cost != -1:
+                yield parsed_flight
 
     def parse_single_flight(
         self,
         flight: Dict[str, Any],
-        smiles_url: str
-    ) -> Optional[Dict[str, Any]]:
+        smiles_url: str,
+        filters: Optional[FlightFilters] = None,
+    ) -> Optional[Flight]:
         """
         Parses a single flight and extracts relevant information.
 
+        Filters are checked first, on the raw data, so a rejected flight never gets
+        its dates parsed nor a Flight built.
+
         Args:
             flight: A flight dictionary from the API.
             smiles_url: The Smiles booking URL.
+            filters: Conditions the flight must meet.
 
         Returns:
-            A dictionary with flight information, or None if parsing fails.
+            A Flight record, or None if parsing fails or the flight is filtered out.
         """
         try:
+            if filters is not None and not self.passes_filters(flight, filters):
+                return None
+            miles_cost = self.get_miles_cost(flight, filters.fare_types if filters else None)
+            if filters is not None and not filters.miles_allowed(miles_cost):
+                return None
+
             departure_time = self.parse_iso_datetime(flight.get('departure', {}).get('date'))
             arrival_time = self.parse_iso_datetime(flight.get('arrival', {}).get('date'))
 
-            return {
-                'airline': self.get_airline(flight),
-                'miles_cost': self.get_miles_cost(flight),
-                'duration_hours': self.get_duration_hours(flight),
-                'duration_minutes': self.get_duration_minutes(flight),
-                'departure_time': departure_time.isoformat() if departure_time else None,
-                'departure_airport': self.get_departure_airport(flight),
-                'number_of_stops': self.get_number_of_stops(flight),
-                'arrival_time': arrival_time.isoformat() if arrival_time else None,
-                'arrival_airport': self.get_arrival_airport(flight),
-                'smiles_url': smiles_url,
-            }
+            return Flight(
+                airline=self.get_airline(flight),
+                miles_cost=miles_cost,
+                duration_hours=self.get_duration_hours(flight),
+                duration_minutes=self.get_duration_minutes(flight),
+                departure_time=departure_time.isoformat() if departure_time else None,
+                departure_airport=self.get_departure_airport(flight),
+                number_of_stops=self.get_number_of_stops(flight),
+                arrival_time=arrival_time.isoformat() if arrival_time else None,
+                arrival_airport=self.get_arrival_airport(flight),
+                smiles_url=smiles_url,
+            )
         except (KeyError, IndexError, TypeError, ValueError):
             # Handle parsing errors gracefully
             return None
 
+    def passes_filters(self, flight: Dict[str, Any], filters: FlightFilters) -> bool:
+        """
+        Checks a raw flight dictionary from the API against the filters, except for
+        the miles, which parse_single_flight checks once it has computed them.
+        """
+        return (
+            filters.stops_allowed(self.get_number_of_stops(flight))
+            and filters.airline_allowed(self.get_airline(flight))
+            and filters.duration_allowed(self.get_duration_hours(flight), self.get_duration_minutes(flight))
+            and filters.departure_allowed(flight.get('departure', {}).get('date'))
+        )
+
     @staticmethod
     def parse_iso_datetime(date_str: Optional[str]) -> Optional[datetime]:
         """
@@ -243,12 +915,13 @@ class FlightService:
     def get_airline(self, flight: Dict[str, Any]) -> Optional[str]:
         return flight.get('airline', {}).get('name')
 
-    def get_miles_cost(self, flight: Dict[str, Any]) -> int:
-        miles_prices = [
+    def get_miles_cost(self, flight: Dict[str, Any], fare_types: Optional[Set[str]] = None) -> int:
+        fare_types = fare_types or self.SMILES_FARE_TYPES
+        miles_prices = (
             fare.get('miles', 0)
             for fare in flight.get('fareList', [])
-            if fare.get('type') in self.SMILES_FARE_TYPES and fare.get('miles', 0) > 0
-        ]
+            if fare.get('type') in fare_types and fare.get('miles', 0) > 0
+        )
         return min(miles_prices, default=-1)
 
     def get_duration_hours(self, flight: Dict[str, Any]) -> Optional[int]:
@@ -0,0 +1,138 @@
+import aiohttp
+import asyncio
+import logging
+import weakref
+from typing import AsyncIterator, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """
+    Process-wide pool of keep-alive aiohttp sessions, one per running event loop.
+
+    aiohttp sessions are bound to the loop that created them, so the pool keeps
+    a single session per loop and reuses it (and its TCP/TLS connections and
+    DNS cache) for every search made on that loop. A session is closed and
+    dropped from the pool when its loop shuts down (asyncio.run, async_to_sync),
+    so short-lived loops don't leak it.
+    """
+
+    DEFAULT_LIMIT = 100
+    DEFAULT_LIMIT_PER_HOST = 30
+    DEFAULT_DNS_CACHE_TTL = 300  # seconds
+    DEFAULT_KEEPALIVE_TIMEOUT = 60  # seconds
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        keepalive_timeout: Optional[int] = None,
+    ):
+        """
+        Initialize the SessionPool with its connector settings.
+
+        Args:
+            limit: Maximum number of open connections per loop, 0 for no limit.
+            limit_per_host: Maximum number of open connections to a single host, 0 for no limit.
+            dns_cache_ttl: Seconds to keep resolved DNS entries.
+            keepalive_timeout: Seconds to keep idle connections open.
+        """
+        # 0 is aiohttp's "no limit", so only None falls back to the settings
+        self.limit = limit if limit is not None else getattr(
+            settings, 'FLIGHT_API_CONNECTION_LIMIT', self.DEFAULT_LIMIT
+        )
+        self.limit_per_host = limit_per_host if limit_per_host is not None else getattr(
+            settings, 'FLIGHT_API_CONNECTION_LIMIT_PER_HOST', self.DEFAULT_LIMIT_PER_HOST
+        )
+        self.dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else getattr(
+            settings, 'FLIGHT_API_DNS_CACHE_TTL', self.DEFAULT_DNS_CACHE_TTL
+        )
+        self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else getattr(
+            settings, 'FLIGHT_API_KEEPALIVE_TIMEOUT', self.DEFAULT_KEEPALIVE_TIMEOUT
+        )
+        self._sessions: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]' = (
+            weakref.WeakKeyDictionary()
+        )
+        self._closers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncIterator[None]]' = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """
+        Builds the TCP connector shared by all requests of a session.
+        """
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the session bound to the running loop, creating it if needed.
+
+        Returns:
+            An open aiohttp ClientSession.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(connector=self.create_connector())
+            self._sessions[loop] = session
+            closer = self._close_on_shutdown(loop, session)
+            await closer.__anext__()
+            self._closers[loop] = closer
+        return session
+
+    async def _close_on_shutdown(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        session: aiohttp.ClientSession,
+    ) -> AsyncIterator[None]:
+        # Parked at its yield; loop.shutdown_asyncgens() closes it, and the session, with the loop
+        try:
+            yield
+        finally:
+            # The session and this frame hold the loop, so its weak keys never die on their own
+            if self._sessions.get(loop) is session:
+                del self._sessions[loop]
+                self._closers.pop(loop, None)
+            if not session.closed:
+                await session.close()
+
+    async def warm_up(self, url: str, headers: Optional[dict] = None) -> None:
+        """
+        Opens a connection to the given URL so DNS, TCP and TLS are ready
+        before the first real search.
+
+        Args:
+            url: Any URL on the host to warm up.
+            headers: Optional headers to send with the warm-up request.
+        """
+        session = await self.get_session()
+        try:
+            async with session.head(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Warm-up request to {url} failed: {e}")
+
+    async def close(self) -> None:
+        """
+        Closes the session bound to the running loop, if any.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        closer = self._closers.pop(loop, None)
+        if closer is not None:
+            await closer.aclose()
+        if session is not None and not session.closed:
+            await session.close()
+
+
+# Shared pool used by every FlightAPIClient unless one is given explicitly.
+session_pool = SessionPool()
@@ -0,0 +1,268 @@
+import atexit
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .flight import Flight
+from .models import FareSnapshot
+
+logger = logging.getLogger(__name__)
+
+FlightLike = Union[Flight, Dict[str, Any]]
+
+# (origin, destination, flight_date, airline, stops, duration_minutes, miles, observed_at)
+SnapshotRow = Tuple[str, str, date, str, int, Optional[int], int, datetime]
+
+
+class FareSnapshotWriter:
+    """
+    Buffers the flights of fetched days and writes them to FareSnapshot in bulk
+    inserts from a background thread, so searches never wait on the database.
+
+    record() only appends plain tuples to a buffer; the thread wakes up every
+    `flush_interval` seconds, or as soon as `batch_size` rows are waiting, and
+    inserts them with bulk_create. A failed insert puts its rows back in front of
+    the buffer for the next flush. When the database falls behind, rows beyond
+    `max_buffer` are dropped rather than growing the process memory. close()
+    writes what is left when the process exits.
+    """
+
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_FLUSH_INTERVAL = 5.0  # seconds
+    DEFAULT_MAX_BUFFER = 50000
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+        background: bool = True,
+    ):
+        """
+        Initialize the FareSnapshotWriter.
+
+        Args:
+            batch_size: Rows per bulk INSERT, and buffered rows that trigger an early flush.
+            flush_interval: Seconds between flushes of the background thread.
+            max_buffer: Most rows kept waiting; newer rows are dropped beyond it.
+            background: Start a background thread on the first record(). Without it,
+                        rows are only written by explicit flush() calls.
+        """
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.flush_interval = flush_interval or self.DEFAULT_FLUSH_INTERVAL
+        self.max_buffer = max_buffer or self.DEFAULT_MAX_BUFFER
+        self.background = background
+        self.dropped = 0
+        self._rows: List[SnapshotRow] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def to_rows(search: Dict[str, Any], flights: Iterable[FlightLike], fetched_at: float) -> List[SnapshotRow]:
+        observed_at = datetime.fromtimestamp(fetched_at, tz=timezone.utc)
+        rows = []
+        for flight in flights:
+            hours, minutes = flight.get('duration_hours'), flight.get('duration_minutes')
+            duration = None if hours is None and minutes is None else (hours or 0) * 60 + (minutes or 0)
+            rows.append((
+                search['origin'],
+                search['destination'],
+                search['departure_date'],
+                (flight.get('airline') or '')[:100],
+                flight.get('number_of_stops') or 0,
+                duration,
+                flight['miles_cost'],
+                observed_at,
+            ))
+        return rows
+
+    def record(self, search: Dict[str, Any], flights: Iterable[FlightLike], fetched_at: float) -> None:
+        """
+        Queues the flights of one fetched day.
+
+        Args:
+            search: The search dictionary of the day.
+            flights: The parsed flights.
+            fetched_at: UNIX timestamp of the response.
+        """
+        rows = self.to_rows(search, flights, fetched_at)
+        with self._lock:
+            room = self.max_buffer - len(self._rows)
+            if len(rows) > room:
+                self.dropped += len(rows) - max(room, 0)
+                rows = rows[:max(room, 0)]
+            self._rows.extend(rows)
+            waiting = len(self._rows)
+        if self.background:
+            self._ensure_thread()
+            if waiting >= self.batch_size:
+                self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Writes every queued row. If the insert fails, the rows are queued again,
+        ahead of the ones recorded meanwhile and within max_buffer, and the error
+        is raised.
+
+        Returns:
+            The number of rows written.
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            # Atomic, so a failed flush wrote none of the rows it queues again
+            with transaction.atomic():
+                FareSnapshot.objects.bulk_create(
+                    (FareSnapshot(
+                        origin=origin, destination=destination, flight_date=flight_date, airline=airline,
+                        stops=stops, duration_minutes=duration, miles=miles, observed_at=observed_at,
+                    ) for origin, destination, flight_date, airline, stops, duration, miles, observed_at in rows),
+                    batch_size=self.batch_size,
+                )
+        except Exception:
+            with self._lock:
+                rows.extend(self._rows)
+                self.dropped += max(len(rows) - self.max_buffer, 0)
+                self._rows = rows[:self.max_buffer]
+            raise
+        return len(rows)
+
+    def close(self) -> int:
+        """
+        Stops the background thread and writes the queued rows. Registered to run
+        at exit for the process-wide writer, since the thread is a daemon.
+
+        Returns:
+            The number of rows written.
+        """
+        self._closed.set()
+        self._wake.set()
+        try:
+            return self.flush()
+        except Exception as e:
+            logger.warning(f"Failed to write {len(self)} fare snapshots on close: {e}")
+            return 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='fare-snapshot-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closed.is_set():
+                return
+            # The thread keeps its own connection; drop it if it went stale
+            close_old_connections()
+            try:
+                written = self.flush()
+            except Exception as e:
+                logger.warning(f"Failed to write fare snapshots: {e}")
+                continue
+            if written:
+                logger.debug(f"Wrote {written} fare snapshots")
+
+
+_snapshot_writer: Optional[FareSnapshotWriter] = None
+_snapshot_writer_lock = threading.Lock()
+
+
+def get_snapshot_writer() -> Optional[FareSnapshotWriter]:
+    """
+    Returns the process-wide snapshot writer described by settings.FARE_SNAPSHOTS,
+    building it on first use, or None when snapshots are disabled.
+    """
+    global _snapshot_writer
+    config = getattr(settings, 'FARE_SNAPSHOTS', {})
+    if not config.get('ENABLED', False):
+        return None
+    if _snapshot_writer is None:
+        with _snapshot_writer_lock:
+            if _snapshot_writer is None:
+                _snapshot_writer = FareSnapshotWriter(
+                    batch_size=config.get('BATCH_SIZE'),
+                    flush_interval=config.get('FLUSH_INTERVAL'),
+                    max_buffer=config.get('MAX_BUFFER'),
+                )
+                atexit.register(_snapshot_writer.close)
+    return _snapshot_writer
+
+
+def flush_snapshots() -> int:
+    """
+    Writes the rows queued in the process-wide snapshot writer, if one was built.
+    Meant for management commands, so their snapshots are written and any error
+    is reported before they exit.
+
+    Returns:
+        The number of rows written.
+    """
+    return _snapshot_writer.flush() if _snapshot_writer is not None else 0
+
+
+def compact_snapshots(
+    raw_days: int,
+    history_days: int,
+    now: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> Tuple[int, int]:
+    """
+    Keeps the snapshot table bounded.
+
+    Snapshots of flight dates more than `history_days` in the past are deleted.
+    Snapshots observed more than `raw_days` ago are rolled up to the cheapest one of
+    each route, flight date and observation day. Compaction is idempotent: a rolled
+    up day has a single row left, which later runs keep.
+
+    Args:
+        raw_days: Days every observation is kept before it is rolled up.
+        history_days: Days past its flight date a snapshot is kept.
+        now: Current time, for tests.
+        batch_size: Rows deleted per DELETE query.
+
+    Returns:
+        A tuple of (expired rows deleted, rows removed by the rollup).
+    """
+    now = now or datetime.now(timezone.utc)
+    expired, _ = FareSnapshot.objects.filter(flight_date__lt=now.date() - timedelta(days=history_days)).delete()
+
+    old_snapshots = FareSnapshot.objects.filter(observed_at__lt=now - timedelta(days=raw_days))
+    routes = old_snapshots.order_by().values_list('origin', 'destination').distinct()
+
+    rolled_up = 0
+    # One route at a time, so no rows are deleted while a cursor reads the table
+    for origin, destination in list(routes):
+        rows = (
+            old_snapshots.route(origin, destination)
+            .order_by('flight_date', 'observed_at')
+            .values_list('id', 'flight_date', 'observed_at', 'miles')
+        )
+        cheapest: Dict[Tuple[date, date], Tuple[int, int]] = {}  # (miles, id) per group
+        to_delete: List[int] = []
+        for snapshot_id, flight_date, observed_at, miles in rows:
+            key = (flight_date, observed_at.date())
+            if key not in cheapest:
+                cheapest[key] = (miles, snapshot_id)
+            elif (miles, snapshot_id) < cheapest[key]:
+                to_delete.append(cheapest[key][1])
+                cheapest[key] = (miles, snapshot_id)
+            else:
+                to_delete.append(snapshot_id)
+        for start in range(0, len(to_delete), batch_size):
+            rolled_up += FareSnapshot.objects.filter(id__in=to_delete[start:start + batch_size]).delete()[0]
+    return expired, rolled_up
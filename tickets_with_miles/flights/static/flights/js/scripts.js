@@ -3,4 +3,145 @@ flatpickr("input[type='date']", {
     maxDate: new Date().fp_incr(329),
     dateFormat: "d/m/Y",
     locale: "pt"
-});
\ No newline at end of file
+});
+
+// Airport suggestions for the origin and destination inputs
+const searchForm = document.querySelector("form[data-airport-autocomplete-url]");
+
+if (searchForm) {
+    const autocompleteUrl = searchForm.dataset.airportAutocompleteUrl;
+
+    ["id_origin", "id_destination"].forEach(function (inputId) {
+        const input = document.getElementById(inputId);
+        if (!input) {
+            return;
+        }
+
+        const datalist = document.createElement("datalist");
+        datalist.id = inputId + "_options";
+        input.after(datalist);
+        input.setAttribute("list", datalist.id);
+        input.setAttribute("autocomplete", "off");
+        // Names can be typed too; a suggestion fills in the 3-letter code.
+        // Several comma-separated airports can be given, only the last one is completed.
+        input.removeAttribute("maxlength");
+
+        let controller = null;
+        input.addEventListener("input", function () {
+            const parts = input.value.split(",");
+            const query = parts.pop().trim();
+            const prefix = parts.map(function (part) { return part.trim(); }).join(", ");
+            if (controller) {
+                controller.abort();
+            }
+            if (query.length < 2) {
+                datalist.replaceChildren();
+                return;
+            }
+
+            controller = new AbortController();
+            fetch(autocompleteUrl + "?q=" + encodeURIComponent(query), {signal: controller.signal})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    datalist.replaceChildren(...data.results.map(function (airport) {
+                        const option = document.createElement("option");
+                        option.value = prefix ? prefix + ", " + airport.iata_code : airport.iata_code;
+                        option.label = airport.label;
+                        return option;
+                    }));
+                })
+                .catch(function () {});
+        });
+    });
+}
+
+// Cheapest fare calendar for the rest of the searchable window
+const calendarButton = document.getElementById("fare-calendar-button");
+const calendarContainer = document.getElementById("fare-calendar");
+
+if (searchForm && calendarButton && calendarContainer) {
+    const calendarUrl = searchForm.dataset.fareCalendarUrl;
+    const monthFormat = new Intl.DateTimeFormat("pt-BR", {month: "long", year: "numeric", timeZone: "UTC"});
+
+    function renderCalendar(days) {
+        const prices = days.map(function (day) { return day.miles_cost; })
+            .filter(function (miles) { return miles !== null; })
+            .sort(function (a, b) { return a - b; });
+        // Colour by price tercile: cheap, average, expensive
+        const cheap = prices[Math.floor(prices.length / 3)];
+        const expensive = prices[Math.floor(prices.length * 2 / 3)];
+
+        const months = new Map();
+        days.forEach(function (day) {
+            const month = day.date.slice(0, 7);
+            if (!months.has(month)) {
+                months.set(month, []);
+            }
+            months.get(month).push(day);
+        });
+
+        calendarContainer.replaceChildren();
+        const legend = document.createElement("p");
+        legend.className = "fare-calendar-legend";
+        legend.textContent = "Valores tracejados são estimativas; clique em um dia para preencher a data.";
+        calendarContainer.append(legend);
+
+        months.forEach(function (monthDays, month) {
+            const title = document.createElement("h5");
+            title.textContent = monthFormat.format(new Date(month + "-01T00:00:00Z"));
+            const grid = document.createElement("div");
+            grid.className = "fare-calendar-month";
+
+            monthDays.forEach(function (day) {
+                const cell = document.createElement("button");
+                cell.type = "button";
+                cell.className = "fare-calendar-day";
+                if (!day.exact) {
+                    cell.classList.add("estimated");
+                }
+                if (day.miles_cost === null) {
+                    cell.classList.add("empty");
+                } else if (day.miles_cost <= cheap) {
+                    cell.classList.add("cheap");
+                } else if (day.miles_cost >= expensive) {
+                    cell.classList.add("expensive");
+                }
+                const [year, monthNumber, dayNumber] = day.date.split("-");
+                const miles = day.miles_cost === null ? "-" : Math.round(day.miles_cost / 1000) + "k";
+                cell.innerHTML = "<strong>" + dayNumber + "</strong><br>" + miles;
+                cell.title = day.exact ? "Menor tarifa encontrada" : "Estimativa";
+                cell.addEventListener("click", function () {
+                    const dateInput = document.getElementById("id_date");
+                    const value = dayNumber + "/" + monthNumber + "/" + year;
+                    if (dateInput._flatpickr) {
+                        dateInput._flatpickr.setDate(value, true, "d/m/Y");
+                    } else {
+                        dateInput.value = value;
+                    }
+                });
+                grid.append(cell);
+            });
+            calendarContainer.append(title, grid);
+        });
+    }
+
+    calendarButton.addEventListener("click", function () {
+        const params = new URLSearchParams(new FormData(searchForm));
+        params.delete("csrfmiddlewaretoken");
+        params.delete("date");
+        calendarContainer.textContent = "Montando o calendário de preços...";
+
+        fetch(calendarUrl + "?" + params.toString())
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                if (data.errors) {
+                    calendarContainer.textContent = Object.values(data.errors).flat().join(" ");
+                    return;
+                }
+                renderCalendar(data.days);
+            })
+            .catch(function () {
+                calendarContainer.textContent = "Ocorreu um erro ao montar o calendário de preços.";
+            });
+    });
+}
@@ -1,6 +1,8 @@
 from django import template
 from datetime import datetime
 
+from ..fare_cache import get_fare_cache
+
 register = template.Library()
 
 @register.filter(name='add_class')
@@ -9,4 +11,36 @@ def add_class(field, css_class):
 
 @register.filter
 def to_datetime(value, format="%Y-%m-%dT%H:%M:%S"):
-    return datetime.strptime(value, format)
\ No newline at end of file
+    return datetime.strptime(value, format)
+
+@register.filter
+def freshness(fetched_at):
+    """
+    Describes how long ago a result was fetched from a UNIX timestamp.
+    """
+    if not fetched_at:
+        return ''
+    minutes = int(datetime.now().timestamp() - fetched_at) // 60
+    if minutes < 1:
+        return 'agora'
+    if minutes < 60:
+        return f'há {minutes} min'
+    return f'há {minutes // 60} h'
+
+@register.filter
+def is_stale(fetched_at):
+    """
+    Tells whether a result fetched at the given UNIX timestamp is older than the TTL
+    of the fare cache in use. Without a fare cache every result was just fetched.
+    """
+    cache = get_fare_cache()
+    if not fetched_at or cache is None:
+        return False
+    return not cache.is_fresh(fetched_at)
+
+@register.filter
+def round_trip_legs(round_trip):
+    """
+    Pairs the outbound and inbound flights of a round trip with their labels.
+    """
+    return [('Ida', round_trip['outbound']), ('Volta', round_trip['inbound'])]
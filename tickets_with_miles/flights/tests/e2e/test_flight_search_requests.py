@@ -1,5 +1,6 @@
 from django.test import TestCase
 from flights.models import Airport
+from flights.result_store import SearchResultStore
 from django.urls import reverse
 from django.contrib.messages import get_messages
 
@@ -52,10 +53,11 @@ class FlightSearchRequestsTest(TestCase):
         # Check status -> Redirect (status 302)
         self.assertEqual(response.status_code, 302)
         
-        # Check if 'flights' were returned
+        # Check if 'flights' were stored
         session = self.client.session
-        self.assertIn('flights', session)
-        self.assertGreater(len(session['flights']), 0)
+        self.assertIn('search_id', session)
+        result = SearchResultStore().load(session['search_id'])
+        self.assertGreater(len(result['flights']), 0)
 
     def test_valid_request_no_flights_shows_no_flights_message(self):
 
@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.contrib.messages import get_messages
 from django.core.management import call_command
 from flights.models import Airport
+from flights.result_store import SearchResultStore
 from datetime import date
 import time
 
@@ -37,8 +38,9 @@ class FlightSearchIntegrationTest(TestCase):
         self.assertEqual(response.status_code, 302)
 
         session = self.client.session
-        self.assertIn('flights', session)
-        self.assertGreater(len(session['flights']), 0)
+        self.assertIn('search_id', session)
+        result = SearchResultStore().load(session['search_id'])
+        self.assertGreater(len(result['flights']), 0)
 
 
     def test_flight_search_with_flexibility_multiple_dates(self):
@@ -58,8 +60,9 @@ class FlightSearchIntegrationTest(TestCase):
         self.assertEqual(response.status_code, 302)
 
         session = self.client.session
-        self.assertIn('flights', session)
-        self.assertGreater(len(session['flights']), 0)
+        self.assertIn('search_id', session)
+        result = SearchResultStore().load(session['search_id'])
+        self.assertGreater(len(result['flights']), 0)
 
     def test_flight_search_no_flights_found(self):
         """
@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase, override_settings
+from flights.airport_groups import expand_airport_codes, split_airport_codes
+
+
+class AirportGroupsTest(SimpleTestCase):
+    def test_split_airport_codes(self):
+        self.assertEqual(split_airport_codes(' gru, CGH,,gru '), ['GRU', 'CGH'])
+        self.assertEqual(split_airport_codes(['lis', 'OPO']), ['LIS', 'OPO'])
+
+    def test_expand_metro_codes(self):
+        """
+        Test that metro area codes expand to their airports without duplicates.
+        """
+        self.assertEqual(expand_airport_codes('SAO, CNF'), ['GRU', 'CGH', 'VCP', 'CNF'])
+        self.assertEqual(expand_airport_codes('GRU,SAO'), ['GRU', 'CGH', 'VCP'])
+        self.assertEqual(expand_airport_codes('LIS'), ['LIS'])
+
+    @override_settings(AIRPORT_GROUPS={'POR': ('LIS', 'OPO'), 'SAO': ('GRU',)})
+    def test_settings_groups(self):
+        self.assertEqual(expand_airport_codes('POR'), ['LIS', 'OPO'])
+        self.assertEqual(expand_airport_codes('SAO'), ['GRU'])
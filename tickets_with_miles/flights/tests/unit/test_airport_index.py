@@ -0,0 +1,48 @@
+from django.db import OperationalError
+from django.test import TestCase
+from unittest.mock import patch
+from flights.airport_index import AirportIndex, get_airport_index, invalidate_airport_index, warm_airport_index
+from flights.models import Airport
+
+
+class AirportIndexTest(TestCase):
+    def setUp(self):
+        invalidate_airport_index()
+        Airport.objects.create(name='Lisbon Airport', iata_code='LIS', state_code='', country_code='PT', country_name='Portugal')
+
+    def test_lookup_is_query_free_once_built(self):
+        """
+        Test that the index answers validity and metadata lookups without queries.
+        """
+        get_airport_index()
+
+        with self.assertNumQueries(0):
+            index = get_airport_index()
+            self.assertIn('LIS', index)
+            self.assertNotIn('QQQ', index)
+            self.assertEqual(index.get('LIS').country_name, 'Portugal')
+
+    def test_index_is_rebuilt_after_airport_changes(self):
+        """
+        Test that saving or deleting an airport invalidates the index.
+        """
+        first_index = get_airport_index()
+        airport = Airport.objects.create(name='Porto', iata_code='OPO', state_code='', country_code='PT', country_name='Portugal')
+
+        self.assertIsNot(get_airport_index(), first_index)
+        self.assertIn('OPO', get_airport_index())
+
+        airport.delete()
+        self.assertNotIn('OPO', get_airport_index())
+
+    def test_warm_up_builds_the_index_or_leaves_it_for_first_use(self):
+        """
+        Test that the startup warm-up builds the index, and only warns when the table can't be read.
+        """
+        with patch.object(AirportIndex, 'build', side_effect=OperationalError('no such table: flights_airport')):
+            with self.assertLogs('flights.airport_index', 'WARNING'):
+                warm_airport_index()
+
+        warm_airport_index()
+        with self.assertNumQueries(0):
+            self.assertIn('LIS', get_airport_index())
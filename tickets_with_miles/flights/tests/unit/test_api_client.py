@@ -1,7 +1,10 @@
 from django.test import TestCase
-from unittest.mock import patch, AsyncMock, ANY
+from unittest.mock import patch, AsyncMock, MagicMock, ANY
 from datetime import date
 from flights.api_client import FlightAPIClient
+from flights.resilience import CircuitBreaker, RetryPolicy
+from flights.scheduler import FetchScheduler
+import aiohttp
 import asyncio
 
 
@@ -16,6 +19,18 @@ class FlightAPIClientTestCase(TestCase):
     def setUp(self):
         self.client = FlightAPIClient(api_key='fake-api-key', telemetry='fake-telemetry')
 
+    def run_and_close(self, coro):
+        """
+        Runs a client coroutine and closes the pooled session bound to its loop.
+        """
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.client.close()
+
+        return asyncio.run(run())
+
     @patch('flights.api_client.FlightAPIClient.fetch', new_callable=AsyncMock)
     def test_search_flights(self, mock_fetch):
         """
@@ -39,7 +54,7 @@ class FlightAPIClientTestCase(TestCase):
             ]
         }
 
-        result = asyncio.run(self.client.search_flights(
+        result = self.run_and_close(self.client.search_flights(
             origin=self.origin,
             destination=self.destination,
             departure_date=self.departure_date,
@@ -86,7 +101,7 @@ class FlightAPIClientTestCase(TestCase):
             {'flights': [{'origin': 'RIO'      , 'destination': 'NYC'           , 'departure': self.departure_date.strftime('%Y-%m-%d')}]}
         ]
 
-        result = asyncio.run(self.client.search_flights_bulk(searches))
+        result = self.run_and_close(self.client.search_flights_bulk(searches))
         self.assertEqual(mock_fetch.call_count, 2)
 
         self.assertEqual(result[0]['flights'][0]['origin'], self.origin)
@@ -97,10 +112,222 @@ class FlightAPIClientTestCase(TestCase):
         # Mocking an error in an API request
         mock_fetch.return_value = {'error': 'Network error'}
 
-        result = asyncio.run(self.client.search_flights(
+        result = self.run_and_close(self.client.search_flights(
             origin=self.origin,
             destination=self.destination,
             departure_date=self.departure_date,
         ))
 
         self.assertEqual(result['error'], 'Network error')
+
+    @patch('flights.api_client.FlightAPIClient.fetch', new_callable=AsyncMock)
+    def test_searches_share_pooled_session(self, mock_fetch):
+        """
+        Test that consecutive searches on the same loop reuse one pooled session.
+        """
+        mock_fetch.return_value = {}
+
+        async def run():
+            await self.client.search_flights(self.origin, self.destination, self.departure_date)
+            await self.client.search_flights_bulk([
+                {'origin': self.origin, 'destination': self.destination, 'departure_date': self.departure_date},
+            ])
+
+        self.run_and_close(run())
+
+        first_session = mock_fetch.call_args_list[0].args[0]
+        second_session = mock_fetch.call_args_list[1].args[0]
+        self.assertIs(first_session, second_session)
+
+    def test_search_flights_bulk_respects_in_flight_cap(self):
+        """
+        Test that bulk searches never exceed the scheduler's in-flight cap.
+        """
+        self.client = FlightAPIClient(
+            api_key='fake-api-key',
+            telemetry='fake-telemetry',
+            scheduler=FetchScheduler(max_in_flight=2),
+        )
+        running = []
+        peak = []
+
+        async def fake_request(session, params):
+            running.append(params)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(params)
+            return {'departureDate': params['departureDate']}
+
+        searches = [
+            {'origin': self.origin, 'destination': self.destination, 'departure_date': date(2025, 3, day)}
+            for day in range(1, 11)
+        ]
+        with patch.object(self.client, 'request', side_effect=fake_request):
+            result = self.run_and_close(self.client.search_flights_bulk(searches))
+
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(result[9]['departureDate'], '2025-03-10')
+
+    def test_identical_concurrent_searches_are_coalesced(self):
+        """
+        Test that identical searches running at the same time send one request.
+        """
+        async def fake_request(session, params):
+            await asyncio.sleep(0.01)
+            return {'departureDate': params['departureDate']}
+
+        async def run():
+            return await asyncio.gather(
+                self.client.search_flights(self.origin, self.destination, self.departure_date),
+                self.client.search_flights(self.origin, self.destination, self.departure_date),
+                self.client.search_flights(self.origin, self.destination, self.return_date),
+            )
+
+        with patch.object(self.client, 'request', side_effect=fake_request) as mock_request:
+            results = self.run_and_close(run())
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertIs(results[0], results[1])
+        self.assertEqual(results[2]['departureDate'], '2025-06-10')
+
+    def test_search_flights_as_completed_yields_in_completion_order(self):
+        """
+        Test that responses are yielded as they arrive, tagged with their search index.
+        """
+        async def fake_request(session, params):
+            # Later dates answer first
+            await asyncio.sleep(0.01 * (30 - int(params['departureDate'][-2:])))
+            return {'departureDate': params['departureDate']}
+
+        searches = [
+            {'origin': self.origin, 'destination': self.destination, 'departure_date': date(2025, 3, day)}
+            for day in (25, 26, 27)
+        ]
+
+        async def run():
+            return [item async for item in self.client.search_flights_as_completed(searches)]
+
+        with patch.object(self.client, 'request', side_effect=fake_request):
+            results = self.run_and_close(run())
+
+        self.assertEqual([index for index, _ in results], [2, 1, 0])
+        self.assertEqual(results[0][1]['departureDate'], '2025-03-27')
+
+    def resilient_client(self, attempts=3, failure_threshold=5):
+        return FlightAPIClient(
+            api_key='fake-api-key',
+            telemetry='fake-telemetry',
+            retry_policy=RetryPolicy(attempts=attempts, base_delay=0, max_delay=5),
+            circuit_breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=60),
+        )
+
+    def test_transient_errors_are_retried(self):
+        """
+        Test that 5xx responses are retried until one succeeds, waiting as long as
+        the Retry-After header asks.
+        """
+        self.client = self.resilient_client()
+        responses = [
+            {'error': '503, Service Unavailable', 'status': 503, 'retry_after': None},
+            {'error': '429, Too Many Requests', 'status': 429, 'retry_after': 2.0},
+            {'flights': []},
+        ]
+
+        with patch.object(self.client, 'request', side_effect=responses) as mock_request, \
+                patch('flights.api_client.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            result = self.run_and_close(self.client.search_flights(self.origin, self.destination, self.departure_date))
+
+        self.assertEqual(result, {'flights': []})
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(mock_sleep.await_args_list[-1].args[0], 2.0)
+        self.assertEqual(self.client.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+    def test_client_errors_and_exhausted_retries_return_the_error(self):
+        """
+        Test that 4xx responses are not retried and retries stop after the last attempt.
+        """
+        self.client = self.resilient_client(attempts=2)
+        forbidden = {'error': '403, Forbidden', 'status': 403, 'retry_after': None}
+        unavailable = {'error': '503, Service Unavailable', 'status': 503, 'retry_after': None}
+
+        with patch.object(self.client, 'request', side_effect=[forbidden, unavailable, unavailable]) as mock_request, \
+                patch('flights.api_client.asyncio.sleep', new_callable=AsyncMock):
+            first = self.run_and_close(self.client.search_flights(self.origin, self.destination, self.departure_date))
+            second = self.run_and_close(self.client.search_flights(self.origin, self.destination, self.return_date))
+
+        self.assertEqual(first, forbidden)
+        self.assertEqual(second, unavailable)
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_open_circuit_fails_fast(self):
+        """
+        Test that once the host failed often enough, requests are not sent at all.
+        """
+        self.client = self.resilient_client(attempts=1, failure_threshold=2)
+        searches = [
+            {'origin': self.origin, 'destination': self.destination, 'departure_date': date(2025, 3, day)}
+            for day in range(1, 6)
+        ]
+
+        with patch.object(self.client, 'request', return_value={'error': 'Connection refused'}) as mock_request:
+            results = []
+            for search in searches:
+                results.extend(self.run_and_close(self.client.search_flights_bulk([search])))
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertIn('Circuit open', results[-1]['error'])
+        self.assertEqual(self.client.circuit_breaker.state, CircuitBreaker.OPEN)
+
+    def test_request_reports_status_and_retry_after(self):
+        """
+        Test that HTTP errors carry their status and Retry-After seconds.
+        """
+        response = MagicMock()
+        response.raise_for_status.side_effect = aiohttp.ClientResponseError(
+            request_info=MagicMock(), history=(), status=429, message='Too Many Requests',
+            headers={'Retry-After': '7'},
+        )
+        session = MagicMock()
+        session.get.return_value.__aenter__.return_value = response
+
+        result = asyncio.run(self.client.request(session, {}))
+
+        self.assertEqual((result['status'], result['retry_after']), (429, 7.0))
+        self.assertIn('Too Many Requests', result['error'])
+
+    def test_interactive_search_raises_the_priority_of_a_shared_refresh(self):
+        """
+        Test that a search joining a queued background request moves it ahead of
+        the other queued background requests.
+        """
+        self.client = FlightAPIClient(
+            api_key='fake-api-key',
+            telemetry='fake-telemetry',
+            scheduler=FetchScheduler(max_in_flight=1),
+            circuit_breaker=CircuitBreaker(),
+        )
+        order = []
+
+        async def fake_request(session, params):
+            order.append(params['departureDate'])
+            await asyncio.sleep(0.01)
+            return {'departureDate': params['departureDate']}
+
+        refreshes = [
+            {'origin': self.origin, 'destination': self.destination, 'departure_date': date(2025, 3, day)}
+            for day in (1, 2, 3, 4)
+        ]
+
+        async def run():
+            background = asyncio.create_task(self.client.search_flights_bulk(refreshes, priority=5))
+            # One refresh running, the other three queued
+            while self.client.scheduler.waiting < 3:
+                await asyncio.sleep(0)
+            await self.client.search_flights(self.origin, self.destination, date(2025, 3, 4))
+            background.cancel()
+            await asyncio.gather(background, return_exceptions=True)
+
+        with patch.object(self.client, 'request', side_effect=fake_request):
+            self.run_and_close(run())
+
+        self.assertEqual(order[:2], ['2025-03-01', '2025-03-04'])
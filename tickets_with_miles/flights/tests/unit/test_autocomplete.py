@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase
+from flights.airport_index import AirportInfo
+from flights.autocomplete import AirportAutocomplete, fold
+
+
+class AirportAutocompleteTest(SimpleTestCase):
+    def setUp(self):
+        self.autocomplete = AirportAutocomplete([
+            AirportInfo('GRU', 'Sao Paulo Guarulhos Intl', 'SP', 'BR', 'Brazil'),
+            AirportInfo('CGH', 'São Paulo Congonhas', 'SP', 'BR', 'Brazil'),
+            AirportInfo('LIS', 'Lisbon Lisboa', '', 'PT', 'Portugal'),
+            AirportInfo('OPO', 'Porto', '', 'PT', 'Portugal'),
+            AirportInfo('GRO', 'Girona Costa Brava', '', 'ES', 'Spain'),
+        ])
+
+    def codes(self, query, limit=10):
+        return [airport.iata_code for airport in self.autocomplete.search(query, limit)]
+
+    def test_fold_strips_accents_case_and_punctuation(self):
+        """
+        Test that text is normalized before matching.
+        """
+        self.assertEqual(fold('  São-Paulo/Congonhas '), 'sao paulo congonhas')
+
+    def test_exact_iata_code_ranks_first(self):
+        """
+        Test that an exact IATA match comes before other prefix matches.
+        """
+        self.assertEqual(self.codes('GRU'), ['GRU'])
+        self.assertEqual(self.codes('gr'), ['GRO', 'GRU'])
+        self.assertEqual(self.codes('opo'), ['OPO'])
+
+    def test_matches_names_and_places_by_prefix(self):
+        """
+        Test that every query word must match a prefix of a name, state or country word.
+        """
+        self.assertEqual(self.codes('sao pau'), ['CGH', 'GRU'])
+        self.assertEqual(self.codes('sao guar'), ['GRU'])
+        self.assertEqual(self.codes('portugal'), ['LIS', 'OPO'])
+        self.assertEqual(self.codes('sao lisboa'), [])
+
+    def test_ignores_accents(self):
+        """
+        Test that accented queries match unaccented names and vice versa.
+        """
+        self.assertEqual(self.codes('São'), ['CGH', 'GRU'])
+        self.assertEqual(self.codes('congonhas'), ['CGH'])
+
+    def test_tolerates_one_typo(self):
+        """
+        Test that words within edit distance 1 of a whole token still match.
+        """
+        self.assertEqual(self.codes('lisbn'), ['LIS'])
+        self.assertEqual(self.codes('guarulos'), ['GRU'])
+        self.assertEqual(self.codes('prtugl'), [])
+
+    def test_limit_and_empty_query(self):
+        """
+        Test that results are capped and that blank queries return nothing.
+        """
+        self.assertEqual(len(self.codes('b', limit=1)), 1)
+        self.assertEqual(self.codes('  '), [])
+        self.assertEqual(self.codes('gru', limit=0), [])
@@ -0,0 +1,93 @@
+from django.test import TestCase
+from flights.coalescing import SingleFlight
+import asyncio
+
+
+class SingleFlightTestCase(TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.calls = 0
+
+    async def slow_call(self, value):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return value
+
+    async def failing_call(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError('upstream failed')
+
+    def test_concurrent_callers_share_one_call(self):
+        """
+        Test that concurrent callers with the same key get one shared result.
+        """
+        async def run():
+            return await asyncio.gather(
+                self.single_flight.do('GRU-LIS', self.slow_call, 'first'),
+                self.single_flight.do('GRU-LIS', self.slow_call, 'second'),
+                self.single_flight.do('CNF-GRU', self.slow_call, 'third'),
+            )
+
+        results = asyncio.run(run())
+
+        self.assertEqual(results, ['first', 'first', 'third'])
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(self.single_flight), 0)
+
+    def test_errors_reach_every_caller(self):
+        """
+        Test that an error is raised to every waiting caller and then forgotten.
+        """
+        async def run():
+            return await asyncio.gather(
+                self.single_flight.do('GRU-LIS', self.failing_call),
+                self.single_flight.do('GRU-LIS', self.failing_call),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(self.single_flight), 0)
+
+    def test_cancelling_one_caller_keeps_the_shared_call(self):
+        """
+        Test that a cancelled caller does not cancel the call for the others,
+        while the call is cancelled once every caller is gone.
+        """
+        async def run():
+            first = asyncio.create_task(self.single_flight.do('GRU-LIS', self.slow_call, 'value'))
+            second = asyncio.create_task(self.single_flight.do('GRU-LIS', self.slow_call, 'value'))
+            await asyncio.sleep(0)
+            first.cancel()
+            shared_result = await second
+
+            third = asyncio.create_task(self.single_flight.do('CNF-GRU', self.slow_call, 'value'))
+            await asyncio.sleep(0)
+            third.cancel()
+            await asyncio.gather(third, return_exceptions=True)
+            await asyncio.sleep(0)
+            return first.cancelled(), shared_result
+
+        first_cancelled, shared_result = asyncio.run(run())
+
+        self.assertTrue(first_cancelled)
+        self.assertEqual(shared_result, 'value')
+        self.assertEqual(len(self.single_flight), 0)
+
+    def test_joining_callers_see_the_shared_call_arguments(self):
+        """
+        Test that on_join is called with the running call's arguments, by joiners only.
+        """
+        joined = []
+
+        async def run():
+            return await asyncio.gather(
+                self.single_flight.do('key', self.slow_call, 'first', on_join=joined.append),
+                self.single_flight.do('key', self.slow_call, 'second', on_join=joined.append),
+            )
+
+        self.assertEqual(asyncio.run(run()), ['first', 'first'])
+        self.assertEqual(joined, ['first'])
@@ -0,0 +1,78 @@
+from datetime import date
+from unittest import skipUnless
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from flights import columnar
+from flights.columnar import FlightTable, rank_flights
+from flights.flight import Flight
+
+
+def make_flights():
+    return [
+        Flight('GOL', 30000, 2, 0, '2025-03-10T08:00:00', 'CNF', 1, None, 'GRU'),
+        Flight('LATAM', 20000, 1, 30, '2025-03-11T09:00:00', 'CNF', 0, None, 'GRU'),
+        Flight('GOL', 25000, 1, 10, '2025-03-10T18:00:00', 'CNF', 0, None, 'GRU'),
+        Flight('AZUL', 25000, None, None, None, 'CNF', 2, None, 'VCP'),
+        Flight('AZUL', 40000, 0, 55, '2025-03-11T07:00:00', 'CNF', 0, None, 'VCP'),
+    ]
+
+
+def miles(flights):
+    return [flight['miles_cost'] for flight in flights]
+
+
+@skipUnless(columnar.NUMPY_AVAILABLE, 'numpy is not installed')
+class FlightTableTest(SimpleTestCase):
+    def setUp(self):
+        self.flights = make_flights()
+        self.table = FlightTable.from_flights(self.flights)
+
+    def test_filter(self):
+        """
+        Test that every condition narrows the rows and that rows map back to the flights.
+        """
+        self.assertEqual(miles(self.table.filter(max_miles=25000)), [20000, 25000, 25000])
+        self.assertEqual(miles(self.table.filter(max_stops=0, airlines=['GOL', 'AZUL'])), [25000, 40000])
+        self.assertEqual(miles(self.table.filter(max_duration=70)), [25000, 40000])
+        self.assertEqual(miles(self.table.filter(destinations=['VCP'])), [25000, 40000])
+        self.assertEqual(
+            miles(self.table.filter(departure_from='2025-03-10T12:00:00', departure_to='2025-03-11T08:00:00')),
+            [25000, 40000],
+        )
+        self.assertEqual(len(self.table.filter(airlines=['TAP'])), 0)
+
+    def test_sort_is_stable_with_missing_values_last(self):
+        self.assertEqual(miles(self.table.sort('miles')), [20000, 25000, 25000, 30000, 40000])
+        self.assertEqual(miles(self.table.sort('duration')), [40000, 25000, 20000, 30000, 25000])
+        self.assertEqual(miles(self.table.sort('departure')), [30000, 25000, 40000, 20000, 25000])
+        self.assertEqual(miles(self.table.sort('miles', descending=True))[0], 40000)
+        with self.assertRaises(ValueError):
+            self.table.sort('price')
+
+    def test_group_by_date_and_cheapest_per_day(self):
+        groups = self.table.group_by_date()
+
+        self.assertEqual(list(groups), [date(2025, 3, 10), date(2025, 3, 11), None])
+        self.assertEqual(miles(groups[date(2025, 3, 10)]), [30000, 25000])
+        self.assertEqual(miles(self.table.cheapest_per_day()), [25000, 20000, 25000])
+        self.assertEqual(len(FlightTable.from_flights([]).cheapest_per_day()), 0)
+
+    def test_accepts_flight_dicts(self):
+        table = FlightTable.from_flights([flight.to_dict() for flight in self.flights])
+        self.assertEqual(miles(table.filter(max_stops=0).sort('miles')), [20000, 25000, 40000])
+
+
+class RankFlightsTest(SimpleTestCase):
+    def test_python_fallback_matches_numpy(self):
+        """
+        Test that ranking gives the same order with or without NumPy.
+        """
+        for sort_by in columnar.SORT_KEYS:
+            for cheapest_per_day in (False, True):
+                with patch.object(columnar, 'NUMPY_AVAILABLE', False):
+                    expected = rank_flights(make_flights(), sort_by, cheapest_per_day)
+                if columnar.NUMPY_AVAILABLE:
+                    self.assertEqual(rank_flights(make_flights(), sort_by, cheapest_per_day), expected)
+
+        with patch.object(columnar, 'NUMPY_AVAILABLE', False):
+            self.assertEqual(miles(rank_flights(make_flights(), 'duration', True)), [25000, 20000, 25000])
@@ -0,0 +1,76 @@
+import json
+from unittest import skipUnless
+from django.test import SimpleTestCase
+from flights import decoding
+from flights.decoding import decode_search_response
+from flights.services import FlightService
+
+
+def make_flight(miles, **overrides):
+    flight = {
+        'uid': 'abc', 'cabin': 'ECONOMIC', 'availableSeats': 7,
+        'airline': {'code': 'G3', 'name': 'GOL'},
+        'fareList': [
+            {'type': 'SMILES', 'miles': miles, 'money': 0, 'taxes': {'miles': 10}},
+            {'type': 'SMILES_MONEY', 'miles': 10},
+        ],
+        'duration': {'hours': 1, 'minutes': 5},
+        'departure': {'date': '2025-03-10T10:00:00', 'airport': {'code': 'CNF', 'name': 'Confins'}},
+        'arrival': {'date': '2025-03-10T11:05:00', 'airport': {'code': 'GRU', 'name': 'Guarulhos'}},
+        'stops': 0,
+        'legList': [{'flightNumber': '1234', 'equipment': '738'}],
+    }
+    flight.update(overrides)
+    return flight
+
+
+class DecodeSearchResponseTest(SimpleTestCase):
+    def setUp(self):
+        self.service = FlightService(client=object(), cache=None)
+
+    def assert_same_flights(self, payload):
+        body = json.dumps(payload).encode()
+        self.assertEqual(
+            self.service.extract_flights(decode_search_response(body), 'url'),
+            self.service.extract_flights(json.loads(body), 'url'),
+        )
+
+    def test_extracted_flights_match_plain_json(self):
+        """
+        Test that extract_flights sees the same data from either decoder.
+        """
+        self.assert_same_flights({
+            'requestedFlightSegmentList': [
+                {'flightList': [make_flight(10000), make_flight(12500.5), make_flight(0)]},
+                {'flightList': [make_flight(8000, stops=None, duration={})]},
+                {'flightList': []},
+            ],
+            'hasMore': False,
+        })
+        self.assert_same_flights({})
+
+    def test_unexpected_types_fall_back_to_plain_json(self):
+        """
+        Test that responses outside the schema are decoded in full.
+        """
+        payload = {'requestedFlightSegmentList': [{'flightList': [make_flight('9000')]}]}
+        self.assertEqual(decode_search_response(json.dumps(payload).encode()), payload)
+        self.assert_same_flights(payload)
+
+    def test_invalid_json_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            decode_search_response(b'<html>')
+
+    @skipUnless(decoding.TYPED_DECODING_AVAILABLE, 'msgspec is not installed')
+    def test_unused_fields_are_skipped(self):
+        """
+        Test that the typed decoder keeps only the fields the parser reads.
+        """
+        body = json.dumps({'requestedFlightSegmentList': [{'flightList': [make_flight(10000)]}], 'hasMore': False})
+        decoded = decode_search_response(body.encode())
+
+        flight = decoded['requestedFlightSegmentList'][0]['flightList'][0]
+        self.assertEqual(set(decoded), {'requestedFlightSegmentList'})
+        self.assertEqual(set(flight), {'airline', 'fareList', 'duration', 'departure', 'arrival', 'stops'})
+        self.assertEqual(flight['departure'], {'date': '2025-03-10T10:00:00', 'airport': {'code': 'CNF'}})
+        self.assertEqual(flight['fareList'][0], {'type': 'SMILES', 'miles': 10000})
@@ -0,0 +1,61 @@
+from datetime import date
+from django.test import TestCase
+from unittest.mock import patch
+from flights.fare_cache import DjangoFareCache, FareCache, MemoryFareCache
+
+
+class MemoryFareCacheTest(TestCase):
+    def setUp(self):
+        self.key = FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0)
+        self.flights = [{'airline': 'TAP', 'miles_cost': 90000}]
+
+    def test_get_returns_stored_flights(self):
+        """
+        Test that a stored day is returned until it expires.
+        """
+        cache = MemoryFareCache(ttl=60)
+        cache.set(self.key, self.flights)
+        self.assertEqual(cache.get(self.key), self.flights)
+
+        with patch('flights.fare_cache.time.time', return_value=10 ** 12):
+            self.assertIsNone(cache.get(self.key))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_is_evicted(self):
+        """
+        Test that the least recently used day is evicted when the cache is full.
+        """
+        cache = MemoryFareCache(ttl=60, max_entries=2)
+        other_key = FareCache.make_key('GRU', 'LIS', date(2025, 4, 11), 1, 0, 0)
+        third_key = FareCache.make_key('GRU', 'LIS', date(2025, 4, 12), 1, 0, 0)
+
+        cache.set(self.key, self.flights)
+        cache.set(other_key, [])
+        cache.get(self.key)
+        cache.set(third_key, [])
+
+        self.assertIsNotNone(cache.get(self.key))
+        self.assertIsNone(cache.get(other_key))
+        self.assertIsNotNone(cache.get(third_key))
+
+
+class FareCacheTest(TestCase):
+    def test_backends_must_implement_storage(self):
+        """
+        Test that FareCache can't be used without get_entry and set.
+        """
+        with self.assertRaises(TypeError):
+            FareCache()
+
+
+class DjangoFareCacheTest(TestCase):
+    def test_round_trip_through_django_cache(self):
+        """
+        Test that flights are stored in and read back from the Django cache.
+        """
+        cache = DjangoFareCache(ttl=60)
+        key = FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0)
+        cache.set(key, [{'miles_cost': 1000}])
+
+        self.assertEqual(cache.to_cache_key(key), 'fares:GRU:LIS:2025-04-10:1:0:0')
+        self.assertEqual(cache.get(key), [{'miles_cost': 1000}])
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from django.test import SimpleTestCase
+from flights.fare_calendar import CalendarDay, FareCalendarPlanner
+from flights.flight import Flight
+
+
+class FareCalendarPlannerTest(SimpleTestCase):
+    def setUp(self):
+        self.start = date(2025, 1, 1)
+        self.planner = FareCalendarPlanner(self.start, 100)
+
+    def day(self, offset):
+        return self.start + timedelta(days=offset)
+
+    def test_sample_dates(self):
+        """
+        Test that the initial sample covers the window every SAMPLE_STEP days, skips
+        known days and spreads out when the limit is lower.
+        """
+        samples = self.planner.sample_dates({}, 60)
+        self.assertEqual(samples[0], self.start)
+        self.assertEqual(samples[-1], self.planner.end_date)
+        self.assertEqual(len(samples), 11)
+
+        self.assertNotIn(self.day(10), self.planner.sample_dates({self.day(10): 5000}, 60))
+
+        samples = self.planner.sample_dates({}, 4)
+        self.assertEqual(len(samples), 4)
+        self.assertGreaterEqual((samples[-1] - samples[0]).days, 60)
+
+    def test_refine_around_local_minima(self):
+        """
+        Test that refinement searches the gaps next to the cheapest known days first.
+        """
+        known = {self.day(offset): 50000 for offset in range(0, 100, 10)}
+        known[self.day(50)] = 20000
+        known[self.day(99)] = 50000
+
+        self.assertEqual(self.planner.refine_dates(known, 2), [self.day(45), self.day(55)])
+
+    def test_refine_stops_when_every_day_is_known(self):
+        known = {self.day(offset): 1000 for offset in range(100)}
+
+        self.assertEqual(self.planner.refine_dates(known, 10), [])
+        self.assertEqual(self.planner.refine_dates({}, 10), [])
+
+    def test_build_estimates_unknown_days(self):
+        """
+        Test that unknown days are interpolated between the known days around them.
+        """
+        planner = FareCalendarPlanner(self.start, 6)
+        known = {
+            self.day(1): Flight(miles_cost=10000),
+            self.day(3): None,
+            self.day(4): Flight(miles_cost=20000),
+        }
+
+        calendar = planner.build(known)
+
+        self.assertEqual([day.miles_cost for day in calendar], [10000, 10000, 13333, None, 20000, 20000])
+        self.assertEqual([day.exact for day in calendar], [False, True, False, True, True, False])
+        self.assertEqual(calendar[1], CalendarDay(self.day(1), 10000, True, known[self.day(1)]))
+        self.assertEqual(calendar[2].to_dict(), {'date': '2025-01-03', 'miles_cost': 13333, 'exact': False, 'flight': None})
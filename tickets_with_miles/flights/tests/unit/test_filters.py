@@ -0,0 +1,38 @@
+from datetime import time
+from django.test import SimpleTestCase
+from flights.filters import FlightFilters
+from flights.flight import Flight
+
+
+class FlightFiltersTest(SimpleTestCase):
+    def setUp(self):
+        self.flight = Flight('GOL', 30000, 2, 15, '2025-03-10T08:30:00', 'CNF', 1, None, 'GRU')
+
+    def test_empty_filters_are_falsy(self):
+        self.assertFalse(FlightFilters())
+        self.assertTrue(FlightFilters(max_stops=0))
+
+    def test_accepts(self):
+        """
+        Test each condition on a parsed flight.
+        """
+        self.assertTrue(FlightFilters().accepts(self.flight))
+        self.assertTrue(FlightFilters(max_stops=1, airlines=['gol'], max_duration=135, max_miles=30000).accepts(self.flight))
+        self.assertFalse(FlightFilters(max_stops=0).accepts(self.flight))
+        self.assertFalse(FlightFilters(airlines=['LATAM']).accepts(self.flight))
+        self.assertFalse(FlightFilters(max_duration=120).accepts(self.flight))
+        self.assertFalse(FlightFilters(max_miles=29999).accepts(self.flight))
+
+    def test_departure_window(self):
+        """
+        Test departure windows, including ones wrapping around midnight.
+        """
+        self.assertTrue(FlightFilters(departure_from=time(8, 30)).accepts(self.flight))
+        self.assertFalse(FlightFilters(departure_from=time(9), departure_to=time(18)).accepts(self.flight))
+        self.assertTrue(FlightFilters(departure_from=time(22), departure_to=time(9)).accepts(self.flight))
+        self.assertFalse(FlightFilters(departure_from=time(22), departure_to=time(6)).accepts(self.flight))
+        self.assertFalse(FlightFilters(departure_to=time(9)).departure_allowed(None))
+
+    def test_fare_types_need_raw_data(self):
+        self.assertTrue(FlightFilters(max_stops=0).applies_to_parsed)
+        self.assertFalse(FlightFilters(fare_types=['SMILES_CLUB']).applies_to_parsed)
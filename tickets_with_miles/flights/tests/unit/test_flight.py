@@ -0,0 +1,66 @@
+import pickle
+import sys
+from django.test import SimpleTestCase
+from flights.flight import Flight, to_dict
+from flights.result_store import SearchResultStore
+
+
+class FlightTest(SimpleTestCase):
+    def setUp(self):
+        self.data = {
+            'airline': 'GOL',
+            'miles_cost': 55200,
+            'duration_hours': 1,
+            'duration_minutes': 15,
+            'departure_time': '2025-03-10T10:20:00',
+            'departure_airport': 'CNF',
+            'number_of_stops': 0,
+            'arrival_time': '2025-03-10T11:35:00',
+            'arrival_airport': 'GRU',
+            'smiles_url': 'https://www.smiles.com.br/mfe/emissao-passagem/?originAirport=CNF',
+            'fetched_at': 1741600000,
+        }
+
+    def test_dict_round_trip(self):
+        """
+        Test that converting to and from the dict format is lossless.
+        """
+        flight = Flight.from_dict({**self.data, 'unknown': 1})
+
+        self.assertEqual(flight.to_dict(), self.data)
+        self.assertEqual(Flight.from_dict(flight.to_dict()), flight)
+        self.assertEqual(to_dict(flight), self.data)
+        self.assertIs(to_dict(self.data), self.data)
+
+    def test_item_access_matches_dict_format(self):
+        """
+        Test that code written for flight dicts keeps working.
+        """
+        flight = Flight.from_dict(self.data)
+
+        self.assertEqual(flight['miles_cost'], 55200)
+        self.assertEqual(flight.get('airline'), 'GOL')
+        self.assertEqual(flight.get('unknown', 'default'), 'default')
+        with self.assertRaises(KeyError):
+            flight['unknown']
+
+    def test_compact_storage(self):
+        """
+        Test that flights have no instance dict and share their repeated strings.
+        """
+        first = Flight.from_dict(self.data)
+        second = Flight.from_dict({**self.data, 'airline': ''.join(['G', 'OL'])})
+
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertLess(sys.getsizeof(first), sys.getsizeof(self.data))
+        self.assertIs(first.airline, second.airline)
+
+    def test_pickle_and_result_store_round_trip(self):
+        """
+        Test that flights survive pickling and the result store unchanged.
+        """
+        flight = Flight.from_dict(self.data)
+
+        self.assertEqual(pickle.loads(pickle.dumps(flight)), flight)
+        data = SearchResultStore.serialize({}, [flight, flight])
+        self.assertEqual(SearchResultStore.deserialize(data)['flights'], [self.data, self.data])
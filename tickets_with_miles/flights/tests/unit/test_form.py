@@ -1,7 +1,15 @@
+from asgiref.sync import async_to_sync
 from django.test.testcases import TestCase
+from flights.airport_index import AirportIndex, AirportInfo
 from flights.forms import FlightSearchForm
+from flights.models import Airport
 from unittest.mock import patch
-from datetime import date
+from datetime import date, timedelta
+
+
+def make_airport_index(*iata_codes):
+    return AirportIndex(AirportInfo(code, code, '', 'BR', 'Brazil') for code in iata_codes)
+
 
 class FlightSearchFormTest(TestCase):
     @classmethod
@@ -13,13 +21,13 @@ class FlightSearchFormTest(TestCase):
             'flexibility' : 0
         }
 
-    @patch('flights.models.Airport.objects.filter')
-    def test_valid_form(self, mock_filter):
+    @patch('flights.forms.get_airport_index')
+    def test_valid_form(self, mock_get_airport_index):
         """
         Test all valid inputs in the FlightSearchForm with mocked airports.
         """
-        # Mocking the filter method to simulate that both airports exist in the database
-        mock_filter.return_value.exists.return_value = True
+        # Mocking the airport index to simulate that both airports exist
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
         
         flight_search_form = FlightSearchForm(data=self.form_data)
 
@@ -28,13 +36,13 @@ class FlightSearchFormTest(TestCase):
         self.assertEqual(flight_search_form.clean_destination(), 'GRU')
         self.assertEqual(flight_search_form.clean_date(), date(2025, 10, 1))
 
-    @patch('flights.models.Airport.objects.filter')
-    def test_invalid_airport_form(self, mock_filter):
+    @patch('flights.forms.get_airport_index')
+    def test_invalid_airport_form(self, mock_get_airport_index):
         """
         Test an invalid airport input in the FlightSearchForm with mocked airports.
         """
-        # Mocking filter to simulate the absence of some airports
-        mock_filter.return_value.exists.return_value = False
+        # Mocking the airport index to simulate the absence of some airports
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
         
         self.form_data['origin'] = 'ABC'
         flight_search_form = FlightSearchForm(data=self.form_data)
@@ -44,13 +52,13 @@ class FlightSearchFormTest(TestCase):
         flight_search_form = FlightSearchForm(data=self.form_data)
         self.assertFalse(flight_search_form.is_valid())        
 
-    @patch('flights.models.Airport.objects.filter')
-    def test_invalid_date_form(self, mock_filter):
+    @patch('flights.forms.get_airport_index')
+    def test_invalid_date_form(self, mock_get_airport_index):
         """
         Test an invalid date input in the FlightSearchForm with mocked airports.
         """
-        # Mocking the filter to return airports as existing
-        mock_filter.return_value.exists.return_value = True
+        # Mocking the airport index to return airports as existing
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
         
         # Test with a date in the past
         self.form_data['date'] = '01/10/2023'
@@ -66,3 +74,117 @@ class FlightSearchFormTest(TestCase):
         self.form_data['date'] = '01/10/2025'
         flight_search_form = FlightSearchForm(data=self.form_data)
         self.assertTrue(flight_search_form.is_valid())
+
+    def test_validation_uses_the_airport_index_without_queries(self):
+        """
+        Test that once the airport index is loaded, validation runs no database query
+        and picks up airports saved afterwards.
+        """
+        self.form_data['date'] = (date.today() + timedelta(days=30)).strftime('%d/%m/%Y')
+        Airport.objects.create(name='Confins', iata_code='CNF', state_code='MG', country_code='BR', country_name='Brazil')
+        self.assertFalse(async_to_sync(FlightSearchForm(data=self.form_data).ais_valid)())
+
+        Airport.objects.create(name='Guarulhos', iata_code='GRU', state_code='SP', country_code='BR', country_name='Brazil')
+        self.assertTrue(async_to_sync(FlightSearchForm(data=self.form_data).ais_valid)())
+
+        with self.assertNumQueries(0):
+            self.assertTrue(FlightSearchForm(data=self.form_data).is_valid())
+
+    @patch('flights.forms.get_airport_index')
+    def test_multiple_airports_and_metro_codes(self, mock_get_airport_index):
+        """
+        Test that origin and destination accept several codes and metro area codes,
+        up to MAX_ROUTES combinations.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'LIS', 'OPO')
+        self.form_data['date'] = (date.today() + timedelta(days=30)).strftime('%d/%m/%Y')
+
+        flight_search_form = FlightSearchForm(data={**self.form_data, 'origin': 'sao, cnf', 'destination': 'LIS,OPO'})
+        self.assertTrue(flight_search_form.is_valid())
+        self.assertEqual(flight_search_form.cleaned_data['origin'], 'SAO,CNF')
+        self.assertEqual(flight_search_form.cleaned_data['destination'], 'LIS,OPO')
+
+        flight_search_form = FlightSearchForm(data={**self.form_data, 'origin': 'CNF, XXX', 'destination': 'LIS'})
+        self.assertFalse(flight_search_form.is_valid())
+        self.assertIn('origin', flight_search_form.errors)
+
+        flight_search_form = FlightSearchForm(data={**self.form_data, 'origin': 'SAO, LON', 'destination': 'LIS, OPO'})
+        self.assertFalse(flight_search_form.is_valid())
+        self.assertIn('no máximo 9 combinações', flight_search_form.errors['__all__'][0])
+
+    @patch('flights.forms.get_airport_index')
+    def test_round_trip_stay_range(self, mock_get_airport_index):
+        """
+        Test that round trips get a default stay range and reject an inverted one.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
+        self.form_data['date'] = (date.today() + timedelta(days=30)).strftime('%d/%m/%Y')
+
+        flight_search_form = FlightSearchForm(data=self.form_data)
+        self.assertTrue(flight_search_form.is_valid())
+        self.assertIsNone(flight_search_form.get_stay_range())
+
+        flight_search_form = FlightSearchForm(data={**self.form_data, 'round_trip': 'on'})
+        self.assertTrue(flight_search_form.is_valid())
+        self.assertEqual(flight_search_form.get_stay_range(), (1, 7))
+
+        flight_search_form = FlightSearchForm(data={**self.form_data, 'round_trip': 'on', 'min_stay': 10})
+        self.assertTrue(flight_search_form.is_valid())
+        self.assertEqual(flight_search_form.get_stay_range(), (10, 10))
+
+        flight_search_form = FlightSearchForm(data={**self.form_data, 'round_trip': 'on', 'min_stay': 5, 'max_stay': 3})
+        self.assertFalse(flight_search_form.is_valid())
+        self.assertIn(FlightSearchForm.ERROR_MESSAGES['stay_range'], flight_search_form.errors['__all__'])
+
+    @patch('flights.forms.get_airport_index')
+    def test_total_searches_are_limited(self, mock_get_airport_index):
+        """
+        Test that the route-days of both legs of a round trip count towards MAX_SEARCHES.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'LIS', 'OPO')
+        self.form_data['date'] = (date.today() + timedelta(days=30)).strftime('%d/%m/%Y')
+        wide_search = {**self.form_data, 'origin': 'SAO, CNF', 'destination': 'LIS, OPO', 'flexibility': 30}
+
+        # 8 routes of 30 days each
+        self.assertTrue(FlightSearchForm(data=wide_search).is_valid())
+
+        # 8 routes of 30 outbound and 36 inbound days each
+        flight_search_form = FlightSearchForm(data={**wide_search, 'round_trip': 'on'})
+        self.assertFalse(flight_search_form.is_valid())
+        self.assertIn(FlightSearchForm.ERROR_MESSAGES['too_many_searches'], flight_search_form.errors['__all__'])
+
+        # 8 routes of 3 outbound and 9 inbound days each
+        self.assertTrue(FlightSearchForm(data={**wide_search, 'flexibility': 3, 'round_trip': 'on'}).is_valid())
+
+    @patch('flights.forms.get_airport_index')
+    def test_filters(self, mock_get_airport_index):
+        """
+        Test that the optional filter fields build FlightFilters and serializable data.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
+        self.form_data['date'] = (date.today() + timedelta(days=30)).strftime('%d/%m/%Y')
+
+        flight_search_form = FlightSearchForm(data=self.form_data)
+        self.assertTrue(flight_search_form.is_valid())
+        self.assertIsNone(flight_search_form.get_filters())
+        self.assertEqual(flight_search_form.get_filter_data(), {})
+
+        flight_search_form = FlightSearchForm(data={
+            **self.form_data,
+            'max_stops': '0',
+            'airlines': 'GOL, latam,',
+            'departure_from': '06:00',
+            'max_duration': '3',
+            'fare_type': 'SMILES_CLUB',
+        })
+        self.assertTrue(flight_search_form.is_valid())
+        filters = flight_search_form.get_filters()
+
+        self.assertEqual(filters.max_stops, 0)
+        self.assertEqual(filters.airlines, {'GOL', 'LATAM'})
+        self.assertEqual(filters.departure_from, '06:00:00')
+        self.assertEqual(filters.max_duration, 180)
+        self.assertEqual(filters.fare_types, {'SMILES_CLUB'})
+        self.assertEqual(flight_search_form.get_filter_data(), {
+            'max_stops': 0, 'airlines': 'GOL, latam', 'departure_from': '06:00', 'max_duration': 3, 'fare_type': 'SMILES_CLUB',
+        })
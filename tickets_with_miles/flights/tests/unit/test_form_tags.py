@@ -0,0 +1,30 @@
+from datetime import datetime
+from django.test import TestCase
+from unittest.mock import patch
+from flights.fare_cache import MemoryFareCache
+from flights.templatetags.form_tags import freshness, is_stale
+
+
+class FreshnessFiltersTest(TestCase):
+    def test_freshness(self):
+        """
+        Test the description of how long ago a result was fetched.
+        """
+        now = datetime.now().timestamp()
+
+        self.assertEqual(freshness(now), 'agora')
+        self.assertEqual(freshness(now - 5 * 60), 'há 5 min')
+        self.assertEqual(freshness(now - 2 * 60 * 60), 'há 2 h')
+        self.assertEqual(freshness(None), '')
+
+    def test_is_stale(self):
+        """
+        Test that results older than the TTL of the fare cache in use are flagged as stale.
+        """
+        now = datetime.now().timestamp()
+
+        with patch('flights.templatetags.form_tags.get_fare_cache', return_value=MemoryFareCache(ttl=120)):
+            self.assertFalse(is_stale(now - 60))
+            self.assertTrue(is_stale(now - 121))
+        with patch('flights.templatetags.form_tags.get_fare_cache', return_value=None):
+            self.assertFalse(is_stale(now - 3600))
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from flights.airport_index import get_airport_index, invalidate_airport_index
+from flights.models import Airport
+
+
+class LoadAirportsCommandTest(TestCase):
+    HEADER = 'name,iata_code,state_code,country_code,country_name\n'
+
+    def setUp(self):
+        invalidate_airport_index()
+
+    def write_csv(self, content):
+        file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+        file.write(content)
+        file.close()
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def load(self, *args):
+        output = StringIO()
+        call_command('load_airports', *args, stdout=output)
+        return output.getvalue()
+
+    def test_loads_bundled_file(self):
+        """
+        Test that the bundled CSV is loaded and that loading it again changes nothing.
+        """
+        self.load()
+        total = Airport.objects.count()
+        self.assertGreater(total, 3000)
+
+        with self.assertNumQueries(3):
+            output = self.load()
+
+        self.assertIn(f'0 inserted, 0 updated, {total} unchanged.', output)
+        self.assertEqual(Airport.objects.count(), total)
+
+    def test_upserts_alternate_file(self):
+        """
+        Test that an alternate file inserts new airports and updates changed ones in place.
+        """
+        Airport.objects.create(name='Lisbon', iata_code='LIS', state_code='', country_code='PT', country_name='Portugal')
+        Airport.objects.create(name='Porto', iata_code='OPO', state_code='', country_code='PT', country_name='Portugal')
+        get_airport_index()
+
+        csv_path = self.write_csv(self.HEADER + (
+            'Lisbon Humberto Delgado,LIS,,PT,Portugal\n'
+            'Porto,OPO,,PT,Portugal\n'
+            'Faro,fao,,PT,Portugal\n'
+        ))
+        output = self.load(csv_path, '--batch-size', '1')
+
+        self.assertIn('1 inserted, 1 updated, 1 unchanged.', output)
+        self.assertEqual(Airport.objects.get(iata_code='LIS').name, 'Lisbon Humberto Delgado')
+        self.assertTrue(Airport.objects.filter(iata_code='FAO').exists())
+        self.assertIn('FAO', get_airport_index())
+
+    def test_rejects_missing_file_and_columns(self):
+        """
+        Test that unreadable sources fail without touching the table.
+        """
+        with self.assertRaises(CommandError):
+            self.load('/nonexistent/airports.csv')
+        with self.assertRaises(CommandError):
+            self.load(self.write_csv('iata_code,name\nLIS,Lisbon\n'))
+        self.assertEqual(Airport.objects.count(), 0)
@@ -0,0 +1,63 @@
+from django.test import TestCase
+from flights.loop_bridge import EventLoopBridge
+import asyncio
+import concurrent.futures
+
+
+class EventLoopBridgeTestCase(TestCase):
+    def setUp(self):
+        self.bridge = EventLoopBridge(name='test-event-loop')
+
+    def tearDown(self):
+        self.bridge.stop()
+
+    async def current_loop(self):
+        return asyncio.get_running_loop()
+
+    def test_run_reuses_the_same_loop(self):
+        """
+        Test that sync callers share one long-lived loop across calls.
+        """
+        first_loop = self.bridge.run(self.current_loop())
+        second_loop = self.bridge.run(self.current_loop())
+
+        self.assertIs(first_loop, second_loop)
+        self.assertIs(first_loop, self.bridge.loop)
+        self.assertTrue(first_loop.is_running())
+
+    def test_run_timeout_cancels_the_coroutine(self):
+        """
+        Test that a timed out call raises and cancels the coroutine on the loop.
+        """
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.bridge.run(slow(), timeout=0.05)
+        self.bridge.run(asyncio.sleep(0.01))
+
+        self.assertEqual(cancelled, [True])
+
+    def test_arun_from_another_loop(self):
+        """
+        Test that a coroutine awaited from another loop runs on the bridge loop.
+        """
+        bridge_loop = asyncio.run(self.bridge.arun(self.current_loop()))
+
+        self.assertIs(bridge_loop, self.bridge.loop)
+
+    def test_fork_starts_a_new_loop(self):
+        """
+        Test that the state inherited through a fork is dropped and a new loop is started.
+        """
+        parent_loop = self.bridge.loop
+        self.bridge._after_fork_in_child()
+
+        self.assertIsNot(self.bridge.loop, parent_loop)
+        parent_loop.call_soon_threadsafe(parent_loop.stop)
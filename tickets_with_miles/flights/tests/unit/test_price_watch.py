@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+from flights.api_client import FlightAPIClient
+from flights.fare_cache import MemoryFareCache
+from flights.models import PriceAlert, PriceWatch
+from flights.price_watch import CheapestFareIndex, PriceWatchEvaluator
+from flights.search_window import MAX_DAYS_AHEAD, last_search_date
+from flights.services import FlightService
+from flights.snapshots import FareSnapshotWriter
+import random
+
+
+def raw_data(miles):
+    return {'requestedFlightSegmentList': [{'flightList': [
+        {'fareList': [{'type': 'SMILES', 'miles': miles}], 'airline': {'name': 'LATAM'}}
+    ]}]}
+
+
+class CheapestFareIndexTest(TestCase):
+    def test_matches_brute_force(self):
+        """
+        Test that every window returns the same cheapest day as a linear scan.
+        """
+        rng = random.Random(7)
+        start = date(2025, 1, 1)
+        cheapest = {
+            start + timedelta(days=offset): {'miles_cost': rng.randint(10, 99) * 1000} if rng.random() > 0.2 else None
+            for offset in range(40)
+        }
+        index = CheapestFareIndex(cheapest)
+
+        for first in range(-2, 42):
+            for last in range(first, 42):
+                start_date, end_date = start + timedelta(days=first), start + timedelta(days=last)
+                priced = [
+                    (flight['miles_cost'], day) for day, flight in cheapest.items()
+                    if flight is not None and start_date <= day <= end_date
+                ]
+                found = index.cheapest(start_date, end_date)
+                if not priced:
+                    self.assertIsNone(found)
+                else:
+                    self.assertEqual(found[1]['miles_cost'], min(priced)[0])
+
+
+class PriceWatchEvaluatorTest(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.mock_client = MagicMock(spec=FlightAPIClient)
+        self.miles_by_day = {self.today + timedelta(days=offset): 40000 - offset * 1000 for offset in range(10)}
+
+        async def search_flights_bulk(searches, priority=0):
+            return [raw_data(self.miles_by_day[search['departure_date']]) for search in searches]
+
+        self.mock_client.search_flights_bulk = AsyncMock(side_effect=search_flights_bulk)
+        service = FlightService(
+            client=self.mock_client,
+            cache=MemoryFareCache(ttl=60),
+            snapshots=FareSnapshotWriter(background=False),
+        )
+        self.evaluator = PriceWatchEvaluator(service=service, batch_size=4)
+
+    def watch(self, start, end, max_miles, origin='GRU', destination='LIS'):
+        return PriceWatch.objects.create(
+            email='user@example.com', origin=origin, destination=destination,
+            start_date=self.today + timedelta(days=start), end_date=self.today + timedelta(days=end),
+            max_miles=max_miles,
+        )
+
+    def test_each_route_and_day_is_searched_once(self):
+        """
+        Test that overlapping watches share their searches and only the ones whose
+        threshold is met trigger, on the cheapest day of their own window.
+        """
+        met = self.watch(0, 4, 36000)
+        missed = self.watch(0, 2, 30000)
+        wider = self.watch(3, 7, 35000)
+        self.watch(-5, -1, 99000, destination='OPO')
+        PriceWatch.objects.create(
+            email='user@example.com', origin='GRU', destination='LIS', start_date=self.today,
+            end_date=self.today + timedelta(days=9), max_miles=99000, active=False,
+        )
+
+        stats = self.evaluator.run()
+
+        searched = [
+            search['departure_date']
+            for call in self.mock_client.search_flights_bulk.await_args_list for search in call.args[0]
+        ]
+        self.assertEqual(sorted(searched), [self.today + timedelta(days=offset) for offset in range(8)])
+        self.assertEqual(self.mock_client.search_flights_bulk.await_args.kwargs['priority'], PriceWatchEvaluator.WATCH_PRIORITY)
+        self.assertEqual((stats.watches, stats.routes, stats.days, stats.alerts), (3, 1, 8, 2))
+
+        alerts = {alert.watch_id: (alert.flight_date, alert.miles) for alert in PriceAlert.objects.all()}
+        self.assertEqual(alerts, {
+            met.id: (self.today + timedelta(days=4), 36000),
+            wider.id: (self.today + timedelta(days=7), 33000),
+        })
+        self.assertNotIn(missed.id, alerts)
+
+    def test_alerts_are_recorded_once(self):
+        """
+        Test that evaluating again records no new alert until the fare changes.
+        """
+        self.watch(0, 2, 40000)
+
+        self.assertEqual(self.evaluator.run().alerts, 1)
+        self.assertEqual(self.evaluator.run().alerts, 0)
+        # The second run was served from the fare cache
+        self.assertEqual(self.mock_client.search_flights_bulk.await_count, 1)
+
+        self.evaluator.service.cache.clear()
+        self.miles_by_day[self.today + timedelta(days=2)] = 20000
+        self.assertEqual(self.evaluator.run().alerts, 1)
+        self.assertEqual(PriceAlert.objects.count(), 2)
+
+    def test_failed_batches_trigger_nothing(self):
+        """
+        Test that days of a failed batch are counted and no watch triggers on them.
+        """
+        self.watch(0, 2, 99000)
+        self.mock_client.search_flights_bulk.side_effect = RuntimeError('upstream down')
+
+        stats = self.evaluator.run()
+
+        self.assertEqual((stats.failed, stats.alerts), (3, 0))
+        self.assertFalse(PriceAlert.objects.exists())
+
+    def test_days_past_the_searchable_window_are_not_searched(self):
+        """
+        Test that a watch reaching past the searchable window is only searched up to its last day.
+        """
+        watch = self.watch(MAX_DAYS_AHEAD - 1, MAX_DAYS_AHEAD + 30, 40000)
+
+        self.assertEqual(self.evaluator.plan([watch], self.today), {
+            ('GRU', 'LIS'): [self.today + timedelta(days=MAX_DAYS_AHEAD - 1), last_search_date(self.today)],
+        })
+
+    def test_command(self):
+        """
+        Test that the check_price_watches command reports the evaluation.
+        """
+        self.watch(0, 1, 50000)
+        out = StringIO()
+        with patch('flights.price_watch.FlightService', return_value=self.evaluator.service):
+            call_command('check_price_watches', stdout=out)
+
+        self.assertIn('1 watches, 1 routes, 2 days searched, 0 failed, 1 new alerts', out.getvalue())
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from django.test import SimpleTestCase
+from flights.resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+import random
+
+
+class ParseRetryAfterTestCase(SimpleTestCase):
+    def test_seconds_and_http_dates(self):
+        """
+        Test that Retry-After is read as seconds or as an HTTP date.
+        """
+        now = datetime(2025, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after('Wed, 15 Jan 2025 12:00:30 GMT', now=now), 30.0)
+        self.assertEqual(parse_retry_after('Wed, 15 Jan 2025 11:00:00 GMT', now=now), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+class RetryPolicyTestCase(SimpleTestCase):
+    def test_backoff_grows_with_jitter_up_to_max_delay(self):
+        """
+        Test that each wait is random, bounded by the exponential backoff and max_delay.
+        """
+        policy = RetryPolicy(attempts=10, base_delay=1, max_delay=5, rng=random.Random(3))
+        for retry, bound in enumerate([1, 2, 4, 5, 5]):
+            delays = [policy.delay(retry) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= bound for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    def test_retry_after_is_honored(self):
+        """
+        Test that Retry-After is the least wait, and one above max_delay gives up.
+        """
+        policy = RetryPolicy(base_delay=0.1, max_delay=5)
+        self.assertEqual(policy.delay(0, retry_after=3), 3)
+        self.assertIsNone(policy.delay(0, retry_after=60))
+
+    def test_retryable_errors(self):
+        """
+        Test that connection errors, 429 and 5xx are retried, other statuses are not.
+        """
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable({'error': 'Connection reset'}))
+        self.assertTrue(policy.is_retryable({'error': 'Too Many Requests', 'status': 429}))
+        self.assertTrue(policy.is_retryable({'error': 'Bad Gateway', 'status': 502}))
+        self.assertFalse(policy.is_retryable({'error': 'Forbidden', 'status': 403}))
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: self.now)
+
+    def open_circuit(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        """
+        Test that only failures in a row open the circuit, which then refuses calls.
+        """
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self.breaker.record_success()
+        self.open_circuit()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """
+        Test that after reset_timeout a single probe goes through, closing the circuit
+        when it succeeds and reopening it when it fails.
+        """
+        self.open_circuit()
+        self.now = 10
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+        self.now = 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_released_probe_frees_its_slot(self):
+        """
+        Test that a cancelled probe lets another one through.
+        """
+        self.open_circuit()
+        self.now = 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertTrue(self.breaker.allow())
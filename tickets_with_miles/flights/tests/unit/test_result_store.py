@@ -0,0 +1,58 @@
+from django.test import TestCase
+from flights.flight import Flight
+from flights.result_store import SearchResultStore
+from flights.round_trip import RoundTrip
+import json
+
+
+class SearchResultStoreTest(TestCase):
+    def setUp(self):
+        self.store = SearchResultStore(timeout=60)
+        self.search = {'origin': 'GRU', 'destination': 'LIS', 'date': '2025-04-10', 'flexibility': 7}
+        smiles_url = 'https://www.smiles.com.br/mfe/emissao-passagem/?originAirport=GRU&destinationAirport=LIS'
+        self.flights = [
+            {'airline': 'TAP', 'miles_cost': 90000 + i, 'departure_airport': 'GRU', 'smiles_url': smiles_url}
+            for i in range(50)
+        ]
+
+    def test_save_and_load(self):
+        """
+        Test that a stored result is loaded back unchanged by its ID.
+        """
+        search_id = self.store.save(self.search, self.flights)
+        result = self.store.load(search_id)
+
+        self.assertEqual(result['search'], self.search)
+        self.assertEqual(result['flights'], self.flights)
+        self.assertIsNone(self.store.load('unknown-id'))
+
+    def test_remaining_lifetime(self):
+        """
+        Test that a loaded result tells how long it has left before it expires.
+        """
+        result = self.store.load(self.store.save(self.search, self.flights))
+
+        self.assertEqual(self.store.remaining_lifetime(result, now=result['stored_at'] + 45), 15)
+        self.assertEqual(self.store.remaining_lifetime(result, now=result['stored_at'] + 90), 0)
+        self.assertEqual(self.store.remaining_lifetime({'search': self.search, 'flights': []}), 0)
+
+    def test_save_and_load_round_trips(self):
+        """
+        Test that round trips are stored as flight rows and loaded back as pairs.
+        """
+        outbound = Flight(airline='TAP', miles_cost=40000, departure_airport='GRU', arrival_airport='LIS')
+        inbound = Flight(airline='TAP', miles_cost=45000, departure_airport='LIS', arrival_airport='GRU')
+
+        search_id = self.store.save({**self.search, 'round_trip': True}, [RoundTrip(outbound, inbound)])
+        result = self.store.load(search_id)
+
+        self.assertEqual(result['flights'], [RoundTrip(outbound, inbound).to_dict()])
+
+    def test_serialization_is_compact(self):
+        """
+        Test that the stored payload is much smaller than the plain JSON of the flights.
+        """
+        data = SearchResultStore.serialize(self.search, self.flights)
+
+        self.assertLess(len(data) * 5, len(json.dumps(self.flights)))
+        self.assertEqual(SearchResultStore.deserialize(data)['flights'], self.flights)
@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+from django.test import SimpleTestCase
+from flights.flight import Flight
+from flights.round_trip import RoundTrip, pair_round_trips
+import random
+
+
+def make_day(day, miles_list, origin='GRU', destination='LIS'):
+    return sorted(
+        (
+            Flight(
+                airline='TAP', miles_cost=miles, departure_airport=origin, arrival_airport=destination,
+                departure_time=f'{day.isoformat()}T10:00:00', arrival_time=f'{day.isoformat()}T20:00:00',
+            )
+            for miles in miles_list
+        ),
+        key=lambda flight: flight.miles_cost,
+    )
+
+
+class RoundTripPairingTest(SimpleTestCase):
+    def setUp(self):
+        random.seed(7)
+        self.start = date(2025, 4, 1)
+        self.outbound_days = {
+            self.start + timedelta(days=i): make_day(self.start + timedelta(days=i), random.sample(range(20000, 90000), 20))
+            for i in range(30)
+        }
+        self.inbound_days = {
+            self.start + timedelta(days=i): make_day(self.start + timedelta(days=i), random.sample(range(20000, 90000), 20), 'LIS', 'GRU')
+            for i in range(3, 45)
+        }
+
+    def brute_force(self, min_stay, max_stay):
+        return sorted(
+            outbound.miles_cost + inbound.miles_cost
+            for outbound_date, outbound_flights in self.outbound_days.items()
+            for inbound_date, inbound_flights in self.inbound_days.items()
+            if min_stay <= (inbound_date - outbound_date).days <= max_stay
+            for outbound in outbound_flights
+            for inbound in inbound_flights
+        )
+
+    def test_cheapest_pairs_match_every_combination(self):
+        """
+        Test that the heap pairing returns the same cheapest totals as checking every pair.
+        """
+        round_trips = pair_round_trips(self.outbound_days, self.inbound_days, 3, 10, top_n=200)
+
+        self.assertEqual([round_trip.miles_cost for round_trip in round_trips], self.brute_force(3, 10)[:200])
+        for round_trip in round_trips:
+            stay = date.fromisoformat(round_trip.inbound.departure_time[:10]) - date.fromisoformat(round_trip.outbound.departure_time[:10])
+            self.assertTrue(3 <= stay.days <= 10)
+            self.assertEqual(round_trip.outbound.departure_airport, 'GRU')
+            self.assertEqual(round_trip.inbound.departure_airport, 'LIS')
+
+    def test_every_pair_is_returned_once(self):
+        round_trips = pair_round_trips(self.outbound_days, self.inbound_days, 14, 14)
+
+        self.assertEqual([round_trip.miles_cost for round_trip in round_trips], self.brute_force(14, 14))
+        self.assertEqual(len({(id(rt.outbound), id(rt.inbound)) for rt in round_trips}), len(round_trips))
+
+    def test_inbound_must_leave_after_outbound_arrives(self):
+        """
+        Test that same-day returns only pair with flights leaving after the outbound arrival.
+        """
+        day = self.start
+        outbound_days = {day: [Flight(miles_cost=100, departure_time='2025-04-01T08:00:00', arrival_time='2025-04-01T12:00:00')]}
+        inbound_days = {day: [
+            Flight(miles_cost=50, departure_time='2025-04-01T09:00:00'),
+            Flight(miles_cost=70, departure_time='2025-04-01T18:00:00'),
+        ]}
+
+        round_trips = pair_round_trips(outbound_days, inbound_days, 0, 0)
+
+        self.assertEqual(round_trips, [RoundTrip(outbound_days[day][0], inbound_days[day][1])])
+        self.assertEqual(round_trips[0].miles_cost, 170)
+
+    def test_no_pairs_outside_the_stay_range(self):
+        self.assertEqual(pair_round_trips(self.outbound_days, self.inbound_days, 60, 90), [])
+        self.assertEqual(pair_round_trips({}, self.inbound_days, 1, 7), [])
+
+    def test_to_dict(self):
+        round_trip = pair_round_trips(self.outbound_days, self.inbound_days, 3, 10, top_n=1)[0]
+
+        data = round_trip.to_dict()
+        self.assertEqual(data['miles_cost'], round_trip.miles_cost)
+        self.assertEqual(data['outbound'], round_trip.outbound.to_dict())
+        self.assertEqual(data['inbound']['departure_airport'], 'LIS')
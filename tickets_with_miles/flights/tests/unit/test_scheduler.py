@@ -0,0 +1,116 @@
+from django.test import TestCase
+from flights.scheduler import FetchScheduler, FetchTicket
+import asyncio
+
+
+class FetchSchedulerTestCase(TestCase):
+    def test_in_flight_cap_is_respected(self):
+        """
+        Test that no more than max_in_flight calls run at the same time.
+        """
+        scheduler = FetchScheduler(max_in_flight=2)
+        running = []
+        peak = []
+
+        async def job():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        async def run():
+            await asyncio.gather(*(scheduler.run(job) for _ in range(6)))
+
+        asyncio.run(run())
+
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def test_priority_then_fifo_order(self):
+        """
+        Test that queued calls run by priority and then in arrival order.
+        """
+        scheduler = FetchScheduler(max_in_flight=1)
+        order = []
+
+        async def job(name):
+            order.append(name)
+            await asyncio.sleep(0)
+
+        async def run():
+            release = asyncio.Event()
+            blocker = asyncio.create_task(scheduler.run(release.wait))
+            await asyncio.sleep(0)
+            tasks = [
+                asyncio.create_task(scheduler.run(job, 'low-1', priority=5)),
+                asyncio.create_task(scheduler.run(job, 'high-1', priority=0)),
+                asyncio.create_task(scheduler.run(job, 'low-2', priority=5)),
+                asyncio.create_task(scheduler.run(job, 'high-2', priority=0)),
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(blocker, *tasks)
+
+        asyncio.run(run())
+
+        self.assertEqual(order, ['high-1', 'high-2', 'low-1', 'low-2'])
+
+    def test_cancelled_waiters_release_their_place(self):
+        """
+        Test that cancelling queued and running calls frees the scheduler.
+        """
+        scheduler = FetchScheduler(max_in_flight=1)
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        async def fast():
+            return 'done'
+
+        async def run():
+            running = asyncio.create_task(scheduler.run(slow))
+            await asyncio.sleep(0)
+            queued = asyncio.create_task(scheduler.run(slow))
+            await asyncio.sleep(0)
+            queued.cancel()
+            running.cancel()
+            await asyncio.gather(running, queued, return_exceptions=True)
+            return await asyncio.wait_for(scheduler.run(fast), timeout=1)
+
+        self.assertEqual(asyncio.run(run()), 'done')
+        self.assertEqual(scheduler.in_flight, 0)
+        self.assertEqual(scheduler.waiting, 0)
+
+    def test_raised_priority_moves_a_waiting_call_ahead(self):
+        """
+        Test that raising a queued ticket's priority runs it before the calls it
+        was behind, once only.
+        """
+        scheduler = FetchScheduler(max_in_flight=1)
+        order = []
+
+        async def job(name):
+            order.append(name)
+            await asyncio.sleep(0)
+
+        async def run():
+            release = asyncio.Event()
+            blocker = asyncio.create_task(scheduler.run(release.wait))
+            await asyncio.sleep(0)
+            ticket = FetchTicket(5)
+            tasks = [
+                asyncio.create_task(scheduler.run(job, 'refresh-1', priority=5)),
+                asyncio.create_task(scheduler.run(job, 'shared', ticket=ticket)),
+                asyncio.create_task(scheduler.run(job, 'refresh-2', priority=5)),
+            ]
+            await asyncio.sleep(0)
+            scheduler.reprioritise(ticket, 0)
+            scheduler.reprioritise(ticket, 3)
+            self.assertEqual((ticket.priority, scheduler.waiting), (0, 3))
+            release.set()
+            await asyncio.gather(blocker, *tasks)
+
+        asyncio.run(run())
+
+        self.assertEqual(order, ['shared', 'refresh-1', 'refresh-2'])
+        self.assertEqual(scheduler.waiting, 0)
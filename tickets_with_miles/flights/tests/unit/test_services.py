@@ -1,9 +1,19 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from django.test import override_settings
 from django.test.testcases import TestCase
 from flights.services import FlightService
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from flights.api_client import FlightAPIClient
+from flights.fare_cache import FareCache, MemoryFareCache
+from flights.filters import FlightFilters
+from flights.flight import Flight
+from flights.loop_bridge import loop_bridge
+from flights.search_window import last_search_date
+import asyncio
+import concurrent.futures
+import threading
 
+@override_settings(FARE_SNAPSHOTS={'ENABLED': False})
 class FlightServiceTest(TestCase):
     @classmethod
     def setUp(cls):
@@ -86,4 +96,487 @@ class FlightServiceTest(TestCase):
         self.assertEqual(flights[0]['number_of_stops'], number_stops)
         self.assertEqual(flights[0]['arrival_time'], arrival_time)
         self.assertEqual(flights[0]['arrival_airport'], arrival_airport)
-        self.assertEqual(flights[0]['smiles_url'], smiles_url)
\ No newline at end of file
+        self.assertEqual(flights[0]['smiles_url'], smiles_url)
+
+    def test_get_flights_internal_reuses_cached_days(self):
+        """
+        Test that a flexible search only fetches the days missing from the cache.
+        """
+        cache = MemoryFareCache(ttl=60)
+        cached_flight = {'airline': 'TAP', 'miles_cost': 80000}
+        cache.set(FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0), [cached_flight])
+
+        raw_data = {'requestedFlightSegmentList': [{'flightList': [{
+            'airline': {'name': 'LATAM'},
+            'fareList': [{'type': 'SMILES', 'miles': 70000}],
+            'departure': {'airport': {'code': 'GRU'}, 'date': '2025-04-11T22:00:00'},
+            'arrival': {'airport': {'code': 'LIS'}, 'date': '2025-04-12T11:00:00'},
+        }]}]}
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [raw_data] * len(searches)
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+
+        flights = asyncio.run(flight_service.get_flights_internal('GRU', 'LIS', date(2025, 4, 10), 2))
+
+        searches = self.mock_client.search_flights_bulk.call_args.args[0]
+        self.assertEqual([search['departure_date'] for search in searches], [date(2025, 4, 11)])
+        self.assertEqual([flight['miles_cost'] for flight in flights], [70000, 80000])
+        self.assertIsNotNone(cache.get(FareCache.make_key('GRU', 'LIS', date(2025, 4, 11), 1, 0, 0)))
+
+    def test_get_flights_internal_merges_sorted_days(self):
+        """
+        Test that each day is sorted and cached on its own and that the days are
+        merged into one ranking, cut at top_n.
+        """
+        cache = MemoryFareCache(ttl=60)
+
+        def raw_data(*miles):
+            return {'requestedFlightSegmentList': [{'flightList': [
+                {'airline': {'name': 'TAP'}, 'fareList': [{'type': 'SMILES', 'miles': cost}]}
+                for cost in miles
+            ]}]}
+
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            raw_data(90000, 50000, 70000),
+            raw_data(80000, 40000),
+            raw_data(60000),
+        ]
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+
+        flights = asyncio.run(flight_service.get_flights_internal('GRU', 'LIS', date(2025, 4, 10), 3, top_n=4))
+
+        self.assertEqual([flight['miles_cost'] for flight in flights], [40000, 50000, 60000, 70000])
+        cached_day = cache.get(FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0))
+        self.assertEqual([flight['miles_cost'] for flight in cached_day], [50000, 70000, 90000])
+
+    def test_filters_are_pushed_down_into_parsing(self):
+        """
+        Test that filtered-out flights are rejected before their dates are parsed,
+        and that fare type filters pick the miles of that fare.
+        """
+        raw_data = {'requestedFlightSegmentList': [{'flightList': [
+            {'airline': {'name': 'GOL'}, 'stops': 0, 'departure': {'date': '2025-03-10T08:00:00'},
+             'fareList': [{'type': 'SMILES', 'miles': 20000}, {'type': 'SMILES_CLUB', 'miles': 15000}]},
+            {'airline': {'name': 'GOL'}, 'stops': 2, 'departure': {'date': '2025-03-10T09:00:00'},
+             'fareList': [{'type': 'SMILES', 'miles': 10000}]},
+            {'airline': {'name': 'LATAM'}, 'stops': 0, 'departure': {'date': '2025-03-10T10:00:00'},
+             'fareList': [{'type': 'SMILES', 'miles': 12000}]},
+        ]}]}
+        filters = FlightFilters(max_stops=1, airlines=['gol'], fare_types=['SMILES_CLUB'])
+
+        with patch.object(FlightService, 'parse_iso_datetime', wraps=FlightService.parse_iso_datetime) as parse:
+            flights = self.flight_service.extract_flights(raw_data, 'url', filters)
+
+        self.assertEqual([(flight.airline, flight.miles_cost) for flight in flights], [('GOL', 15000)])
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(self.flight_service.extract_flights(raw_data, 'url', FlightFilters(max_miles=9999)), [])
+
+    def test_filtered_searches_filter_cached_days_and_skip_caching(self):
+        """
+        Test that cached days are filtered and that filtered days are not cached.
+        """
+        cache = MemoryFareCache(ttl=60)
+        cache.set(FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0), [
+            Flight('TAP', 50000, number_of_stops=0), Flight('TAP', 40000, number_of_stops=1),
+        ])
+        raw_data = {'requestedFlightSegmentList': [{'flightList': [
+            {'airline': {'name': 'TAP'}, 'stops': 0, 'fareList': [{'type': 'SMILES', 'miles': 60000}]},
+        ]}]}
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [raw_data] * len(searches)
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+
+        flights = asyncio.run(flight_service.get_flights_internal(
+            'GRU', 'LIS', date(2025, 4, 10), 2, filters=FlightFilters(max_stops=0)
+        ))
+
+        self.assertEqual([flight.miles_cost for flight in flights], [50000, 60000])
+        self.assertIsNone(cache.get_entry(FareCache.make_key('GRU', 'LIS', date(2025, 4, 11), 1, 0, 0)))
+
+        asyncio.run(flight_service.get_flights_internal(
+            'GRU', 'LIS', date(2025, 4, 10), 1, filters=FlightFilters(fare_types=['SMILES'])
+        ))
+        searches = self.mock_client.search_flights_bulk.call_args.args[0]
+        self.assertEqual([search['departure_date'] for search in searches], [date(2025, 4, 10)])
+
+    def test_parsing_pipeline_is_lazy(self):
+        """
+        Test that the generator pipeline only parses the flights the consumer takes.
+        """
+        raw_data = {'requestedFlightSegmentList': [
+            {'flightList': [{'fareList': [{'type': 'SMILES', 'miles': miles}]} for miles in (300, 100)]},
+            {'flightList': [{'fareList': [{'type': 'SMILES', 'miles': 200}]}]},
+        ]}
+
+        with patch.object(FlightService, 'parse_single_flight', wraps=self.flight_service.parse_single_flight) as parse:
+            flights = self.flight_service.iter_extract_flights(raw_data, 'url')
+            self.assertEqual(parse.call_count, 0)
+            self.assertEqual(next(flights).miles_cost, 300)
+            self.assertEqual(parse.call_count, 1)
+
+        self.assertEqual([flight.miles_cost for flight in flights], [100, 200])
+        self.assertEqual(
+            [flight.miles_cost for flight in self.flight_service.extract_flights(raw_data, 'url')], [300, 100, 200]
+        )
+
+    def test_iter_flights_yields_merged_flights_lazily(self):
+        """
+        Test that iter_flights returns an iterator over the merged days.
+        """
+        raw_data = {'requestedFlightSegmentList': [{'flightList': [
+            {'fareList': [{'type': 'SMILES', 'miles': miles}]} for miles in (30000, 10000)
+        ]}]}
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [raw_data] * len(searches)
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+
+        flights = asyncio.run(flight_service.iter_flights('GRU', 'LIS', date(2025, 4, 10), 2))
+
+        self.assertEqual(next(flights).miles_cost, 10000)
+        self.assertEqual([flight.miles_cost for flight in flights], [10000, 30000, 30000])
+
+    def test_multi_airport_search_fans_out_and_merges(self):
+        """
+        Test that metro and multi-airport searches query each distinct route and day
+        once and return one ranking across routes.
+        """
+        def raw_data(search):
+            miles = {'GRU': 50000, 'CGH': 40000, 'VCP': 60000}[search['origin']]
+            if search['destination'] == 'OPO':
+                miles -= 5000
+            return {'requestedFlightSegmentList': [{'flightList': [
+                {'fareList': [{'type': 'SMILES', 'miles': miles + search['departure_date'].day}]}
+            ]}]}
+
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            raw_data(search) for search in searches
+        ]
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+
+        flights = asyncio.run(flight_service.get_flights_internal('SAO, GRU', 'LIS,OPO', date(2025, 4, 10), 2))
+
+        searches = self.mock_client.search_flights_bulk.call_args.args[0]
+        routes = {(search['origin'], search['destination'], search['departure_date']) for search in searches}
+        self.assertEqual(len(searches), 12)
+        self.assertEqual(len(routes), 12)
+        self.assertEqual([flight.miles_cost for flight in flights][:3], [35010, 35011, 40010])
+        self.assertIn('originAirport=CGH&destinationAirport=OPO', flights[0].smiles_url)
+
+    def test_round_trips_reuse_one_way_days(self):
+        """
+        Test that a round trip search fetches each leg day once, reuses cached days
+        and pairs the legs within the stay range.
+        """
+        def raw_data(search):
+            miles = 30000 + search['departure_date'].day * 100
+            return {'requestedFlightSegmentList': [{'flightList': [{
+                'fareList': [{'type': 'SMILES', 'miles': miles}],
+                'departure': {'airport': {'code': search['origin']}, 'date': f"{search['departure_date'].isoformat()}T10:00:00"},
+                'arrival': {'airport': {'code': search['destination']}, 'date': f"{search['departure_date'].isoformat()}T20:00:00"},
+            }]}]}
+
+        cache = MemoryFareCache(ttl=60)
+        cache.set(FareCache.make_key('LIS', 'GRU', date(2025, 4, 12), 1, 0, 0), [Flight(miles_cost=1000, departure_time='2025-04-12T10:00:00')])
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            raw_data(search) for search in searches
+        ]
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+
+        round_trips = asyncio.run(flight_service.get_round_trips_internal('GRU', 'LIS', date(2025, 4, 10), 3, 2, 4))
+
+        searches = self.mock_client.search_flights_bulk.call_args.args[0]
+        legs = [(search['origin'], search['departure_date'].day) for search in searches]
+        self.assertEqual(sorted(legs), sorted(
+            [('GRU', 10), ('GRU', 11), ('GRU', 12), ('LIS', 13), ('LIS', 14), ('LIS', 15), ('LIS', 16)]
+        ))
+        self.assertEqual([round_trip.miles_cost for round_trip in round_trips][:2], [32000, 62300])
+        self.assertEqual(len(round_trips), 9)
+        for round_trip in round_trips:
+            stay = int(round_trip.inbound.departure_time[8:10]) - int(round_trip.outbound.departure_time[8:10])
+            self.assertTrue(2 <= stay <= 4)
+
+    def test_round_trip_return_days_stop_at_the_searchable_window(self):
+        """
+        Test that return days past the searchable window are not searched.
+        """
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [{} for _ in searches]
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+        last_day = last_search_date()
+
+        asyncio.run(flight_service.get_round_trips_internal('GRU', 'LIS', last_day - timedelta(days=2), 1, 1, 7))
+
+        searches = self.mock_client.search_flights_bulk.call_args.args[0]
+        inbound_days = sorted(search['departure_date'] for search in searches if search['origin'] == 'LIS')
+        self.assertEqual(inbound_days, [last_day - timedelta(days=1), last_day])
+
+        self.mock_client.search_flights_bulk.reset_mock()
+        self.assertEqual(asyncio.run(flight_service.get_round_trips_internal('GRU', 'LIS', last_day, 1, 1, 7)), [])
+        self.mock_client.search_flights_bulk.assert_not_called()
+
+    def test_fare_calendar_samples_and_refines(self):
+        """
+        Test that a year-wide calendar searches a small share of the days, uses cached
+        days for free, finds the cheapest day of a valley and flags estimated days.
+        """
+        start = date(2025, 1, 1)
+
+        def miles(day):
+            # Prices fall towards a valley around day 200 of the window
+            return 20000 + abs((day - start).days - 200) * 100
+
+        def raw_data(search):
+            return {'requestedFlightSegmentList': [{'flightList': [
+                {'fareList': [{'type': 'SMILES', 'miles': miles(search['departure_date'])}]}
+            ]}]}
+
+        cache = MemoryFareCache(ttl=60)
+        cache.set(FareCache.make_key('GRU', 'LIS', date(2025, 3, 1), 1, 0, 0), [Flight(miles_cost=1000)])
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            raw_data(search) for search in searches
+        ]
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+
+        calendar = asyncio.run(flight_service.get_fare_calendar_internal('GRU', 'LIS', start, 330, 50))
+
+        fetched = [
+            search['departure_date']
+            for call in self.mock_client.search_flights_bulk.call_args_list
+            for search in call.args[0]
+        ]
+        self.assertEqual(len(calendar), 330)
+        self.assertEqual(len(fetched), 50)
+        self.assertEqual(len(set(fetched)), 50)
+        self.assertNotIn(date(2025, 3, 1), fetched)
+        self.assertEqual(sum(day.exact for day in calendar), 51)
+
+        by_date = {day.date: day for day in calendar}
+        self.assertTrue(by_date[date(2025, 3, 1)].exact)
+        self.assertEqual(by_date[date(2025, 3, 1)].miles_cost, 1000)
+        self.assertTrue(by_date[start + timedelta(days=200)].exact)
+        self.assertEqual(by_date[start + timedelta(days=200)].miles_cost, 20000)
+        for day in calendar:
+            if not day.exact and day.date > date(2025, 3, 15):
+                self.assertLessEqual(abs(day.miles_cost - miles(day.date)), 1000)
+
+    def test_fare_calendar_budget_counts_every_route(self):
+        """
+        Test that a multi-airport calendar sends at most `max_fetched_days` searches.
+        """
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            {'requestedFlightSegmentList': [{'flightList': [
+                {'fareList': [{'type': 'SMILES', 'miles': 20000 + search['departure_date'].toordinal() % 50 * 100}]}
+            ]}]}
+            for search in searches
+        ]
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+
+        calendar = asyncio.run(flight_service.get_fare_calendar_internal('SAO', 'LIS', date(2025, 1, 1), 330, 50))
+
+        batches = [call.args[0] for call in self.mock_client.search_flights_bulk.call_args_list]
+        fetched_days = {search['departure_date'] for batch in batches for search in batch}
+        self.assertLessEqual(sum(len(batch) for batch in batches), 50)
+        self.assertGreaterEqual(sum(len(batch) for batch in batches), 48)
+        self.assertTrue(all(len(batch) % 3 == 0 for batch in batches))
+        self.assertEqual(sum(day.exact for day in calendar), len(fetched_days))
+
+    def test_fare_calendar_leaves_failed_days_unknown(self):
+        """
+        Test that a day whose fetch fails is retried, then estimated instead of
+        being shown as an exact day without flights.
+        """
+        start = date(2025, 1, 1)
+        failing_day = start + timedelta(days=10)
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            {'error': 'Service Unavailable', 'status': 503} if search['departure_date'] == failing_day else
+            {'requestedFlightSegmentList': [{'flightList': [{'fareList': [
+                {'type': 'SMILES', 'miles': 30000 + (search['departure_date'] - start).days * 100}
+            ]}]}]}
+            for search in searches
+        ]
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+
+        calendar = asyncio.run(flight_service.get_fare_calendar_internal('GRU', 'LIS', start, 30, 60))
+
+        fetched = [
+            search['departure_date']
+            for call in self.mock_client.search_flights_bulk.call_args_list
+            for search in call.args[0]
+        ]
+        self.assertEqual(fetched.count(failing_day), FlightService.CALENDAR_DAY_ATTEMPTS)
+        self.assertEqual(len(set(fetched)), 30)
+        by_date = {day.date: day for day in calendar}
+        self.assertFalse(by_date[failing_day].exact)
+        self.assertEqual(by_date[failing_day].miles_cost, 31000)
+        self.assertEqual(sum(day.exact for day in calendar), 29)
+
+    def test_merge_days(self):
+        """
+        Test the k-way merge of sorted days, with and without a limit.
+        """
+        days = [
+            [{'miles_cost': 10}, {'miles_cost': 30}],
+            [],
+            [{'miles_cost': 10, 'day': 3}, {'miles_cost': 20}],
+        ]
+
+        self.assertEqual(
+            FlightService.merge_days(days),
+            [{'miles_cost': 10}, {'miles_cost': 10, 'day': 3}, {'miles_cost': 20}, {'miles_cost': 30}],
+        )
+        self.assertEqual(FlightService.merge_days(days, top_n=1), [{'miles_cost': 10}])
+        self.assertEqual(FlightService.merge_days([], top_n=5), [])
+
+    def stale_day_service(self):
+        """
+        Returns a FlightService whose cache holds a stale GRU-LIS day, the key of
+        that day, and the list its scheduled refreshes are appended to.
+        """
+        cache = MemoryFareCache(ttl=60, stale_ttl=3600)
+        key = FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0)
+        stale_fetched_at = datetime.now().timestamp() - 600
+        cache.set(key, [{'airline': 'TAP', 'miles_cost': 80000, 'fetched_at': stale_fetched_at}], stale_fetched_at)
+
+        raw_data = {'requestedFlightSegmentList': [{'flightList': [{
+            'airline': {'name': 'TAP'},
+            'fareList': [{'type': 'SMILES', 'miles': 75000}],
+        }]}]}
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [raw_data] * len(searches)
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+        refreshes = []
+        schedule_refresh = flight_service.schedule_refresh
+        flight_service.schedule_refresh = lambda searches: refreshes.append(schedule_refresh(searches))
+        return flight_service, key, refreshes
+
+    def assert_refreshed(self, cache, key):
+        self.assertEqual(self.mock_client.search_flights_bulk.call_args.kwargs['priority'], FlightService.REFRESH_PRIORITY)
+        refreshed_flights, fetched_at = cache.get_entry(key)
+        self.assertEqual(refreshed_flights[0]['miles_cost'], 75000)
+        self.assertTrue(cache.is_fresh(fetched_at))
+
+    @override_settings(FLIGHT_SEARCH_USE_LOOP_BRIDGE=True)
+    def test_get_flights_internal_serves_stale_days_and_refreshes_them(self):
+        """
+        Test that a stale cached day is returned as is and refreshed in the background,
+        on the loop bridge when the request's loop is a throwaway one.
+        """
+        flight_service, key, refreshes = self.stale_day_service()
+
+        # The request's loop is gone before the refresh runs, as with async_to_sync
+        flights = asyncio.run(flight_service.get_flights_internal('GRU', 'LIS', date(2025, 4, 10), 1))
+        refreshes[0].result(timeout=5)
+
+        self.assertEqual(flights[0]['miles_cost'], 80000)
+        self.assertIsInstance(refreshes[0], concurrent.futures.Future)
+        self.assert_refreshed(flight_service.cache, key)
+
+    def test_refresh_runs_on_the_server_loop_under_asgi(self):
+        """
+        Test that without the loop bridge a stale day is refreshed on the loop that found it.
+        """
+        flight_service, key, refreshes = self.stale_day_service()
+
+        async def run():
+            flights = await flight_service.get_flights_internal('GRU', 'LIS', date(2025, 4, 10), 1)
+            self.assertIs(refreshes[0].get_loop(), asyncio.get_running_loop())
+            await refreshes[0]
+            return flights
+
+        flights = asyncio.run(run())
+
+        self.assertEqual(flights[0]['miles_cost'], 80000)
+        self.assert_refreshed(flight_service.cache, key)
+        self.assertFalse(FlightService._refresh_tasks)
+
+    def test_cancelled_refresh_releases_its_days(self):
+        """
+        Test that a refresh cancelled before it started lets its days be refreshed again.
+        """
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+        searches = flight_service.build_searches('GRU', 'LIS', date(2025, 4, 10), 2)
+        keys = {flight_service.cache_key(search) for search in searches}
+
+        # Keep the bridge loop busy so the refresh can't start before it is cancelled
+        busy = threading.Event()
+        loop_bridge.loop.call_soon_threadsafe(busy.wait, 5)
+        try:
+            future = flight_service.schedule_refresh(searches)
+            self.assertIsNone(flight_service.schedule_refresh(searches))
+            self.assertTrue(future.cancel())
+        finally:
+            busy.set()
+
+        self.assertFalse(keys & FlightService._refreshing)
+        self.assertIsNotNone(flight_service.schedule_refresh(searches[:1]))
+
+    @override_settings(FLIGHT_SEARCH_USE_LOOP_BRIDGE=True)
+    def test_sync_and_async_entry_points_use_the_loop_bridge(self):
+        """
+        Test that get_flights, and aget_flights when configured, run on the shared loop bridge.
+        """
+        loops = []
+
+        async def search_flights_bulk(searches, priority=0):
+            loops.append(asyncio.get_running_loop())
+            return [{}] * len(searches)
+
+        self.mock_client.search_flights_bulk.side_effect = search_flights_bulk
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+
+        flight_service.get_flights('GRU', 'LIS', date(2025, 4, 10), 0)
+        asyncio.run(flight_service.aget_flights('GRU', 'LIS', date(2025, 4, 11), 0))
+
+        self.assertEqual(loops, [loop_bridge.loop, loop_bridge.loop])
+
+    def test_stream_flights_yields_days_as_they_complete(self):
+        """
+        Test that stream_flights yields cached days first, then each fetched day
+        in completion order, with running cheapest and done events.
+        """
+        cache = MemoryFareCache(ttl=60)
+        cache.set(FareCache.make_key('GRU', 'LIS', date(2025, 4, 10), 1, 0, 0), [{'miles_cost': 90000}])
+
+        def raw_data(miles):
+            return {'requestedFlightSegmentList': [{'flightList': [{
+                'airline': {'name': 'TAP'},
+                'fareList': [{'type': 'SMILES', 'miles': miles}],
+            }]}]}
+
+        async def search_flights_as_completed(searches, priority=0):
+            # The second day answers before the first one
+            yield 1, raw_data(60000)
+            yield 0, raw_data(70000)
+
+        self.mock_client.search_flights_as_completed = search_flights_as_completed
+        flight_service = FlightService(client=self.mock_client, cache=cache)
+
+        async def run():
+            return [event async for event in flight_service.stream_flights('GRU', 'LIS', date(2025, 4, 10), 3)]
+
+        events = asyncio.run(run())
+
+        self.assertEqual([event for event, _ in events], ['date', 'cheapest', 'date', 'cheapest', 'date', 'done'])
+        self.assertEqual([data['date'] for event, data in events if event == 'date'], ['2025-04-10', '2025-04-12', '2025-04-11'])
+        self.assertEqual([data['miles_cost'] for event, data in events if event == 'cheapest'], [90000, 60000])
+        self.assertEqual(events[-1][1], {'flights': 3})
+
+    def test_async_views_use_the_loop_bridge_when_served_by_wsgi(self):
+        """
+        Test that, unless configured, async entry points use the loop bridge only
+        once wsgi.py marked the process as a WSGI server.
+        """
+        loops = []
+
+        async def search_flights_bulk(searches, priority=0):
+            loops.append(asyncio.get_running_loop())
+            return [{}] * len(searches)
+
+        self.mock_client.search_flights_bulk.side_effect = search_flights_bulk
+        flight_service = FlightService(client=self.mock_client, cache=MemoryFareCache(ttl=60))
+
+        with override_settings(FLIGHT_SEARCH_USE_LOOP_BRIDGE=None):
+            asyncio.run(flight_service.aget_flights('GRU', 'LIS', date(2025, 4, 10), 0))
+            with patch.object(loop_bridge, 'serves_wsgi', True):
+                asyncio.run(flight_service.aget_flights('GRU', 'LIS', date(2025, 4, 11), 0))
+                with override_settings(FLIGHT_SEARCH_USE_LOOP_BRIDGE=False):
+                    asyncio.run(flight_service.aget_flights('GRU', 'LIS', date(2025, 4, 12), 0))
+
+        self.assertIsNot(loops[0], loop_bridge.loop)
+        self.assertIs(loops[1], loop_bridge.loop)
+        self.assertIsNot(loops[2], loop_bridge.loop)
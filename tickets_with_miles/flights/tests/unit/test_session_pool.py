@@ -0,0 +1,80 @@
+from django.test import TestCase
+from flights.session_pool import SessionPool
+import asyncio
+
+
+class SessionPoolTestCase(TestCase):
+    def setUp(self):
+        self.pool = SessionPool(limit=10, limit_per_host=5, dns_cache_ttl=60, keepalive_timeout=30)
+
+    def test_session_is_reused_within_loop(self):
+        """
+        Test that the same session and connector are returned for the same loop.
+        """
+        async def run():
+            first = await self.pool.get_session()
+            second = await self.pool.get_session()
+            connector = first.connector
+            await self.pool.close()
+            return first, second, connector
+
+        first, second, connector = asyncio.run(run())
+
+        self.assertIs(first, second)
+        self.assertEqual(connector.limit, 10)
+        self.assertEqual(connector.limit_per_host, 5)
+        self.assertTrue(first.closed)
+
+    def test_new_session_after_close(self):
+        """
+        Test that closing the pool makes the next call open a fresh session.
+        """
+        async def run():
+            first = await self.pool.get_session()
+            await self.pool.close()
+            second = await self.pool.get_session()
+            await self.pool.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        self.assertIsNot(first, second)
+
+    def test_zero_means_no_connection_limit(self):
+        """
+        Test that a limit of 0 is passed to aiohttp as "no limit" instead of the default.
+        """
+        pool = SessionPool(limit=0, limit_per_host=0)
+
+        async def run():
+            connector = (await pool.get_session()).connector
+            await pool.close()
+            return connector
+
+        connector = asyncio.run(run())
+
+        self.assertEqual((connector.limit, connector.limit_per_host), (0, 0))
+
+    def test_session_is_closed_with_its_loop(self):
+        """
+        Test that a session left open is closed when its loop shuts down, as after
+        each async_to_sync call.
+        """
+        async def run():
+            return await self.pool.get_session()
+
+        session = asyncio.run(run())
+
+        self.assertTrue(session.closed)
+
+    def test_short_lived_loops_are_dropped(self):
+        """
+        Test that the pool keeps nothing of loops that have shut down.
+        """
+        async def run():
+            return await self.pool.get_session()
+
+        for _ in range(5):
+            asyncio.run(run())
+
+        self.assertEqual((len(self.pool._sessions), len(self.pool._closers)), (0, 0))
@@ -0,0 +1,191 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.db import IntegrityError
+from unittest.mock import MagicMock, patch
+from flights.fare_cache import MemoryFareCache
+from flights.filters import FlightFilters
+from flights.models import FareSnapshot
+from flights.services import FlightService
+from flights.snapshots import FareSnapshotWriter, compact_snapshots, get_snapshot_writer
+
+
+NOW = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def snapshot(miles, observed_at, flight_date=date(2025, 4, 10), origin='GRU', destination='LIS'):
+    return FareSnapshot.objects.create(
+        origin=origin, destination=destination, flight_date=flight_date,
+        airline='LATAM', miles=miles, observed_at=observed_at,
+    )
+
+
+class FareSnapshotWriterTest(TestCase):
+    search = {'origin': 'GRU', 'destination': 'LIS', 'departure_date': date(2025, 4, 10)}
+
+    def test_flush_writes_queued_flights(self):
+        """
+        Test that queued flights are written in bulk, with their duration in minutes.
+        """
+        writer = FareSnapshotWriter(background=False)
+        writer.record(self.search, [
+            {'miles_cost': 30000, 'airline': 'LATAM', 'number_of_stops': 1, 'duration_hours': 11, 'duration_minutes': 5},
+            {'miles_cost': 45000, 'airline': 'TAP'},
+        ], NOW.timestamp())
+
+        self.assertEqual(len(writer), 2)
+        self.assertEqual(FareSnapshot.objects.count(), 0)
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(len(writer), 0)
+
+        first, second = FareSnapshot.objects.order_by('miles')
+        self.assertEqual((first.origin, first.destination, first.flight_date), ('GRU', 'LIS', date(2025, 4, 10)))
+        self.assertEqual((first.stops, first.duration_minutes, first.observed_at), (1, 665, NOW))
+        self.assertEqual((second.airline, second.stops, second.duration_minutes), ('TAP', 0, None))
+
+    def test_rows_beyond_max_buffer_are_dropped(self):
+        """
+        Test that the buffer never grows past max_buffer.
+        """
+        writer = FareSnapshotWriter(max_buffer=3, background=False)
+        flights = [{'miles_cost': miles} for miles in (10000, 20000)]
+        writer.record(self.search, flights, NOW.timestamp())
+        writer.record(self.search, flights, NOW.timestamp())
+        writer.record(self.search, flights, NOW.timestamp())
+
+        self.assertEqual(len(writer), 3)
+        self.assertEqual(writer.dropped, 3)
+
+    def test_failed_flush_requeues_its_rows(self):
+        """
+        Test that rows of a failed insert are queued again ahead of newer ones,
+        within max_buffer, and written by the next flush.
+        """
+        writer = FareSnapshotWriter(max_buffer=3, background=False)
+        writer.record(self.search, [{'miles_cost': 10000}, {'miles_cost': 20000}], NOW.timestamp())
+
+        def record_then_fail(*args, **kwargs):
+            writer.record(self.search, [{'miles_cost': 30000}, {'miles_cost': 40000}], NOW.timestamp())
+            raise IntegrityError('database is locked')
+
+        with patch.object(FareSnapshot.objects, 'bulk_create', side_effect=record_then_fail):
+            with self.assertRaises(IntegrityError):
+                writer.flush()
+
+        self.assertEqual((len(writer), writer.dropped), (3, 1))
+        self.assertEqual(writer.flush(), 3)
+        self.assertEqual(list(FareSnapshot.objects.order_by('miles').values_list('miles', flat=True)), [10000, 20000, 30000])
+
+    def test_close_writes_queued_rows_and_stops_the_thread(self):
+        """
+        Test that close() writes what the background thread hasn't written yet and stops it.
+        """
+        writer = FareSnapshotWriter(flush_interval=3600)
+        writer.record(self.search, [{'miles_cost': 10000}], NOW.timestamp())
+
+        self.assertEqual(writer.close(), 1)
+        writer._thread.join(timeout=5)
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(FareSnapshot.objects.count(), 1)
+
+    def test_can_be_disabled(self):
+        """
+        Test that FlightService gets no writer when snapshots are disabled.
+        """
+        with override_settings(FARE_SNAPSHOTS={'ENABLED': False}):
+            self.assertIsNone(get_snapshot_writer())
+            self.assertIsNone(FlightService(client=MagicMock(), cache=None).snapshots)
+
+    def test_service_records_unfiltered_days(self):
+        """
+        Test that FlightService queues the flights of unfiltered, successful days only.
+        """
+        writer = FareSnapshotWriter(background=False)
+        service = FlightService(client=MagicMock(), cache=MemoryFareCache(ttl=60), snapshots=writer)
+        search = service.build_searches('GRU', 'LIS', date(2025, 4, 10), 1)[0]
+        raw_data = {'requestedFlightSegmentList': [{'flightList': [
+            {'fareList': [{'type': 'SMILES', 'miles': 30000}]}
+        ]}]}
+
+        service.process_day(search, raw_data, NOW.timestamp())
+        service.process_day(search, {'error': 'timeout'}, NOW.timestamp())
+        service.process_day(search, raw_data, NOW.timestamp(), filters=FlightFilters(max_miles=99999))
+
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(FareSnapshot.objects.get().miles, 30000)
+
+
+class FareSnapshotQueryTest(TestCase):
+    def test_price_history_is_ordered_by_observation(self):
+        """
+        Test that the price history of a flight date lists its observations in time order.
+        """
+        snapshot(32000, NOW)
+        snapshot(30000, NOW - timedelta(days=2))
+        snapshot(31000, NOW - timedelta(days=1))
+        snapshot(10000, NOW, flight_date=date(2025, 4, 11))
+        snapshot(10000, NOW, destination='OPO')
+
+        history = FareSnapshot.objects.price_history('GRU', 'LIS', date(2025, 4, 10))
+        self.assertEqual([row.miles for row in history], [30000, 31000, 32000])
+
+    def test_cheapest_per_month(self):
+        """
+        Test that the cheapest fare of each route and flight month is returned.
+        """
+        snapshot(32000, NOW, flight_date=date(2025, 4, 10))
+        snapshot(29000, NOW, flight_date=date(2025, 4, 20))
+        snapshot(40000, NOW, flight_date=date(2025, 5, 2))
+        snapshot(20000, NOW, destination='OPO')
+
+        months = list(FareSnapshot.objects.cheapest_per_month('GRU', 'LIS'))
+        self.assertEqual(
+            [(row['month'], row['miles'], row['observations']) for row in months],
+            [(date(2025, 4, 1), 29000, 2), (date(2025, 5, 1), 40000, 1)],
+        )
+
+
+class CompactSnapshotsTest(TestCase):
+    def test_old_observations_roll_up_to_the_cheapest_per_day(self):
+        """
+        Test that observations older than raw_days keep only the cheapest of each day,
+        recent ones are untouched, and compacting again changes nothing.
+        """
+        old_day = NOW - timedelta(days=10)
+        snapshot(35000, old_day)
+        cheapest = snapshot(30000, old_day + timedelta(hours=3))
+        snapshot(33000, old_day + timedelta(hours=6))
+        other_day = snapshot(36000, old_day + timedelta(days=1))
+        other_route = snapshot(50000, old_day, destination='OPO')
+        snapshot(50000, old_day + timedelta(hours=1), destination='OPO')
+        recent = [snapshot(miles, NOW - timedelta(hours=hours)) for miles, hours in ((34000, 1), (31000, 2))]
+
+        self.assertEqual(compact_snapshots(raw_days=7, history_days=365, now=NOW, batch_size=1), (0, 3))
+
+        kept = set(FareSnapshot.objects.values_list('id', flat=True))
+        self.assertEqual(kept, {cheapest.id, other_day.id, other_route.id, *(row.id for row in recent)})
+        self.assertEqual(compact_snapshots(raw_days=7, history_days=365, now=NOW), (0, 0))
+
+    def test_expired_flight_dates_are_deleted(self):
+        """
+        Test that flight dates more than history_days in the past are deleted.
+        """
+        snapshot(30000, NOW - timedelta(days=40), flight_date=NOW.date() - timedelta(days=31))
+        kept = snapshot(30000, NOW - timedelta(days=40), flight_date=NOW.date() - timedelta(days=29))
+
+        self.assertEqual(compact_snapshots(raw_days=7, history_days=30, now=NOW), (1, 0))
+        self.assertEqual(list(FareSnapshot.objects.values_list('id', flat=True)), [kept.id])
+
+    def test_command(self):
+        """
+        Test that the compact_fare_snapshots command reports what it deleted.
+        """
+        now = datetime.now(timezone.utc)
+        snapshot(30000, now - timedelta(days=10), flight_date=now.date() + timedelta(days=5))
+        snapshot(31000, now - timedelta(days=10), flight_date=now.date() + timedelta(days=5))
+
+        out = StringIO()
+        call_command('compact_fare_snapshots', '--raw-days', '7', stdout=out)
+        self.assertIn('0 expired and 1 rolled up', out.getvalue())
+        self.assertEqual(FareSnapshot.objects.count(), 1)
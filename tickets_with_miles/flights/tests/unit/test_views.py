@@ -1,10 +1,23 @@
 from django.contrib.messages import get_messages
+from django.test import override_settings
 from django.test.testcases import TestCase
 from django.urls import reverse
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from flights.models import Airport
+from flights.airport_index import AirportIndex, AirportInfo
+from flights.fare_calendar import CalendarDay
+from flights.flight import Flight
+from flights.result_store import SearchResultStore
+from flights.round_trip import RoundTrip
+from datetime import date, timedelta
+from asgiref.sync import async_to_sync
 
 
+def make_airport_index(*iata_codes):
+    return AirportIndex(AirportInfo(code, code, '', 'BR', 'Brazil') for code in iata_codes)
+
+
+@override_settings(FARE_SNAPSHOTS={'ENABLED': False})
 class ViewTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -29,13 +42,13 @@ class ViewTests(TestCase):
         self.assertContains(response, 'Data')
         self.assertContains(response, 'Flexibilidade')
 
-    @patch('flights.services.FlightService.get_flights')
-    @patch('flights.models.Airport.objects.filter')
-    def test_search_flights_successful_search(self, mock_filter, mock_get_flights):
+    @patch('flights.services.FlightService.get_flights_internal')
+    @patch('flights.forms.aget_airport_index')
+    def test_search_flights_successful_search(self, mock_get_airport_index, mock_get_flights):
         """
         Tests if the flight search works when the form is valid.
         """
-        mock_filter.return_value.exists.return_value = True
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
 
         mock_get_flights.return_value = [{
                 'airline': 'GOL (G3)', 
@@ -58,17 +71,23 @@ class ViewTests(TestCase):
         }
 
         response = self.client.post(self.url, data)
-        self.assertIn('flights', self.client.session)
-        self.assertRedirects(response, self.url)
+        self.assertIn('search_id', self.client.session)
+        self.assertNotIn('flights', self.client.session)
+        search_id = self.client.session['search_id']
+        self.assertRedirects(response, reverse('search_results', args=[search_id]))
         self.assertEqual(response.status_code, 302)
 
-    @patch('flights.services.FlightService.get_flights')
-    @patch('flights.models.Airport.objects.filter')
-    def test_search_flights_error_occurred(self, mock_filter, mock_get_flights):
+        response = self.client.get(reverse('search_results', args=[search_id]))
+        self.assertEqual(response.context['flights'], mock_get_flights.return_value)
+        self.assertContains(response, 'Ver na Smiles')
+
+    @patch('flights.services.FlightService.get_flights_internal')
+    @patch('flights.forms.aget_airport_index')
+    def test_search_flights_error_occurred(self, mock_get_airport_index, mock_get_flights):
         """
         Tests the behavior when an error occurs while fetching the flights.
         """
-        mock_filter.return_value.exists.return_value = True
+        mock_get_airport_index.return_value = make_airport_index('ABC', 'GRU')
         mock_get_flights.side_effect = Exception("Erro ao buscar os voos")
         data = {
             'origin': 'ABC',
@@ -80,11 +99,195 @@ class ViewTests(TestCase):
         messages = [msg.message for msg in get_messages(response.wsgi_request)]
         self.assertIn('Ocorreu um erro ao pesquisar pelos voos.', messages)
 
-    @patch('flights.services.FlightService.get_flights')
+    @patch('flights.services.FlightService.get_flights_internal')
     def test_search_flights_no_session_data(self, mock_get_flights):
         """
         Tests the behavior when there is no flight data in the session.
         """
         mock_get_flights.return_value = []
         response = self.client.get(self.url)
-        self.assertEqual(response.context['flights'], [])
\ No newline at end of file
+        self.assertEqual(response.context['flights'], [])
+
+    @patch('flights.services.FlightService.get_flights_internal')
+    def test_search_flights_validates_airports_with_async_orm(self, mock_get_flights):
+        """
+        Tests that the async view loads the airport index with async queries and awaits the search.
+        """
+        Airport.objects.create(name='Confins', iata_code='CNF', state_code='MG', country_code='BR', country_name='Brazil')
+        Airport.objects.create(name='Guarulhos', iata_code='GRU', state_code='SP', country_code='BR', country_name='Brazil')
+        mock_get_flights.return_value = []
+        departure_date = date.today() + timedelta(days=30)
+        data = {
+            'origin': 'cnf',
+            'destination': 'GRU',
+            'date': departure_date.strftime('%d/%m/%Y'),
+            'flexibility': 3
+        }
+
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_flights.assert_awaited_once_with('CNF', 'GRU', departure_date, 3, top_n=None, filters=None)
+
+    @patch('flights.services.FlightService.stream_flights')
+    @patch('flights.forms.aget_airport_index')
+    def test_search_flights_stream_sends_server_sent_events(self, mock_get_airport_index, mock_stream_flights):
+        """
+        Tests that the streaming endpoint relays each search event as a Server-Sent Event.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
+
+        async def stream_flights(origin, destination, departure_date, flexibility, filters=None):
+            yield 'date', {'date': '2025-03-10', 'flights': [{'miles_cost': 55200}]}
+            yield 'done', {'flights': 1}
+
+        mock_stream_flights.side_effect = stream_flights
+        url = reverse('search_flights_stream')
+        departure_date = (date.today() + timedelta(days=30)).strftime('%d/%m/%Y')
+
+        async def run():
+            response = await self.async_client.get(
+                url, {'origin': 'CNF', 'destination': 'GRU', 'date': departure_date, 'flexibility': 0}
+            )
+            content = b''.join([chunk async for chunk in response.streaming_content])
+            return response, content.decode()
+
+        response, content = async_to_sync(run)()
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(content, (
+            'event: date\ndata: {"date": "2025-03-10", "flights": [{"miles_cost": 55200}]}\n\n'
+            'event: done\ndata: {"flights": 1}\n\n'
+        ))
+
+    def test_search_flights_stream_rejects_invalid_parameters(self):
+        """
+        Tests that invalid search parameters are answered with the form errors.
+        """
+        response = self.client.get(reverse('search_flights_stream'), {'origin': 'XX'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('origin', response.json()['errors'])
+
+    def test_search_results_expired(self):
+        """
+        Tests that an unknown or expired search ID redirects back to the search page.
+        """
+        response = self.client.get(reverse('search_results', args=['expired-id']))
+        messages = [msg.message for msg in get_messages(response.wsgi_request)]
+        self.assertRedirects(response, self.url)
+        self.assertIn('Esta busca expirou. Faça uma nova pesquisa.', messages)
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def test_search_results_are_cached_for_their_remaining_lifetime(self):
+        """
+        Tests that a result page may be cached privately only until the result expires,
+        and not at all when it shows flash messages.
+        """
+        store = SearchResultStore()
+        flight = {
+            'airline': 'GOL', 'miles_cost': 20000, 'duration_hours': 1, 'duration_minutes': 0,
+            'departure_time': '2025-03-10T10:00:00', 'arrival_time': '2025-03-10T11:00:00', 'number_of_stops': 0,
+        }
+        search_id = store.save({'origin': 'CNF', 'destination': 'GRU'}, [flight])
+        url = reverse('search_results', args=[search_id])
+
+        with patch('flights.result_store.time.time', return_value=store.load(search_id)['stored_at'] + 600):
+            response = self.client.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn(f'max-age={store.timeout - 600}', response['Cache-Control'])
+
+        self.client.get(reverse('search_results', args=['expired-id']))
+        response = self.client.get(url)
+        self.assertIn('no-store', response['Cache-Control'])
+
+    @patch('flights.views.aget_airport_index')
+    def test_airport_autocomplete(self, mock_get_airport_index):
+        """
+        Tests that the autocomplete endpoint returns matching airports as JSON.
+        """
+        mock_get_airport_index.return_value = AirportIndex([
+            AirportInfo('GRU', 'Sao Paulo Guarulhos Intl', 'SP', 'BR', 'Brazil'),
+            AirportInfo('LIS', 'Lisbon Lisboa', '', 'PT', 'Portugal'),
+        ])
+
+        response = self.client.get(reverse('airport_autocomplete'), {'q': 'lisboa'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'results': [{
+            'iata_code': 'LIS',
+            'name': 'Lisbon Lisboa',
+            'state_code': '',
+            'country_name': 'Portugal',
+            'label': 'LIS - Lisbon Lisboa, Portugal',
+        }]})
+        self.assertEqual(self.client.get(reverse('airport_autocomplete'), {'q': 'gru', 'limit': 'x'}).json()['results'][0]['iata_code'], 'GRU')
+
+    @patch('flights.services.FlightService.get_round_trips_internal')
+    @patch('flights.forms.aget_airport_index')
+    def test_search_round_trips(self, mock_get_airport_index, mock_get_round_trips):
+        """
+        Tests that round trip searches are paired by the service and shown as pairs.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
+        outbound = Flight(airline='GOL', miles_cost=20000, departure_time='2025-03-10T10:00:00', smiles_url='https://example.com/out')
+        inbound = Flight(airline='GOL', miles_cost=25000, departure_time='2025-03-15T10:00:00', smiles_url='https://example.com/in')
+        mock_get_round_trips.return_value = [RoundTrip(outbound, inbound)]
+        departure_date = date.today() + timedelta(days=30)
+
+        response = self.client.post(self.url, {
+            'origin': 'CNF', 'destination': 'GRU', 'date': departure_date.strftime('%d/%m/%Y'),
+            'flexibility': 3, 'round_trip': 'on', 'min_stay': 2, 'max_stay': 5,
+        })
+
+        mock_get_round_trips.assert_awaited_once_with(
+            'CNF', 'GRU', departure_date, 3, 2, 5, top_n=100, filters=None
+        )
+        response = self.client.get(response.url)
+        self.assertEqual(response.context['round_trips'], [RoundTrip(outbound, inbound).to_dict()])
+        self.assertEqual(response.context['flights'], [])
+        self.assertContains(response, 'Total: 45000 milhas')
+
+    @patch('flights.services.FlightService.get_fare_calendar_internal')
+    @patch('flights.forms.aget_airport_index')
+    def test_fare_calendar(self, mock_get_airport_index, mock_get_fare_calendar):
+        """
+        Tests that the fare calendar runs from today to the end of the searchable window.
+        """
+        mock_get_airport_index.return_value = make_airport_index('CNF', 'GRU')
+        today = date.today()
+        mock_get_fare_calendar.return_value = [
+            CalendarDay(today, 20000, True, Flight(miles_cost=20000)),
+            CalendarDay(today + timedelta(days=1), 21000, False),
+        ]
+
+        response = self.client.get(reverse('fare_calendar'), {'origin': 'CNF', 'destination': 'GRU'})
+
+        mock_get_fare_calendar.assert_awaited_once_with('CNF', 'GRU', today, 330, 60, filters=None)
+        data = response.json()
+        self.assertEqual(data['exact_days'], 1)
+        self.assertEqual(data['days'][1], {'date': (today + timedelta(days=1)).isoformat(), 'miles_cost': 21000, 'exact': False, 'flight': None})
+        self.assertEqual(self.client.get(reverse('fare_calendar'), {'origin': 'CNF'}).status_code, 400)
+
+    def test_search_results_can_be_reranked(self):
+        """
+        Tests that stored results can be sorted differently and reduced to the cheapest per day.
+        """
+        flights = [
+            {'airline': 'GOL', 'miles_cost': 20000, 'duration_hours': 3, 'duration_minutes': 0,
+             'departure_time': '2025-03-10T10:00:00', 'number_of_stops': 1},
+            {'airline': 'GOL', 'miles_cost': 30000, 'duration_hours': 1, 'duration_minutes': 0,
+             'departure_time': '2025-03-10T12:00:00', 'number_of_stops': 0},
+            {'airline': 'GOL', 'miles_cost': 40000, 'duration_hours': 2, 'duration_minutes': 0,
+             'departure_time': '2025-03-11T10:00:00', 'number_of_stops': 0},
+        ]
+        search_id = SearchResultStore().save({'origin': 'CNF', 'destination': 'GRU'}, flights)
+        url = reverse('search_results', args=[search_id])
+
+        response = self.client.get(url, {'sort': 'duration'})
+        self.assertEqual([flight['miles_cost'] for flight in response.context['flights']], [30000, 40000, 20000])
+        self.assertEqual(response.context['sort_by'], 'duration')
+
+        response = self.client.get(url, {'sort': 'unknown', 'per_day': '1'})
+        self.assertEqual([flight['miles_cost'] for flight in response.context['flights']], [20000, 40000])
+        self.assertEqual(response.context['sort_by'], 'miles')
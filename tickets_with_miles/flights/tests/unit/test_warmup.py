@@ -0,0 +1,185 @@
+from datetime import date, timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from unittest.mock import AsyncMock, MagicMock, patch
+from flights.api_client import FlightAPIClient
+from flights.fare_cache import DjangoFareCache, FareCache, MemoryFareCache
+from flights.services import FlightService
+from flights.warmup import RouteTraffic, RouteWarmer, WarmUpStats, parse_route
+import asyncio
+import tempfile
+
+
+def raw_data(search):
+    return {'requestedFlightSegmentList': [{'flightList': [
+        {'fareList': [{'type': 'SMILES', 'miles': 30000}]}
+    ]}]}
+
+
+class RouteTrafficTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.traffic = RouteTraffic(hours=2)
+
+    def test_top_routes(self):
+        """
+        Test that the most searched routes of the kept hourly buckets come first.
+        """
+        now = 1_700_000_000
+        self.traffic.record([('GRU', 'LIS')], now=now - 3600 * 5)
+        self.traffic.record([('CNF', 'GRU'), ('GRU', 'LIS')], now=now - 3600)
+        self.traffic.record([('CNF', 'GRU')], now=now)
+        self.traffic.record([('CNF', 'GRU'), ('GIG', 'MIA')], now=now)
+
+        self.assertEqual(self.traffic.top_routes(2, now=now), [('CNF', 'GRU'), ('GRU', 'LIS')])
+        self.assertEqual(self.traffic.searches_last_minute(now=now), 2)
+        self.assertEqual(self.traffic.searches_last_minute(now=now + 120), 0)
+
+    def test_async_record(self):
+        asyncio.run(self.traffic.arecord([('GRU', 'LIS')]))
+
+        self.assertEqual(self.traffic.top_routes(5), [('GRU', 'LIS')])
+        self.assertEqual(self.traffic.searches_last_minute(), 1)
+
+    def test_parse_route(self):
+        self.assertEqual(parse_route('gru-lis'), [('GRU', 'LIS')])
+        self.assertEqual(parse_route('SAO-RIO'), [
+            ('GRU', 'GIG'), ('GRU', 'SDU'), ('CGH', 'GIG'), ('CGH', 'SDU'), ('VCP', 'GIG'), ('VCP', 'SDU'),
+        ])
+        with self.assertRaises(ValueError):
+            parse_route('GRU')
+
+
+@override_settings(FARE_SNAPSHOTS={'ENABLED': False})
+class RouteWarmerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.start = date(2025, 4, 10)
+        self.mock_client = MagicMock(FlightAPIClient)
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            raw_data(search) for search in searches
+        ]
+        self.fare_cache = MemoryFareCache(ttl=600)
+        self.service = FlightService(client=self.mock_client, cache=self.fare_cache)
+
+    def fetched(self):
+        return [
+            (search['origin'], search['departure_date'])
+            for call in self.mock_client.search_flights_bulk.call_args_list
+            for search in call.args[0]
+        ]
+
+    def test_warm_fills_the_fare_cache_nearest_days_first(self):
+        """
+        Test that a cycle skips fresh days, spends its budget on the nearest days of
+        every route in batches at low priority, and caches what it fetched.
+        """
+        self.fare_cache.set(FareCache.make_key('GRU', 'LIS', self.start, 1, 0, 0), [])
+        warmer = RouteWarmer(service=self.service, days=5, budget=5, concurrency=2)
+
+        stats = asyncio.run(warmer.warm([('GRU', 'LIS'), ('CNF', 'GRU')], start_date=self.start))
+
+        self.assertEqual(self.fetched(), [
+            ('CNF', self.start),
+            ('GRU', self.start + timedelta(days=1)), ('CNF', self.start + timedelta(days=1)),
+            ('GRU', self.start + timedelta(days=2)), ('CNF', self.start + timedelta(days=2)),
+        ])
+        self.assertEqual([len(call.args[0]) for call in self.mock_client.search_flights_bulk.call_args_list], [2, 2, 1])
+        self.assertTrue(all(
+            call.kwargs['priority'] == RouteWarmer.WARM_PRIORITY
+            for call in self.mock_client.search_flights_bulk.call_args_list
+        ))
+        self.assertEqual((stats.routes, stats.fetched, stats.fresh, stats.skipped, stats.failed), (2, 5, 1, 4, 0))
+        self.assertIsNotNone(self.fare_cache.get(FareCache.make_key('CNF', 'GRU', self.start + timedelta(days=2), 1, 0, 0)))
+
+        # The user search is now served from the cache for the warmed days
+        self.mock_client.search_flights_bulk.reset_mock()
+        asyncio.run(self.service.get_flights_internal('CNF', 'GRU', self.start, 3))
+        self.mock_client.search_flights_bulk.assert_not_called()
+
+    def test_warm_counts_errors_and_yields_to_users(self):
+        """
+        Test that error responses are not cached and that the worker pauses while
+        users are searching.
+        """
+        self.mock_client.search_flights_bulk.side_effect = lambda searches, priority=0: [
+            {'error': 'timeout'}, *[raw_data(search) for search in searches[1:]]
+        ]
+        traffic = MagicMock(RouteTraffic)
+        traffic.searches_last_minute.side_effect = [50, 50, 0]
+        warmer = RouteWarmer(service=self.service, traffic=traffic, days=2, concurrency=5, busy_searches_per_minute=10, pause=0)
+
+        stats = asyncio.run(warmer.warm([('GRU', 'LIS')], start_date=self.start))
+
+        self.assertEqual((stats.fetched, stats.failed, stats.yielded), (1, 1, 2))
+        self.assertIsNone(self.fare_cache.get(FareCache.make_key('GRU', 'LIS', self.start, 1, 0, 0)))
+
+
+class WarmRoutesCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # A cross-process cache next to the per-process default one
+        shared_caches = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name},
+        })
+        shared_caches.enable()
+        self.addCleanup(shared_caches.disable)
+        fare_cache = patch(
+            'flights.management.commands.warm_routes.get_fare_cache', return_value=DjangoFareCache(alias='shared')
+        )
+        self.mock_get_fare_cache = fare_cache.start()
+        self.addCleanup(fare_cache.stop)
+
+    @patch('flights.management.commands.warm_routes.RouteWarmer.warm', new_callable=AsyncMock)
+    def test_warms_given_and_popular_routes(self, mock_warm):
+        stats = WarmUpStats()
+        stats.routes, stats.fetched = 3, 42
+        mock_warm.return_value = stats
+        output = StringIO()
+
+        with override_settings(ROUTE_WARMUP={'CACHE_ALIAS': 'shared'}):
+            RouteTraffic().record([('CNF', 'GRU'), ('GRU', 'LIS')])
+            call_command('warm_routes', 'GRU-LIS', '--from-traffic', '--budget', '50', stdout=output, stderr=StringIO())
+
+        self.assertEqual(mock_warm.await_args.args[0], [('GRU', 'LIS'), ('CNF', 'GRU')])
+        self.assertIn('3 routes, 42 days fetched', output.getvalue())
+
+    @patch('flights.management.commands.warm_routes.RouteWarmer.warm', new_callable=AsyncMock)
+    def test_process_local_traffic_cache(self, mock_warm):
+        """
+        Test that a per-process traffic cache refuses --from-traffic and is warned about otherwise.
+        """
+        mock_warm.return_value = WarmUpStats()
+        self.assertFalse(RouteTraffic().is_shared)
+
+        with self.assertRaisesMessage(CommandError, 'local to each process'):
+            call_command('warm_routes', '--from-traffic', stdout=StringIO(), stderr=StringIO())
+        mock_warm.assert_not_awaited()
+
+        errors = StringIO()
+        call_command('warm_routes', 'GRU-LIS', stdout=StringIO(), stderr=errors)
+        self.assertIn("won't pause", errors.getvalue())
+        mock_warm.assert_awaited_once()
+
+    @patch('flights.management.commands.warm_routes.RouteWarmer.warm', new_callable=AsyncMock)
+    def test_process_local_fare_cache(self, mock_warm):
+        """
+        Test that the command refuses to warm a fare cache no web process can read.
+        """
+        for fare_cache in (MemoryFareCache(), DjangoFareCache(alias='default'), None):
+            self.mock_get_fare_cache.return_value = fare_cache
+            with self.assertRaisesMessage(CommandError, 'FARE_CACHE'):
+                call_command('warm_routes', 'GRU-LIS', stdout=StringIO(), stderr=StringIO())
+        mock_warm.assert_not_awaited()
+
+    def test_requires_routes(self):
+        with self.assertRaises(CommandError):
+            call_command('warm_routes', stdout=StringIO(), stderr=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('warm_routes', 'GRU', stdout=StringIO(), stderr=StringIO())
@@ -3,4 +3,8 @@ from . import views
 
 urlpatterns = [
     path('', views.search_flights, name='search_flights'),
+    path('results/<str:search_id>/', views.search_results, name='search_results'),
+    path('airports/', views.airport_autocomplete, name='airport_autocomplete'),
+    path('stream/', views.search_flights_stream, name='search_flights_stream'),
+    path('calendar/', views.fare_calendar, name='fare_calendar'),
 ]
\ No newline at end of file
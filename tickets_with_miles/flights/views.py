@@ -1,16 +1,51 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.urls import reverse
-from .forms import FlightSearchForm
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
+from .airport_groups import expand_routes
+from .airport_index import aget_airport_index
+from .columnar import SORT_KEYS, rank_flights
+from .fare_calendar import FareCalendarPlanner
+from .forms import FareCalendarForm, FlightSearchForm
+from .result_store import SearchResultStore
 from .services import FlightService
+from .warmup import RouteTraffic
+from typing import Any, AsyncIterator
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-def search_flights(request: HttpRequest) -> HttpResponse:
+AIRPORT_AUTOCOMPLETE_LIMIT = 10
+AIRPORT_AUTOCOMPLETE_MAX_QUERY_LENGTH = 64
+AIRPORT_AUTOCOMPLETE_MAX_AGE = 300  # seconds
+
+RESULT_SORT_OPTIONS = [
+    ('miles', 'Milhas'),
+    ('duration', 'Duração'),
+    ('departure', 'Partida'),
+    ('stops', 'Conexões'),
+]
+
+async def record_traffic(origin: str, destination: str) -> None:
+    """
+    Counts a user search of its routes for the route warm-up worker. Never fails the search.
+    """
+    try:
+        await RouteTraffic().arecord(expand_routes(origin, destination))
+    except Exception as e:
+        logger.warning(f"Failed to record search traffic: {e}")
+
+
+async def search_flights(request: HttpRequest) -> HttpResponse:
     """
-    Handles flight search requests and renders the search results.
+    Handles flight search requests. Results are kept in the SearchResultStore and the
+    user is redirected to their search_results page; only the search ID goes in the session.
+    Runs natively on the ASGI event loop, so slow searches don't hold a worker thread.
 
     Args:
         request: The HttpRequest object.
@@ -19,24 +54,47 @@ def search_flights(request: HttpRequest) -> HttpResponse:
         An HttpResponse object with the rendered template.
     """
     form = FlightSearchForm(request.POST or None)
-    flights = request.session.pop('flights', [])
+    flights = []
 
     if request.method == 'POST':
-        if form.is_valid():
+        if await form.ais_valid():
             origin = form.cleaned_data['origin'].upper()
             destination = form.cleaned_data['destination'].upper()
             departure_date = form.cleaned_data['date']
             flexibility = int(form.cleaned_data['flexibility'])
 
+            stay_range = form.get_stay_range()
             flight_service = FlightService()
+            await record_traffic(origin, destination)
 
             try:
-                flights = flight_service.get_flights(origin, destination, departure_date, flexibility)
+                if stay_range:
+                    flights = await flight_service.aget_round_trips(
+                        origin, destination, departure_date, flexibility, *stay_range,
+                        top_n=getattr(settings, 'ROUND_TRIP_MAX_RESULTS', 100),
+                        filters=form.get_filters(),
+                    )
+                else:
+                    flights = await flight_service.aget_flights(
+                        origin, destination, departure_date, flexibility,
+                        top_n=getattr(settings, 'FLIGHT_SEARCH_MAX_RESULTS', None),
+                        filters=form.get_filters(),
+                    )
                 if not flights:
                     messages.warning(request, 'Nenhum voo encontrado.')
                 else:
-                    request.session['flights'] = flights
-                    return redirect(reverse('search_flights'))
+                    search = {
+                        'origin': origin,
+                        'destination': destination,
+                        'date': departure_date.isoformat(),
+                        'flexibility': flexibility,
+                        **form.get_filter_data(),
+                    }
+                    if stay_range:
+                        search.update(round_trip=True, min_stay=stay_range[0], max_stay=stay_range[1])
+                    search_id = await SearchResultStore().asave(search, flights)
+                    await request.session.aset('search_id', search_id)
+                    return redirect(reverse('search_results', args=[search_id]))
             except Exception as e:
                 logger.error(f"Erro ao buscar voos: {e}")
                 messages.error(request, 'Ocorreu um erro ao pesquisar pelos voos.')
@@ -55,4 +113,189 @@ def search_flights(request: HttpRequest) -> HttpResponse:
         'form': form,
         'flights': flights,
     }
-    return render(request, 'flights/search.html', context)
\ No newline at end of file
+    return render(request, 'flights/search.html', context)
+
+
+@require_GET
+async def search_results(request: HttpRequest, search_id: str) -> HttpResponse:
+    """
+    Renders a stored search result. The page can be shared while the result hasn't expired,
+    and browsers may cache it privately for the time the result has left.
+    The `sort` query parameter re-ranks the flights by one of SORT_KEYS, and `per_day=1`
+    keeps only the cheapest flight of each date. Round trips are always shown by total miles.
+
+    Args:
+        request: The HttpRequest object.
+        search_id: The ID of the stored search result.
+
+    Returns:
+        An HttpResponse object with the rendered template, or a redirect to the
+        search page if the result has expired.
+    """
+    store = SearchResultStore()
+    result = await store.aload(search_id)
+    if result is None:
+        messages.warning(request, 'Esta busca expirou. Faça uma nova pesquisa.')
+        response = redirect(reverse('search_flights'))
+        add_never_cache_headers(response)
+        return response
+
+    sort_by = request.GET.get('sort', 'miles')
+    if sort_by not in SORT_KEYS:
+        sort_by = 'miles'
+    cheapest_per_day = request.GET.get('per_day') == '1'
+
+    flights = result['flights']
+    round_trips = []
+    if result['search'].get('round_trip'):
+        round_trips, flights = flights, []
+    elif sort_by != 'miles' or cheapest_per_day:
+        # Stored results are already sorted by miles
+        flights = rank_flights(flights, sort_by, cheapest_per_day)
+
+    context = {
+        'form': FlightSearchForm(initial=result['search']),
+        'flights': flights,
+        'round_trips': round_trips,
+        'search_id': search_id,
+        'sort_by': sort_by,
+        'sort_options': RESULT_SORT_OPTIONS,
+        'cheapest_per_day': cheapest_per_day,
+    }
+    # Flash messages are shown once, so a page carrying them must not be cached
+    show_messages = len(messages.get_messages(request)) > 0
+    response = render(request, 'flights/search.html', context)
+    max_age = store.remaining_lifetime(result)
+    if max_age > 0 and not show_messages:
+        patch_cache_control(response, private=True, max_age=max_age)
+    else:
+        add_never_cache_headers(response)
+    return response
+
+
+@require_GET
+@cache_control(public=True, max_age=AIRPORT_AUTOCOMPLETE_MAX_AGE)
+async def airport_autocomplete(request: HttpRequest) -> JsonResponse:
+    """
+    Suggests airports for the origin and destination inputs. Matches IATA codes,
+    names, states and countries by prefix, ignoring accents and tolerating one typo,
+    from an in-memory index so it can be called on every keystroke.
+
+    Args:
+        request: The HttpRequest object, with the typed text in the `q` query
+            parameter and optionally the maximum number of results in `limit`.
+
+    Returns:
+        A JSON response with the list of matching airports under 'results'.
+    """
+    query = request.GET.get('q', '')[:AIRPORT_AUTOCOMPLETE_MAX_QUERY_LENGTH]
+    try:
+        limit = min(int(request.GET.get('limit', AIRPORT_AUTOCOMPLETE_LIMIT)), AIRPORT_AUTOCOMPLETE_LIMIT)
+    except ValueError:
+        limit = AIRPORT_AUTOCOMPLETE_LIMIT
+
+    airport_index = await aget_airport_index()
+    results = [
+        {
+            'iata_code': airport.iata_code,
+            'name': airport.name,
+            'state_code': airport.state_code,
+            'country_name': airport.country_name,
+            'label': f"{airport.iata_code} - {airport.name}, {airport.country_name}",
+        }
+        for airport in airport_index.autocomplete.search(query, limit)
+    ]
+    return JsonResponse({'results': results})
+
+
+@require_GET
+async def fare_calendar(request: HttpRequest) -> JsonResponse:
+    """
+    Returns the cheapest fare of every day from the given date (today by default)
+    to the end of the searchable window. Only a sample of the days is searched, up
+    to settings.FARE_CALENDAR_MAX_FETCHED_DAYS route-days; the others come from the
+    fare cache or are estimated, which each day reports with 'exact'.
+
+    Args:
+        request: The HttpRequest object, with the origin, destination, optional date
+            and filter fields of the search form as query parameters.
+
+    Returns:
+        A JSON response with the list of 'days' and the number of 'exact_days', or
+        the form errors with status 400 when the parameters are invalid.
+    """
+    form = FareCalendarForm(request.GET)
+    if not await form.ais_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    flight_service = FlightService()
+    try:
+        calendar = await flight_service.aget_fare_calendar(
+            form.cleaned_data['origin'],
+            form.cleaned_data['destination'],
+            form.cleaned_data['date'],
+            form.get_calendar_days(),
+            getattr(settings, 'FARE_CALENDAR_MAX_FETCHED_DAYS', FareCalendarPlanner.DEFAULT_MAX_FETCHED_DAYS),
+            filters=form.get_filters(),
+        )
+    except Exception as e:
+        logger.error(f"Erro ao montar o calendário de tarifas: {e}")
+        return JsonResponse({'errors': {'__all__': ['Ocorreu um erro ao pesquisar pelos voos.']}}, status=502)
+
+    return JsonResponse({
+        'days': [day.to_dict() for day in calendar],
+        'exact_days': sum(day.exact for day in calendar),
+    })
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Formats one Server-Sent Events message.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@require_GET
+async def search_flights_stream(request: HttpRequest) -> HttpResponse:
+    """
+    Streams flight search results as Server-Sent Events, one 'date' event per day
+    as soon as it is available, a 'cheapest' event whenever the cheapest flight so
+    far changes and a final 'done' event. Results are only streamed progressively
+    when served through ASGI. Only one-way searches are streamed.
+
+    Args:
+        request: The HttpRequest object, with the search form fields as query parameters.
+
+    Returns:
+        A text/event-stream StreamingHttpResponse, or a JSON response with the form
+        errors and status 400 when the parameters are invalid.
+    """
+    form = FlightSearchForm(request.GET)
+    if not await form.ais_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    if form.get_stay_range():
+        return JsonResponse({'errors': {'round_trip': ['Buscas de ida e volta não são transmitidas.']}}, status=400)
+
+    origin = form.cleaned_data['origin'].upper()
+    destination = form.cleaned_data['destination'].upper()
+    departure_date = form.cleaned_data['date']
+    flexibility = int(form.cleaned_data['flexibility'])
+
+    filters = form.get_filters()
+    flight_service = FlightService()
+    await record_traffic(origin, destination)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event, data in flight_service.stream_flights(
+                origin, destination, departure_date, flexibility, filters=filters
+            ):
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.error(f"Erro ao buscar voos: {e}")
+            yield format_sse('error', {'message': 'Ocorreu um erro ao pesquisar pelos voos.'})
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
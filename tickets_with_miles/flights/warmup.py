@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+
+from .airport_groups import expand_routes
+from .fare_cache import PROCESS_LOCAL_BACKENDS
+from .services import FlightService
+
+logger = logging.getLogger(__name__)
+
+# (origin, destination) IATA codes
+Route = Tuple[str, str]
+
+
+def parse_route(route: str) -> List[Route]:
+    """
+    Parses 'GRU-LIS' (or 'SAO-LIS', with metro area codes) into the routes it covers.
+    """
+    origin, separator, destination = route.partition('-')
+    if not separator or not origin.strip() or not destination.strip():
+        raise ValueError(f"Invalid route: {route!r}, expected ORIGIN-DESTINATION")
+    return expand_routes(origin, destination)
+
+
+class RouteTraffic:
+    """
+    Counts user searches per route in hourly buckets of a Django cache, so a warm-up
+    worker in another process can tell which routes are popular and whether users
+    are searching right now.
+
+    Buckets are read and written without locking, so concurrent searches may now
+    and then lose a count; that's fine for ranking routes.
+    """
+
+    KEY_PREFIX = 'route-traffic'
+    BUCKET_SECONDS = 3600
+    ACTIVITY_SECONDS = 60
+    DEFAULT_HOURS = 24
+
+    def __init__(self, alias: Optional[str] = None, hours: Optional[int] = None):
+        """
+        Initialize the RouteTraffic.
+
+        Args:
+            alias: Name of the entry in settings.CACHES to use.
+            hours: Number of hourly buckets kept.
+        """
+        config = getattr(settings, 'ROUTE_WARMUP', {})
+        self.alias = alias or config.get('CACHE_ALIAS', 'default')
+        self.hours = hours or config.get('TRAFFIC_HOURS', self.DEFAULT_HOURS)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def is_shared(self) -> bool:
+        """
+        Whether other processes see the counts, i.e. the cache is not process-local.
+        """
+        return not isinstance(self.backend, PROCESS_LOCAL_BACKENDS)
+
+    def bucket_key(self, bucket: int) -> str:
+        return f"{self.KEY_PREFIX}:{bucket}"
+
+    def activity_key(self, now: float) -> str:
+        return f"{self.KEY_PREFIX}:active:{int(now // self.ACTIVITY_SECONDS)}"
+
+    def record(self, routes: Iterable[Route], now: Optional[float] = None) -> None:
+        """
+        Counts one search of each route.
+        """
+        now = time.time() if now is None else now
+        key = self.bucket_key(int(now // self.BUCKET_SECONDS))
+        counts = self.add_counts(self.backend.get(key), routes)
+        self.backend.set(key, counts, self.hours * self.BUCKET_SECONDS)
+
+        activity_key = self.activity_key(now)
+        if not self.backend.add(activity_key, 1, self.ACTIVITY_SECONDS * 2):
+            try:
+                self.backend.incr(activity_key)
+            except ValueError:
+                # Expired between add() and incr()
+                self.backend.set(activity_key, 1, self.ACTIVITY_SECONDS * 2)
+
+    async def arecord(self, routes: Iterable[Route]) -> None:
+        """
+        Async counterpart of record(), for async views.
+        """
+        now = time.time()
+        key = self.bucket_key(int(now // self.BUCKET_SECONDS))
+        counts = self.add_counts(await self.backend.aget(key), routes)
+        await self.backend.aset(key, counts, self.hours * self.BUCKET_SECONDS)
+
+        activity_key = self.activity_key(now)
+        if not await self.backend.aadd(activity_key, 1, self.ACTIVITY_SECONDS * 2):
+            try:
+                await self.backend.aincr(activity_key)
+            except ValueError:
+                await self.backend.aset(activity_key, 1, self.ACTIVITY_SECONDS * 2)
+
+    @staticmethod
+    def add_counts(counts: Optional[Dict[str, int]], routes: Iterable[Route]) -> Dict[str, int]:
+        counts = counts or {}
+        for origin, destination in routes:
+            route = f"{origin}-{destination}"
+            counts[route] = counts.get(route, 0) + 1
+        return counts
+
+    def top_routes(self, limit: int, now: Optional[float] = None) -> List[Route]:
+        """
+        Returns the most searched routes of the kept buckets, most searched first.
+        """
+        now = time.time() if now is None else now
+        current = int(now // self.BUCKET_SECONDS)
+        keys = [self.bucket_key(bucket) for bucket in range(current - self.hours + 1, current + 1)]
+        totals = Counter()
+        for counts in self.backend.get_many(keys).values():
+            totals.update(counts)
+        return [tuple(route.split('-', 1)) for route, _ in totals.most_common(limit)]
+
+    def searches_last_minute(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        return self.backend.get(self.activity_key(now)) or 0
+
+
+class WarmUpStats:
+    """
+    What one warm-up cycle did.
+    """
+
+    def __init__(self):
+        self.routes = 0
+        self.fetched = 0
+        self.fresh = 0
+        self.failed = 0
+        self.skipped = 0
+        self.yielded = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"WarmUpStats(routes={self.routes}, fetched={self.fetched}, fresh={self.fresh}, "
+            f"failed={self.failed}, skipped={self.skipped}, yielded={self.yielded})"
+        )
+
+
+class RouteWarmer:
+    """
+    Pre-fetches the upcoming days of popular routes into the fare cache, so user
+    searches for them are served from the cache.
+
+    Each cycle skips days that are still fresh, orders the others by date and then by
+    route popularity, so a limited budget covers the nearest days of every route
+    first, and fetches at most `budget` of them in batches of `concurrency`. Batches
+    run at WARM_PRIORITY, behind user searches and background refreshes in the fetch
+    scheduler, and the worker also pauses while users of other processes are
+    searching (see RouteTraffic).
+    """
+
+    WARM_PRIORITY = 10
+    DEFAULT_DAYS = 30
+    DEFAULT_BUDGET = 200
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_BUSY_SEARCHES_PER_MINUTE = 30
+    DEFAULT_PAUSE = 1.0  # seconds
+    MAX_PAUSES = 30
+
+    def __init__(
+        self,
+        service: Optional[FlightService] = None,
+        traffic: Optional[RouteTraffic] = None,
+        days: Optional[int] = None,
+        budget: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        busy_searches_per_minute: Optional[int] = None,
+        pause: Optional[float] = None,
+    ):
+        """
+        Initialize the RouteWarmer. Unset options come from settings.ROUTE_WARMUP.
+
+        Args:
+            service: The FlightService used to fetch and cache the days.
+            traffic: Search traffic used to detect user activity.
+            days: Number of upcoming days warmed per route, starting today.
+            budget: Most days fetched per cycle.
+            concurrency: Days fetched at once.
+            busy_searches_per_minute: User searches per minute above which the worker pauses.
+            pause: Seconds waited between batches while users are busy.
+        """
+        config = getattr(settings, 'ROUTE_WARMUP', {})
+        self.service = service or FlightService()
+        self.traffic = traffic or RouteTraffic()
+        self.days = days or config.get('DAYS', self.DEFAULT_DAYS)
+        self.budget = budget if budget is not None else config.get('BUDGET', self.DEFAULT_BUDGET)
+        self.concurrency = concurrency or config.get('CONCURRENCY', self.DEFAULT_CONCURRENCY)
+        self.busy_searches_per_minute = busy_searches_per_minute or config.get(
+            'BUSY_SEARCHES_PER_MINUTE', self.DEFAULT_BUSY_SEARCHES_PER_MINUTE
+        )
+        self.pause = self.DEFAULT_PAUSE if pause is None else pause
+
+    def plan(self, routes: List[Route], start_date: Optional[date] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Lists the days to fetch this cycle.
+
+        Args:
+            routes: Routes to warm, most popular first.
+            start_date: First day warmed, today by default.
+
+        Returns:
+            A tuple of (searches to fetch, number of days skipped because they are fresh).
+        """
+        start_date = start_date or date.today()
+        searches = [
+            search
+            for origin, destination in routes
+            for search in self.service.build_searches(origin, destination, start_date, self.days)
+        ]
+        # Day by day, each day in route order (the sort is stable)
+        searches.sort(key=lambda search: search['departure_date'])
+
+        cache = self.service.cache
+        planned = []
+        fresh = 0
+        for search in searches:
+            entry = cache.get_entry(self.service.cache_key(search)) if cache is not None else None
+            if entry is not None and cache.is_fresh(entry[1]):
+                fresh += 1
+            else:
+                planned.append(search)
+        return planned, fresh
+
+    async def wait_for_quiet(self, stats: WarmUpStats) -> None:
+        """
+        Waits while users are searching, up to MAX_PAUSES pauses.
+        """
+        for _ in range(self.MAX_PAUSES):
+            if self.traffic.searches_last_minute() < self.busy_searches_per_minute:
+                return
+            stats.yielded += 1
+            await asyncio.sleep(self.pause)
+
+    async def warm(self, routes: List[Route], start_date: Optional[date] = None) -> WarmUpStats:
+        """
+        Runs one warm-up cycle.
+
+        Args:
+            routes: Routes to warm, most popular first.
+            start_date: First day warmed, today by default.
+
+        Returns:
+            The WarmUpStats of the cycle.
+        """
+        stats = WarmUpStats()
+        routes = list(dict.fromkeys(routes))
+        stats.routes = len(routes)
+        planned, stats.fresh = self.plan(routes, start_date)
+        searches = planned[:self.budget]
+        stats.skipped = len(planned) - len(searches)
+
+        for start in range(0, len(searches), self.concurrency):
+            batch = searches[start:start + self.concurrency]
+            await self.wait_for_quiet(stats)
+            try:
+                raw_data_list = await self.service.client.search_flights_bulk(batch, priority=self.WARM_PRIORITY)
+            except Exception as e:
+                logger.warning(f"Route warm-up batch failed: {e}")
+                stats.failed += len(batch)
+                continue
+
+            fetched_at = int(time.time())
+            for search, raw_data in zip(batch, raw_data_list):
+                if 'error' in raw_data:
+                    stats.failed += 1
+                    continue
+                # Parses the day and stores it in the fare cache
+                self.service.process_day(search, raw_data, fetched_at)
+                stats.fetched += 1
+        return stats
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tickets_with_miles.settings')
 
 application = get_asgi_application()
+
+from flights.airport_index import warm_airport_index  # noqa: E402
+
+# Load the airports before the first search, which would otherwise read the whole table
+warm_airport_index()
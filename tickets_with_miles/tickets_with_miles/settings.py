@@ -127,3 +127,102 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Keys to flights api call
 FLIGHT_API_KEY = 'aJqPU7xNHl9qN3NVZnPaJ208aPo2Bh2p2ZV844tw'
 AKAMAI_TELEMETRY = 'a=&&&e=cGw5cDZYcVY5b2Vib1Nmc3pSOVpwTkoveXFkL3hQdkM3UWMwcUNGd2JaMmtDN3J6N3JIZ3l2YThCeW5lcjRqT29GVFRzRkM3L25BUU9iL2NFRFF3Qy9ibGJWSFJUdHZhbWxjc0hQc3Mrd1J6b1gvRUNPTEQ5NmtkNzN4UnFLNVZqZzJaejRMemt1cE44b2QvUlFsM2gzZDgxck1OMHpsVWlkUnJrdjRRV3JCd0ZYcXhvV291bXBacnZxcStDRzBLT2w=&&&sensor_data=Mjs4ODg4ODg4Ozc3Nzc3Nzc7MzAsMSwwLDAsNCwzNTtdJlosWm4mMXEzOGgqbEkqQzpfNzNQMSM9dGQjM1I1KDVlZkB9Nk8yJVtJI1RSXUReP0BzI0E7QjpXMHBuV1tWXj1JIF8rOTN+PHktOislJXlDeFheJSMrL1E1bSV2cGsjdChJM19CfHs9S29qaDUtc3A/dDJhV15+UDF9cFJaLTEgM3NpL3RQVnk5I21aNzclJFU4WjU9OV5WUUdIe1kzd35Kb2k6KXJgZChPVEMpW2tqRix4b0lSRzwvKEwjeGxsfT5aIT8lLThoP0MhOHQ3ei9sZD1ib25BSF1lZnVOdkw2TjYzZy5xU1J9Zk4/a0JzeGVmKWggOXJBSU4jaDRUdDNCbyFkeH4uaE1dLUJAUVNjT1ErcXlAe2RuZzZHaStSeWlwe2dYXiBbPTMhSj9gYzdwYkxIWmpVVVddfktofWt7a3B+dXVzcFs3c18jIz9Fb3FmYEhvKHhxJSZecU5uP14+RGM/R1opfSNmcC5fWHAmL0RKc0ZselRxJFZHJCA0JVNBLyAmRGdeU2c7N0lBJXNQP1Z7TFFvd1lwR01eVkFBRl17RHtNRj1gWFIrQ21UJFtNd293SkVFQ1U6WVElKDt0RHhWZztsaWdKMmAsYyNYX34mdVUzRUA+W2pAPXUuQUVwOEFMYDU5OGJFUHVPSUVlVyxmdHNXaTFkQHpDJHZdaTNod15rVi1XIUxJdCZPZFB8fC9wVGBuQXZkTkR7e2BOe15sdnBPaGA/ZlFpUSNpKV1jLGROb3JaL3hpY2pRQz1aPFl6YENlbz8uMHFOK201M0xaSC1NViBqc1ZVeGV3I2F0d3sodzo9QjklLSx0LChTX3psWDwoIWUhPU14U3p0biRGc19HIC9hU09HPndxRStCa2RTfGhQP0I3JkF3aHRUPyVyPDN9OXd6OiNxZ25gfkZjICtZKnIvTj5YYTkyOzIoRSApJlR0aEc+Kj9BcllSMENDQn5HVjE/RWNtLjFDMjJ1MjlJNkA0fXxsIzJqV0wjSWJlO31yWnl9SUtydj4sLFY/WHcxbmdNSlFXTFZDQG9EUWlKKCpFPUZ9R1RVfnV8U0FTZ0MhdnJMPmEqN1tLJkRRZig4Zzhja3JXUTxRYjtMXVBdTVZ+UF46eiVlWTRKemoyfTI4b3UmVXBIWlc7QCpKXllDe116NkNobzV+LW5hfkhbfWU7PSZlVS50RFhtYlZHcSlASHxIc3F1PDl8a1NJUURXSCwsJWQoYigufWAwJHVncCozRi1BeCFCT19JTnc+Oy1RZz9oVSliMmIjSVYwaDUzITpJICptb0hUelVrO2lhXitndykqRzo4ayRTTVMrY1NbenpafWhbQE8uWmRFISktTndUKXNQUnBXIElSVz1wcXEwSy9VeytLbj5XaDwrMi9bMm1JUz58WEJkPVByNiAlLWFnSHNuemEgSFVNOiQyM3k7OX0wTU8pc0UmQUMwai8xaSluPXVJMlcrL0wgciY1I1VJISZre3hGLGh0NnRrJCtfLm51cnZMcSw/UG5bcSl4ZzcwMngla3Q+LT1nWEZrOlMhdkY2Z0pocys/PTVKd1k1OyYxLEB4JmpoYzYveEhkOHNyPzh5fUZ6O3N3XSpNN28gLCAlOH00aGAsWWBNfEF+YEg4JltDM3E+WGBxRHJqWFFmQ0RnYC19cVppZlBzOCB3PElKPEE1JHxfcHg8dG90KzFJVWgzaUpLdEV0IVQ8dGJrOH1wflhiKio5OnVMTzFXY30qTEtlV18/c3sobTghen4xIHgtbWY7JD5OOWRFQn5WKCxRfUA7RTBjeyNeQTw2PTBPQUtHQHZecy5zQ0tbJiVTazlQamp8V1NtcjoodDlMSGVxeGprWEBKalk0REcgL2Qwb2o2MUw5IEpeQCw9N0VJdCA/Nzd2aylGOCYtMDppSWNed1hxZVlbLjIzb3QgOkdmeT42SDokanBnYG8xXnZSelYvXmMyfHQ5ZGc8XmQtPlZ1Mz9RP0dpNyUrRVIwVTdvWylQZk5lbypgcjMqMXZifEMqYk8+ak0yZylEazhrWDA2aklTNi84YEZPOl9ZK2JdL0tZJURSeFJNQnBzKzFHfVQwZVpNfSlhdHpNY3VaeXh4UGE1NDpsTmdiK1ZDd21XTzlkOnM3cmJDSU4gMHU2c0wrOWl2eWFBbFY6ZVQyJWVkUDBqS15nST49QnYydE1NVT5xUzdDTSZWSChXYSMhWXhpVTRzJFUubzM/Zj5QW0AtZ2BdcENLRHx7cnpSPEUqNHkkKF12TUJVNHBdUnFfZjVKSyFPd2ZLXnNJNDkhLXg2IHtfSWI4eXM9djdrVzYuaFtJIU5YTD92UWVPQUNNXzdUTVg+Z2AgKjRgXlF+YVZYLHZhc05rWi09PXVCfC0xTjhOWXxUL0h6X0RlPERTMyR7aVRlQ1pLZ0pOJj86WjQzKi0mY1szIWMzRSFtZk9YUyw7L100R0RUJjspdlp4MFNacFVvQHckbGhENXclKVZYYlAlMXAgLnJUYkpoRDRObk9pYmFDMj1LI1hbPU5SUT1FREB0WThwZT50YzNFaClTYCgrKXNfaiBBfTR2OjEjb3JUVDt8NF4+KGlWcHNDYyZNISVXPyUwPCR0aGdlOFZSQF51VTdVe2xibTpHYDFfLFYwMnFRO0tsMz1KQm5nO0Y9YmhhWG9dPjJFTntAV0c0Y0tIVU49Zy59Si01T2oyRzF5dF9mMlJadl8oZE18JnNFICpNfUh6RD85UyY6PWh5R01vOGE5Y2BlLnx7dzJ1I3ZQIEM6WnZET1BYeDBgL1shbFFNVCZmckA2fT5vISV0VD9UPS89TUxKUWZ1W3Ywb1JgajAuYUdXV15VPndyPmB4XyVgakE0cyFjaDloLV0vYTVRYVBHOURbW0g+eX5eTWg+Wy5CV1ErIz50LG4lckpGVns0SVF3JTpvYjF9bmI4aGQrJCM+LSEuQ3NHKks+eFYqV2Ajd114OHtKUUhRQUBfaWFwJTsxSGJ8bHBlSit2WXxhfjExcUNnPCEhZ310IGp6UDBeKGxtfDstKyRkJmY6aktVRXp3QFlxKzMvJlZrZ1pMdzVmVC1JaFV8e15EfXFIW09sd31AOSFzdGUoKV03Szg+UXckKFd1Yj5FJSt5bEEwSXRrQWI6Ln4xMUFNaG8qZGJIOHMlRXtmSk9GR0RCJmpAbnYwaTMzJjExbHhFOU1MRHBPZTdCcGJeX1hlVmBDQm1MYG5LKi96SFNkIUVafmp2Vjc7VzBkY1ZZVXZqNmlAOiAwfGFzS3wxSW9fWGdXN3F7XXhWdHpUclIqd29WIVBacSh5ZEdMLiA5bC9VPD10IGErTGlKU1gqQUZkPTB6JGRMe1V7diYlV3ZPalZpOEV0OzthMl5JXld0M0xVc3QqayF6TDs9SWB+TyVSPFM='
+
+# Connection pool used for flights api calls
+FLIGHT_API_CONNECTION_LIMIT = 100
+FLIGHT_API_CONNECTION_LIMIT_PER_HOST = 30
+FLIGHT_API_DNS_CACHE_TTL = 300  # seconds
+FLIGHT_API_KEEPALIVE_TIMEOUT = 60  # seconds
+FLIGHT_API_MAX_IN_FLIGHT = 8  # concurrent upstream requests per event loop
+
+# Retries of transient API failures (connection errors, timeouts, 429 and 5xx), with
+# exponential backoff and jitter. A Retry-After above MAX_DELAY is not waited for.
+FLIGHT_API_RETRY = {
+    'ATTEMPTS': 3,
+    'BASE_DELAY': 0.5,  # seconds
+    'MAX_DELAY': 8,  # seconds
+}
+
+# After FAILURE_THRESHOLD failures in a row the API host is not called for RESET_TIMEOUT
+# seconds, then HALF_OPEN_MAX_CALLS probe requests decide whether it is back.
+FLIGHT_API_CIRCUIT_BREAKER = {
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 30,  # seconds
+    'HALF_OPEN_MAX_CALLS': 1,
+}
+
+# Per-day cache of parsed flight results.
+# BACKEND is 'memory' (in-process LRU) or 'django' (uses CACHES[CACHE_ALIAS]).
+# Days older than TTL are still served for STALE_TTL seconds while refreshed in the background.
+FARE_CACHE = {
+    'BACKEND': 'memory',
+    'TTL': 600,  # seconds
+    'STALE_TTL': 3600,  # seconds
+    'MAX_ENTRIES': 2048,
+    'CACHE_ALIAS': 'default',
+}
+
+# Process-wide event loop thread used by sync callers of FlightService.
+# FLIGHT_SEARCH_USE_LOOP_BRIDGE makes async views search on it too: None turns it on
+# when served through wsgi.py and off under ASGI, where the server loop is long-lived.
+FLIGHT_EVENT_LOOP_TIMEOUT = 120  # seconds
+FLIGHT_SEARCH_USE_LOOP_BRIDGE = None
+# Pre-connect to the flights API when wsgi.py starts the shared event loop
+FLIGHT_API_WARM_UP = True
+
+# Server-side store of search results, addressed by search ID.
+# Use a cache shared between processes (e.g. Redis) when running several workers.
+SEARCH_RESULT_STORE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 3600,  # seconds
+}
+
+# Seconds before the in-memory airport index is rebuilt from the database
+AIRPORT_INDEX_MAX_AGE = 3600
+
+# Decode API responses straight into the fields the parser reads (requires msgspec)
+FLIGHT_API_TYPED_DECODING = True
+
+# Number of cheapest flights kept per search (None keeps them all)
+FLIGHT_SEARCH_MAX_RESULTS = None
+
+# Number of cheapest round trips kept per search
+ROUND_TRIP_MAX_RESULTS = 100
+
+# Most searches sent upstream for one cheapest-fare calendar, a day counting once
+# per route; the other days are taken from the fare cache or estimated
+FARE_CALENDAR_MAX_FETCHED_DAYS = 60
+
+# Route warm-up worker (manage.py warm_routes). It pre-fetches the next DAYS days of
+# ROUTES and of the TOP_ROUTES most searched routes of the last TRAFFIC_HOURS hours,
+# at most BUDGET days per cycle, CONCURRENCY at a time, and pauses while users make
+# more than BUSY_SEARCHES_PER_MINUTE searches. Needs a FARE_CACHE shared with the
+# web processes ('django' backend). The search traffic is counted in
+# CACHES[CACHE_ALIAS], which must also be shared (e.g. Redis or Memcached): with the
+# default per-process LocMemCache the worker sees no traffic and --from-traffic is refused.
+ROUTE_WARMUP = {
+    'ROUTES': [],
+    'TOP_ROUTES': 20,
+    'TRAFFIC_HOURS': 24,
+    'DAYS': 30,
+    'BUDGET': 200,
+    'CONCURRENCY': 4,
+    'BUSY_SEARCHES_PER_MINUTE': 30,
+    'CACHE_ALIAS': 'default',
+}
+
+# Metro area codes searched as several airports, added to flights.airport_groups.DEFAULT_AIRPORT_GROUPS
+AIRPORT_GROUPS = {}
+
+# History of the fares seen in search results (flights.models.FareSnapshot), written in
+# bulk from a background thread. manage.py compact_fare_snapshots rolls observations
+# older than RAW_DAYS up to the cheapest per route, flight date and day, and deletes
+# flight dates more than HISTORY_DAYS in the past.
+FARE_SNAPSHOTS = {
+    'ENABLED': True,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,  # seconds
+    'MAX_BUFFER': 50000,
+    'RAW_DAYS': 7,
+    'HISTORY_DAYS': 365,
+}
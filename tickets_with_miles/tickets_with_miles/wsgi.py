@@ -14,3 +14,18 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tickets_with_miles.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from flights.airport_index import warm_airport_index  # noqa: E402
+from flights.loop_bridge import loop_bridge  # noqa: E402
+
+# Load the airports before the first search, which would otherwise read the whole table
+warm_airport_index()
+
+# Async views get a throwaway loop per request under WSGI, so their searches run on
+# the shared event loop instead (see FlightService.uses_loop_bridge). The loop starts
+# with the server, pre-connecting to the flights API so the first searches don't pay
+# for DNS, TCP and TLS. Forked workers start their own loop, and warm up again, on first use.
+loop_bridge.serves_wsgi = True
+loop_bridge.warm_up_api = getattr(settings, 'FLIGHT_API_WARM_UP', False)
+loop_bridge.start()